@@ -0,0 +1,151 @@
+import argparse
+import json
+from uuid import UUID
+from app.db.session import SessionLocal
+from app.crud.book import BookCRUD, POPULARITY_MAX_DAYS
+from app.controllers.books.book_controller import BookController
+from app.schemas.book import ImportFormat
+from app.utils.catalog_import import IMPORT_CHUNK_SIZE
+from app.tasks.overdue import make_overdue_sweeper, OVERDUE_SWEEP_BATCH_SIZE
+from app.tasks.holds import make_hold_expiry_sweeper, HOLD_EXPIRY_BATCH_SIZE
+from app.tasks.idempotency import make_idempotency_purger, IDEMPOTENCY_PURGE_BATCH_SIZE
+from app.tasks.popularity import make_popularity_pruner, POPULARITY_PRUNE_BATCH_SIZE
+from app.crud.order_partition import OrderPartitionCRUD, ORDER_PARTITION_MONTHS_AHEAD, ORDER_RETENTION_MONTHS
+from app.config.logger import logger
+
+
+def recompute_available_copies(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        repaired = BookCRUD(db).recompute_available_copies(args.book_id)
+        print(f"Repaired available copies for {repaired} book(s)")
+    finally:
+        db.close()
+
+
+def import_books(args: argparse.Namespace) -> None:
+    file_format = args.format or (ImportFormat.jsonl if args.path.endswith((".jsonl", ".ndjson")) else ImportFormat.csv)
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as lines:
+            report = BookController(db).import_books(lines, file_format, args.chunk_size)
+        print(json.dumps(report, indent=2, default=str))
+    finally:
+        db.close()
+
+
+def rebuild_popularity(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        written = BookCRUD(db).rebuild_popularity_rollup(args.days)
+        print(f"Rebuilt popularity rollup with {written} bucket(s)")
+    finally:
+        db.close()
+
+
+def prune_popularity(args: argparse.Namespace) -> None:
+    pruned = make_popularity_pruner(args.batch_size).run_once()
+    print(f"Pruned {pruned} popularity bucket(s)")
+
+
+def sweep_overdue(args: argparse.Namespace) -> None:
+    marked = make_overdue_sweeper(args.batch_size).run_once()
+    print(f"Marked {marked} order(s) as overdue")
+
+
+def expire_holds(args: argparse.Namespace) -> None:
+    expired = make_hold_expiry_sweeper(args.batch_size).run_once()
+    print(f"Expired {expired} hold(s)")
+
+
+def purge_idempotency_keys(args: argparse.Namespace) -> None:
+    purged = make_idempotency_purger(args.batch_size).run_once()
+    print(f"Purged {purged} expired idempotency key(s)")
+
+
+def create_order_partitions(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        created = OrderPartitionCRUD(db).create_partitions(args.months_ahead)
+        print(f"Created {len(created)} orders partition(s): {', '.join(created) or '-'}")
+    finally:
+        db.close()
+
+
+def archive_orders(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        archived = OrderPartitionCRUD(db).archive_partitions(args.retention_months)
+        print(f"Archived {len(archived)} orders partition(s): {', '.join(archived) or '-'}")
+    finally:
+        db.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Library Management System maintenance commands.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    recompute = subparsers.add_parser(
+        "recompute-available-copies",
+        help="Repair the denormalized books.available_copies counters from book_copies."
+    )
+    recompute.add_argument("--book-id", type=UUID, default=None, help="Only repair this book.")
+    recompute.set_defaults(func=recompute_available_copies)
+
+    importer = subparsers.add_parser("import-books", help="Bulk import books from a CSV or JSON Lines file.")
+    importer.add_argument("path", help="CSV file with a header row, or a JSON Lines file.")
+    importer.add_argument("--format", type=ImportFormat, choices=list(ImportFormat), default=None,
+                          help="File format (default: guessed from the extension).")
+    importer.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Rows per COPY/merge transaction.")
+    importer.set_defaults(func=import_books)
+
+    popularity = subparsers.add_parser(
+        "rebuild-popularity",
+        help="Recompute the daily per-book order rollup from the orders table and prune old buckets."
+    )
+    popularity.add_argument("--days", type=int, default=POPULARITY_MAX_DAYS, help="Number of most recent days to recompute.")
+    popularity.set_defaults(func=rebuild_popularity)
+
+    prune = subparsers.add_parser(
+        "prune-popularity",
+        help=f"Delete daily order buckets older than the {POPULARITY_MAX_DAYS}-day popularity window."
+    )
+    prune.add_argument("--batch-size", type=int, default=POPULARITY_PRUNE_BATCH_SIZE, help="Buckets deleted per transaction.")
+    prune.set_defaults(func=prune_popularity)
+
+    sweeper = subparsers.add_parser("sweep-overdue", help="Mark pending orders past their due date as overdue.")
+    sweeper.add_argument("--batch-size", type=int, default=OVERDUE_SWEEP_BATCH_SIZE, help="Orders updated per transaction.")
+    sweeper.set_defaults(func=sweep_overdue)
+
+    holds = subparsers.add_parser("expire-holds", help="Expire ready holds past their pickup deadline.")
+    holds.add_argument("--batch-size", type=int, default=HOLD_EXPIRY_BATCH_SIZE, help="Holds expired per transaction.")
+    holds.set_defaults(func=expire_holds)
+
+    idempotency = subparsers.add_parser("purge-idempotency-keys", help="Delete expired idempotency keys.")
+    idempotency.add_argument("--batch-size", type=int, default=IDEMPOTENCY_PURGE_BATCH_SIZE, help="Keys deleted per transaction.")
+    idempotency.set_defaults(func=purge_idempotency_keys)
+
+    partitions = subparsers.add_parser("create-order-partitions", help="Create the upcoming monthly partitions of orders.")
+    partitions.add_argument("--months-ahead", type=int, default=ORDER_PARTITION_MONTHS_AHEAD,
+                            help="Months to create beyond the current one.")
+    partitions.set_defaults(func=create_order_partitions)
+
+    archive = subparsers.add_parser(
+        "archive-orders",
+        help="Move monthly orders partitions past the retention window, once fully completed, to the archive schema."
+    )
+    archive.add_argument("--retention-months", type=int, default=ORDER_RETENTION_MONTHS,
+                         help="Months of orders to keep in the orders table.")
+    archive.set_defaults(func=archive_orders)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    logger.info(f"Running maintenance command: {args.command}")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,40 @@
+from uuid import UUID
+from datetime import datetime, timezone
 from fastapi import Depends, HTTPException
+from jose import JWTError
 from sqlalchemy.orm import Session
 from app.schemas.user import UserBase
 from app.db.session import get_db
 from app.crud.user import UserCRUD
+from app.crud.revoked_token import RevokedTokenCRUD
 from app.exceptions.crud_exception import CRUDException
-from app.utils.security import hash_password, verify_password, create_access_token
+from app.exceptions.overloaded_exception import OverloadedException
+from app.utils.security import hash_password, verify_password, create_access_token, verify_access_token
+from app.utils.revocation import revocation_list
 
 
 class AuthController:
     def __init__(self, db: Session = Depends(get_db)):
         self.user_crud = UserCRUD(db)
+        self.revoked_token_crud = RevokedTokenCRUD(db)
         
     def signup(self, user: UserBase):
         try:
             user.password_hash = hash_password(user.password_hash)
             user = self.user_crud.create_user(user) 
             
-            access_token = create_access_token(data={"username": user.username, "role": user.role})
+            access_token = create_access_token(data={"username": user.username, "user_id": str(user.user_id), "role": user.role})
             print(f"Access Token: {access_token}")
             return {
                 "access_token": access_token,
                 "token_type": "bearer"
             }
+        except HTTPException as e:
+            raise e
         except CRUDException as e:
             raise HTTPException(status_code=e.status_code, detail=e.message)
+        except OverloadedException as e:
+            raise HTTPException(status_code=503, detail=e.message, headers={"Retry-After": str(e.retry_after)})
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
         
@@ -34,18 +45,35 @@ class AuthController:
             if not verify_password(password, user.password_hash):
                 raise HTTPException(status_code=401, detail="Invalid credentials")
             
-            access_token = create_access_token(data={"username": user.username, "role": user.role})
+            access_token = create_access_token(data={"username": user.username, "user_id": str(user.user_id), "role": user.role})
             return {
                 "access_token": access_token,
                 "token_type": "bearer"
             }
+        except HTTPException as e:
+            raise e
         except CRUDException as e:
             raise HTTPException(status_code=e.status_code, detail=e.message)
+        except OverloadedException as e:
+            raise HTTPException(status_code=503, detail=e.message, headers={"Retry-After": str(e.retry_after)})
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
-    def logout(self):
-        return {"message": "Successfully logged out"}
+    def logout(self, token: str):
+        try:
+            payload = verify_access_token(token)
+            # Tokens issued without a jti cannot be revoked and simply run out
+            if payload.get("jti") and payload.get("exp"):
+                expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+                self.revoked_token_crud.revoke(UUID(payload["jti"]), expires_at)
+                revocation_list.add(payload["jti"], payload["exp"])
+            return {"message": "Successfully logged out"}
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        except CRUDException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
     
     
 def get_auth_controller(db: Session = Depends(get_db)) -> AuthController:
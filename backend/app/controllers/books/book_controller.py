@@ -1,55 +1,151 @@
 from fastapi import Depends, HTTPException
 from uuid import UUID
+from typing import Iterable, Iterator
 from sqlalchemy.orm import Session
-from app.schemas.book import BookPost, BookBase
-from app.schemas.book_copy import BookCopyBase, BookCopyStatus
-from app.db.session import get_db
+from app.schemas.book import BookPost, BookBase, BookBatchPost, BookFilters, ImportFormat, ExportFormat
+from app.db.session import get_db, SessionLocal
 from app.crud.book import BookCRUD
 from app.crud.book_copy import BookCopyCRUD
+from app.crud.hold import HoldCRUD
 from app.exceptions.crud_exception import CRUDException
+from app.utils.typeahead import suggestion_index
+from app.utils.catalog_import import read_import_chunks, IMPORT_CHUNK_SIZE
+from app.utils.http_cache import make_etag
+from app.utils.catalog_export import encode_export, gzip_chunks
+from app.config.logger import logger
 
 
 class BookController:
     def __init__(self, db: Session = Depends(get_db)):
         self.book_crud = BookCRUD(db)
         self.book_copy_crud = BookCopyCRUD(db)
+        self.hold_crud = HoldCRUD(db)
 
     def add_book(self, book: BookPost):
         try:
             num_copies = book.num_copies
             book_info = book.model_dump(exclude={"num_copies"})
-            created_book = self.book_crud.create_book(book_info)
+            # The book and all of its copies are committed together
+            created_book = self.book_crud.create_book(book_info, commit=num_copies == 0)
             
             if num_copies > 0:
-                # Create book copies
-                for _ in range(num_copies):
-                    book_copy = BookCopyBase(
-                        book_id=created_book.book_id,
-                        status=BookCopyStatus.available
-                    )
-                    self.book_copy_crud.create_book_copy(book_copy)
+                self.book_copy_crud.create_book_copies(created_book.book_id, num_copies)
+            suggestion_index.add_book(created_book.book_id, created_book.title, created_book.author)
             return created_book
         except CRUDException as e:
             raise HTTPException(status_code=e.status_code, detail=e.message)
         
+    def import_books(self, lines: Iterable[str], file_format: ImportFormat, chunk_size: int = IMPORT_CHUNK_SIZE):
+        """
+        Imports a CSV or JSON Lines catalog chunk by chunk and returns a per-row error report.
+        """
+        imported = 0
+        errors = []
+        for rows, chunk_errors in read_import_chunks(lines, file_format, chunk_size):
+            errors.extend(chunk_errors)
+            if not rows:
+                continue
+            try:
+                books, conflicts = self.book_crud.bulk_import_books(rows)
+            except CRUDException as e:
+                errors.extend({"line": line_no, "isbn": book.isbn, "error": e.message} for line_no, book in rows)
+                continue
+            errors.extend(conflicts)
+            imported += len(books)
+            for book in books:
+                suggestion_index.add_book(book["book_id"], book["title"], book["author"])
+        errors.sort(key=lambda error: error["line"])
+        return {
+            "imported": imported,
+            "failed": len(errors),
+            "errors": errors
+        }
+        
+    def add_book_copies(self, book_id: UUID, num_copies: int):
+        try:
+            copies = self.book_copy_crud.create_book_copies(book_id, num_copies, commit=False)
+            # New copies go to readers waiting for the book first; this commits the copies too
+            reserved = set(self.hold_crud.fill_holds(book_id, num_copies))
+            return [copy.model_copy(update={"status": "reserved"}) if copy.copy_id in reserved else copy for copy in copies]
+        except CRUDException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+        
+    def get_catalog_etag(self, *parts) -> str:
+        """
+        Returns the ETag of a catalog response shaped by `parts` at the current catalog version.
+        """
+        try:
+            return make_etag(self.book_crud.get_catalog_version(), *parts)
+        except CRUDException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
     def get_book(self, book_id: UUID):
         try:
             return self.book_crud.get_book(book_id)
         except CRUDException as e:
             raise HTTPException(status_code=e.status_code, detail=e.message)
         
-    def get_books(self, limit: int = 10, offset: int = 0):
+    def get_books_batch(self, batch: BookBatchPost):
+        try:
+            books, missing = self.book_crud.get_books_batch(batch.book_ids, batch.isbns)
+            return {"books": books, "missing": [str(key) for key in missing]}
+        except CRUDException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    def get_books(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: str | None = None,
+        filters: BookFilters | None = None,
+        facets: bool = False
+    ):
+        try:
+            return self.book_crud.get_books(limit, offset, cursor, filters, facets)
+        except CRUDException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+        
+    def search_books(self, q: str, limit: int = 10, cursor: str | None = None):
         try:
-            return self.book_crud.get_books(limit, offset)
+            return self.book_crud.search_books(q, limit, cursor)
         except CRUDException as e:
             raise HTTPException(status_code=e.status_code, detail=e.message)
         
-    def get_most_borrowed_books(self, limit: int = 10):
+    def suggest(self, prefix: str, limit: int = 10):
+        return suggestion_index.suggest(prefix, limit)
+        
+    def rebuild_suggestion_index(self):
         try:
-            return self.book_crud.get_most_popular_books_last_month(limit)
+            entries = suggestion_index.rebuild(self.book_crud.get_suggestion_sources())
+            return {"entries": entries}
         except CRUDException as e:
             raise HTTPException(status_code=e.status_code, detail=e.message)
         
+    def get_most_borrowed_books(self, limit: int = 10, days: int = 30):
+        try:
+            return self.book_crud.get_most_popular_books(limit, days)
+        except CRUDException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+
+    @staticmethod
+    def export_books(export_format: ExportFormat, compress: bool = False) -> Iterator[bytes]:
+        """
+        Streams the whole catalog as CSV or NDJSON, optionally gzip-compressed.
+
+        The stream reads through its own session, since it outlives the request's one.
+        """
+        db = SessionLocal()
+        try:
+            chunks = encode_export(BookCRUD(db).get_export_rows(), export_format)
+            yield from gzip_chunks(chunks) if compress else chunks
+        except Exception as e:
+            # The status line is already sent, so a failure can only abort the stream
+            logger.error(f"Catalog export aborted: {e}")
+            raise
+        finally:
+            db.close()
+        
         
 def get_book_controller(db: Session = Depends(get_db)):
     return BookController(db)
\ No newline at end of file
@@ -0,0 +1,40 @@
+from uuid import UUID
+from fastapi import Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.crud.hold import HoldCRUD
+from app.exceptions.crud_exception import CRUDException
+
+
+class HoldController:
+    def __init__(self, db: Session):
+        self.hold_crud = HoldCRUD(db)
+
+    def place_hold(self, user_id: UUID, book_id: UUID):
+        try:
+            hold = self.hold_crud.place_hold(user_id, book_id)
+            return self.hold_crud.get_hold(hold.hold_id, user_id)
+        except CRUDException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    def get_user_holds(self, user_id: UUID):
+        try:
+            return self.hold_crud.get_user_holds(user_id)
+        except CRUDException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    def get_hold(self, hold_id: UUID, user_id: UUID):
+        try:
+            return self.hold_crud.get_hold(hold_id, user_id)
+        except CRUDException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    def cancel_hold(self, hold_id: UUID, user_id: UUID):
+        try:
+            return self.hold_crud.cancel_hold(hold_id, user_id)
+        except CRUDException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+
+def get_hold_controller(db: Session = Depends(get_db)):
+    return HoldController(db)
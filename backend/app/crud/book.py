@@ -1,25 +1,103 @@
-from datetime import datetime, timedelta, timezone
+import csv
+import html
+import io
+from datetime import timedelta
 from uuid import UUID
-from sqlalchemy import func, desc, and_
+from sqlalchemy import func, desc, delete, and_, or_, tuple_, select, text, cast, Date, Float
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.models.book import Book as BookModel
 from app.models.book_copy import BookCopy
 from app.models.order import Order
+from app.models.book_daily_orders import BookDailyOrders
+from app.schemas.book import BookPost, BookFilters
 from app.config.logger import logger
 from app.exceptions.crud_exception import CRUDException
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.cache import (
+    CacheBackend, get_book_cache, book_cache_key, book_cache_generation, fill_book_cache, invalidate_all_books
+)
+from app.utils.catalog_version import get_catalog_version, mark_catalog_changed
+
+
+# Text search configuration used by books.search_vector
+SEARCH_CONFIG = "english"
+# ts_headline does not escape the text around matches, so it marks them with control
+# characters; the snippet is HTML-escaped before they become <mark> tags
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\x02", "\x03"
+TITLE_HEADLINE_OPTIONS = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, HighlightAll=true"
+DESCRIPTION_HEADLINE_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=30, MinWords=10"
+)
+
+
+# Longest popularity window served from the daily rollup; older buckets are pruned
+POPULARITY_MAX_DAYS = 365
+
+EXPORT_BATCH_SIZE = 2000
+
+# Largest number of buckets returned per facet of the book list
+FACET_LIMIT = 20
+
+# Bulk import: rows are COPY'd into a per-transaction staging table, then merged
+IMPORT_STAGING_SQL = """
+CREATE TEMP TABLE book_import_staging (
+    line_no INT NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    author VARCHAR(255) NOT NULL,
+    isbn VARCHAR(13) NOT NULL,
+    publication_year INT,
+    description TEXT,
+    num_copies INT NOT NULL
+) ON COMMIT DROP
+"""
+IMPORT_COPY_SQL = """
+COPY book_import_staging (line_no, title, author, isbn, publication_year, description, num_copies)
+FROM STDIN WITH (FORMAT csv)
+"""
+IMPORT_MERGE_SQL = """
+WITH ranked AS (
+    SELECT s.*, row_number() OVER (PARTITION BY s.isbn ORDER BY s.line_no) AS occurrence
+    FROM book_import_staging s
+), inserted AS (
+    INSERT INTO books (title, author, isbn, publication_year, description, available_copies)
+    SELECT title, author, isbn, publication_year, description, num_copies
+    FROM ranked
+    WHERE occurrence = 1
+    ON CONFLICT (isbn) DO NOTHING
+    RETURNING book_id, isbn, available_copies
+), copies AS (
+    INSERT INTO book_copies (book_id, status)
+    SELECT i.book_id, 'available'::book_status
+    FROM inserted i, generate_series(1, i.available_copies)
+)
+SELECT r.line_no, r.isbn, r.title, r.author, r.occurrence, i.book_id
+FROM ranked r
+LEFT JOIN inserted i ON i.isbn = r.isbn AND r.occurrence = 1
+ORDER BY r.line_no
+"""
 
 
 class BookCRUD:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, book_cache: CacheBackend | None = None):
         self.db = db
+        self.book_cache = book_cache if book_cache is not None else get_book_cache()
 
-    def create_book(self, book) -> BookModel:
+    def create_book(self, book, commit: bool = True) -> BookModel:
+        """
+        Creates a book. With `commit=False` the row is only flushed, so the caller can add
+        related rows (e.g. its copies) and commit them in the same transaction.
+        """
         try:
             logger.info(f"Creating book with title: {book['title']}")
             db_book = BookModel(**book)
             self.db.add(db_book)
-            self.db.commit()
+            mark_catalog_changed(self.db)
+            if commit:
+                self.db.commit()
+            else:
+                self.db.flush()
             self.db.refresh(db_book)
             return db_book
         except IntegrityError as e:
@@ -31,44 +109,218 @@ class BookCRUD:
             logger.error(f"Error while creating book: {e}")
             raise CRUDException(status_code=500, message="Internal server error")
         
+    def bulk_import_books(self, rows: list[tuple[int, BookPost]]) -> tuple[list[dict], list[dict]]:
+        """
+        Loads a chunk of validated rows with COPY into a staging table and merges it into
+        `books` and `book_copies` in a single transaction.
+
+        Rows whose ISBN already exists, or repeats an earlier row of the chunk, are skipped
+        and reported as conflicts.
+
+        Returns:
+            tuple: The imported books and the per-row conflicts.
+        """
+        try:
+            logger.info(f"Bulk importing {len(rows)} books")
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for line_no, book in rows:
+                writer.writerow([
+                    line_no, book.title, book.author, book.isbn,
+                    book.publication_year, book.description, book.num_copies
+                ])
+            buffer.seek(0)
+
+            with self.db.connection().connection.cursor() as cursor:
+                cursor.execute(IMPORT_STAGING_SQL)
+                cursor.copy_expert(IMPORT_COPY_SQL, buffer)
+            results = self.db.execute(text(IMPORT_MERGE_SQL)).all()
+            mark_catalog_changed(self.db)
+            self.db.commit()
+
+            imported, conflicts = [], []
+            for r in results:
+                if r.book_id is not None:
+                    imported.append({
+                        "line": r.line_no, "book_id": r.book_id, "isbn": r.isbn,
+                        "title": r.title, "author": r.author
+                    })
+                elif r.occurrence > 1:
+                    conflicts.append({"line": r.line_no, "isbn": r.isbn, "error": "Duplicate ISBN within the import"})
+                else:
+                    conflicts.append({"line": r.line_no, "isbn": r.isbn, "error": "Book already exists"})
+            logger.info(f"Bulk import merged {len(imported)} books with {len(conflicts)} conflicts")
+            return imported, conflicts
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while bulk importing books: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+        
+    def get_catalog_version(self) -> int:
+        """
+        Returns the catalog watermark, which changes after every committed catalog change.
+        """
+        try:
+            return get_catalog_version(self.db)
+        except Exception as e:
+            logger.error(f"Error while reading the catalog version: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+        
+    @staticmethod
+    def _book_details(book: BookModel) -> dict:
+        return {
+            "book_id": book.book_id,
+            "title": book.title,
+            "author": book.author,
+            "isbn": book.isbn,
+            "publication_year": book.publication_year,
+            "description": book.description,
+            "available_copies": book.available_copies
+        }
+
     def get_book(self, book_id: UUID):
         logger.info(f"Retrieving book with id: {book_id}")
+        cached = self.book_cache.get(book_cache_key(book_id))
+        if cached is not None:
+            return dict(cached)
+        generation = book_cache_generation(book_id)
         book = self.db.query(BookModel).filter(BookModel.book_id == book_id).first()
-        available_copies = self.db.query(BookCopy).filter(BookCopy.book_id == book_id, BookCopy.status == "available").count()
         if not book:
             raise CRUDException(status_code=404, message="Book not found")
-        return {
-        "book_id": book.book_id,
-        "title": book.title,
-        "author": book.author,
-        "isbn": book.isbn,
-        "publication_year": book.publication_year,
-        "description": book.description,
-        "available_copies": available_copies
-    }
+        book = self._book_details(book)
+        fill_book_cache(self.book_cache, book_id, book, generation)
+        return dict(book)
+
+    def get_books_batch(self, book_ids: list[UUID] | None = None, isbns: list[str] | None = None) -> tuple[list[dict], list]:
+        """
+        Resolves many books by ID or by ISBN. Books by ID are served from the cache
+        first; the rest are fetched with a single query.
+
+        Returns:
+            tuple: The found books in request order (without duplicates) and the
+            requested IDs or ISBNs that match no book.
+        """
+        keys = list(dict.fromkeys(book_ids if book_ids is not None else isbns))
+        logger.info(f"Retrieving a batch of {len(keys)} books by {'id' if book_ids is not None else 'isbn'}")
+        try:
+            found = {}
+            if book_ids is not None:
+                lookup_column = BookModel.book_id
+                for book_id in keys:
+                    cached = self.book_cache.get(book_cache_key(book_id))
+                    if cached is not None:
+                        found[book_id] = dict(cached)
+            else:
+                lookup_column = BookModel.isbn
+            misses = [key for key in keys if key not in found]
+            if misses:
+                # Books looked up by ISBN are not known before the read, so any invalidation skips their fills
+                generations = {key: book_cache_generation(key if book_ids is not None else None) for key in misses}
+                for book in self.db.query(BookModel).filter(lookup_column.in_(misses)):
+                    details = self._book_details(book)
+                    fill_book_cache(self.book_cache, book.book_id, details, generations[details[lookup_column.key]])
+                    found[details[lookup_column.key]] = dict(details)
+            books = [found[key] for key in keys if key in found]
+            missing = [key for key in keys if key not in found]
+            return books, missing
+        except Exception as e:
+            logger.error(f"Error while retrieving a batch of books: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
         
-    def get_books(self, limit: int, offset: int):
-        logger.info(f"Retrieving books with limit: {limit}, offset: {offset}")
+    @staticmethod
+    def _decode_book_cursor(cursor: str) -> tuple[str, UUID]:
         try:
-            # Calculate page number
-            page = (offset // limit) + 1 if limit > 0 else 1
+            position = decode_cursor(cursor)
+            return position["title"], UUID(position["book_id"])
+        except (ValueError, KeyError, TypeError):
+            logger.error(f"Invalid books cursor: {cursor}")
+            raise CRUDException(status_code=400, message="Invalid cursor")
+
+    @staticmethod
+    def _filter_books(query, filters: BookFilters | None):
+        if filters is None:
+            return query
+        if filters.author is not None:
+            query = query.filter(BookModel.author == filters.author)
+        if filters.year_from is not None:
+            query = query.filter(BookModel.publication_year >= filters.year_from)
+        if filters.year_to is not None:
+            query = query.filter(BookModel.publication_year <= filters.year_to)
+        if filters.available is True:
+            # Matches the predicate of the partial index idx_books_available_title_book_id
+            query = query.filter(BookModel.available_copies > 0)
+        elif filters.available is False:
+            query = query.filter(BookModel.available_copies == 0)
+        return query
+
+    def get_book_facets(self, filters: BookFilters | None = None, facet_limit: int = FACET_LIMIT) -> dict:
+        """
+        Counts the books matching `filters` per author and per publication decade with a
+        single GROUPING SETS query, keeping the `facet_limit` largest buckets of each facet.
+        """
+        decade = (BookModel.publication_year // 10 * 10).label("decade")
+        by_decade = func.grouping(BookModel.author).label("by_decade")
+        book_count = func.count().label("book_count")
+        bucket_rank = func.row_number().over(
+            partition_by=func.grouping(BookModel.author),
+            order_by=(func.count().desc(), BookModel.author, decade)
+        ).label("bucket_rank")
+        buckets = self._filter_books(
+            self.db.query(BookModel.author, decade, by_decade, book_count, bucket_rank),
+            filters
+        ).group_by(func.grouping_sets(tuple_(BookModel.author), tuple_(decade))).subquery()
+        rows = self.db.query(buckets).filter(buckets.c.bucket_rank <= facet_limit).order_by(
+            buckets.c.by_decade, buckets.c.bucket_rank
+        ).all()
+
+        facets = {"author": [], "decade": []}
+        for row in rows:
+            if row.by_decade:
+                # Books without a publication year belong to no decade
+                if row.decade is not None:
+                    facets["decade"].append({"value": row.decade, "count": row.book_count})
+            else:
+                facets["author"].append({"value": row.author, "count": row.book_count})
+        return facets
 
-            # Fetch books
-            books = self.db.query(
+    def get_books(
+        self,
+        limit: int,
+        offset: int = 0,
+        cursor: str | None = None,
+        filters: BookFilters | None = None,
+        facets: bool = False
+    ):
+        logger.info(f"Retrieving books with limit: {limit}, offset: {offset}, cursor: {cursor}, filters: {filters}")
+        try:
+            query = self.db.query(
                 BookModel.book_id,
                 BookModel.title,
                 BookModel.author,
                 BookModel.isbn,
                 BookModel.publication_year,
                 BookModel.description,
-                func.count(BookCopy.copy_id).label("available_copies")
-            ).outerjoin(BookCopy, (BookModel.book_id == BookCopy.book_id) & (BookCopy.status == "available")) \
-            .group_by(BookModel.book_id) \
-            .order_by(BookModel.title) \
-            .limit(limit) \
-            .offset(offset) \
-            .all()
-            
+                BookModel.available_copies
+            )
+            query = self._filter_books(query, filters)
+
+            if cursor:
+                # Seek past the last row of the previous page on (title, book_id)
+                title, book_id = self._decode_book_cursor(cursor)
+                query = query.filter(tuple_(BookModel.title, BookModel.book_id) > (title, book_id))
+                page = None
+            else:
+                page = (offset // limit) + 1 if limit > 0 else 1
+
+            # Fetch one extra row to find out whether there is a next page
+            query = query.order_by(BookModel.title, BookModel.book_id).limit(limit + 1)
+            if not cursor:
+                query = query.offset(offset)
+            books = query.all()
+
+            has_next = len(books) > limit
+            books = books[:limit]
+
             books_list = [
                 {
                     "book_id": book.book_id,
@@ -82,50 +334,174 @@ class BookCRUD:
                 for book in books
             ]
 
-            # Check for next page
-            has_next = False
-            if books:
-                next_books = self.db.query(BookModel.book_id) \
-                    .outerjoin(BookCopy, (BookModel.book_id == BookCopy.book_id) & (BookCopy.status == "available")) \
-                    .group_by(BookModel.book_id) \
-                    .order_by(BookModel.title) \
-                    .limit(1) \
-                    .offset(offset + limit) \
-                    .first()
-                has_next = next_books is not None
+            next_cursor = None
+            if has_next and books:
+                next_cursor = encode_cursor({"title": books[-1].title, "book_id": str(books[-1].book_id)})
 
-            return {
+            result = {
                 "books": books_list,
                 "page": page,
-                "has_next": has_next
+                "has_next": has_next,
+                "next_cursor": next_cursor
             }
+            if facets:
+                result["facets"] = self.get_book_facets(filters)
+            return result
+        except CRUDException as e:
+            raise e
         except Exception as e:
             logger.error(f"Error while retrieving books: {e}")
             raise CRUDException(status_code=500, message="Internal server error")
         
-    def get_most_popular_books_last_month(self, limit: int = 10):
+    def search_books(self, q: str, limit: int = 10, cursor: str | None = None):
         """
-        Returns the most popular books based on orders within the last 30 days.
+        Full-text search over title, author and description, ordered by relevance.
+
+        Pages are keyset-paginated on (rank, book_id); pass the returned `next_cursor`
+        as `cursor` to fetch the next page.
         """
+        logger.info(f"Searching books for: {q!r} with limit: {limit}, cursor: {cursor}")
         try:
-            logger.info("Fetching most popular books (last month)")
-            last_month_date = datetime.now(timezone.utc) - timedelta(days=30)
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+            # ts_rank_cd returns real; the cursor's rank only compares equal in double precision
+            rank = cast(func.ts_rank_cd(BookModel.search_vector, ts_query), Float(precision=53))
+
+            query = self.db.query(
+                BookModel.book_id,
+                BookModel.title,
+                BookModel.author,
+                BookModel.isbn,
+                BookModel.publication_year,
+                BookModel.available_copies,
+                rank.label("rank"),
+                func.ts_headline(SEARCH_CONFIG, BookModel.title, ts_query, TITLE_HEADLINE_OPTIONS).label("title_highlight"),
+                func.ts_headline(
+                    SEARCH_CONFIG, func.coalesce(BookModel.description, ""), ts_query, DESCRIPTION_HEADLINE_OPTIONS
+                ).label("description_highlight")
+            ).filter(BookModel.search_vector.op("@@")(ts_query))
+
+            if cursor:
+                last_rank, last_book_id = self._decode_search_cursor(cursor)
+                query = query.filter(or_(
+                    rank < last_rank,
+                    and_(rank == last_rank, BookModel.book_id > last_book_id)
+                ))
+
+            books = query.order_by(desc(rank), BookModel.book_id).limit(limit + 1).all()
+
+            has_next = len(books) > limit
+            books = books[:limit]
+
+            next_cursor = None
+            if has_next and books:
+                next_cursor = encode_cursor({"rank": books[-1].rank, "book_id": str(books[-1].book_id)})
+
+            return {
+                "books": [
+                    {
+                        "book_id": book.book_id,
+                        "title": book.title,
+                        "author": book.author,
+                        "isbn": book.isbn,
+                        "publication_year": book.publication_year,
+                        "available_copies": book.available_copies,
+                        "rank": book.rank,
+                        "title_highlight": self._highlight_html(book.title_highlight),
+                        "description_highlight": self._highlight_html(book.description_highlight)
+                    }
+                    for book in books
+                ],
+                "has_next": has_next,
+                "next_cursor": next_cursor
+            }
+        except CRUDException as e:
+            raise e
+        except Exception as e:
+            logger.error(f"Error while searching books: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    @staticmethod
+    def _highlight_html(snippet: str | None) -> str | None:
+        """
+        Turns a ts_headline snippet into HTML: the book text is escaped, matches are
+        wrapped in <mark>.
+        """
+        if snippet is None:
+            return None
+        return html.escape(snippet).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+
+    @staticmethod
+    def _decode_search_cursor(cursor: str) -> tuple[float, UUID]:
+        try:
+            position = decode_cursor(cursor)
+            return float(position["rank"]), UUID(position["book_id"])
+        except (ValueError, KeyError, TypeError):
+            logger.error(f"Invalid search cursor: {cursor}")
+            raise CRUDException(status_code=400, message="Invalid cursor")
+        
+    def get_suggestion_sources(self):
+        """
+        Streams `(book_id, title, author)` rows for building the typeahead index.
+        """
+        try:
+            logger.info("Streaming book titles and authors for the typeahead index")
+            return self.db.query(BookModel.book_id, BookModel.title, BookModel.author).yield_per(5000)
+        except Exception as e:
+            logger.error(f"Error while streaming typeahead sources: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+        
+    def get_export_rows(self, batch_size: int = EXPORT_BATCH_SIZE):
+        """
+        Streams every book with its availability count through a server-side cursor,
+        `batch_size` rows at a time, in title order.
+        """
+        try:
+            logger.info("Streaming the catalog for export")
+            return self.db.query(
+                BookModel.book_id,
+                BookModel.isbn,
+                BookModel.title,
+                BookModel.author,
+                BookModel.publication_year,
+                BookModel.description,
+                BookModel.available_copies
+            ).order_by(BookModel.title, BookModel.book_id).yield_per(batch_size)
+        except Exception as e:
+            logger.error(f"Error while streaming the catalog export: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def get_most_popular_books(self, limit: int = 10, days: int = 30):
+        """
+        Returns the most popular books based on orders within the last `days` days.
+
+        Reads the daily per-book rollup, so the cost depends on the window, not on the
+        number of orders.
+        """
+        try:
+            logger.info(f"Fetching most popular books (last {days} days)")
+            since = func.current_date() - (days - 1)
+
+            totals = (
+                self.db.query(
+                    BookDailyOrders.book_id,
+                    func.sum(BookDailyOrders.order_count).label("recent_orders")
+                )
+                .filter(BookDailyOrders.order_day >= since)
+                .group_by(BookDailyOrders.book_id)
+                .order_by(desc("recent_orders"))
+                .limit(limit)
+                .subquery()
+            )
 
             results = (
                 self.db.query(
                     BookModel.book_id,
                     BookModel.title,
                     BookModel.author,
-                    func.count(Order.order_id).label("recent_orders")
+                    totals.c.recent_orders
                 )
-                .join(BookCopy, BookCopy.book_id == BookModel.book_id)
-                .join(Order, and_(
-                    Order.copy_id == BookCopy.copy_id,
-                    Order.order_date >= last_month_date
-                ))
-                .group_by(BookModel.book_id)
-                .order_by(desc("recent_orders"))
-                .limit(limit)
+                .join(totals, totals.c.book_id == BookModel.book_id)
+                .order_by(desc("recent_orders"), BookModel.title)
                 .all()
             )
 
@@ -139,6 +515,98 @@ class BookCRUD:
                 for r in results
             ]
         except Exception as e:
-            logger.error(f"Error fetching most popular books (last month): {e}")
+            logger.error(f"Error fetching most popular books (last {days} days): {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def rebuild_popularity_rollup(self, days: int = POPULARITY_MAX_DAYS) -> int:
+        """
+        Recomputes the daily order rollup for the last `days` days from the orders table
+        and drops buckets older than the retention window.
+
+        Returns the number of buckets written.
+        """
+        try:
+            logger.info(f"Rebuilding popularity rollup for the last {days} days")
+            today = self.db.scalar(select(func.current_date()))
+            # Literal bounds let the planner prune the order partitions outside the window
+            since = today - timedelta(days=days - 1)
+            order_day = cast(Order.order_date, Date)
+
+            self.db.query(BookDailyOrders).filter(
+                or_(BookDailyOrders.order_day >= since, BookDailyOrders.order_day < today - timedelta(days=POPULARITY_MAX_DAYS - 1))
+            ).delete(synchronize_session=False)
+            rebuilt = insert(BookDailyOrders).from_select(
+                ["book_id", "order_day", "order_count"],
+                select(BookCopy.book_id, order_day, func.count(Order.order_id))
+                .join(Order, Order.copy_id == BookCopy.copy_id)
+                .where(Order.order_date >= since)
+                .group_by(BookCopy.book_id, order_day)
+            )
+            # Checkouts committed meanwhile may have recreated a bucket; the recount wins
+            written = self.db.execute(
+                rebuilt.on_conflict_do_update(
+                    index_elements=[BookDailyOrders.book_id, BookDailyOrders.order_day],
+                    set_={"order_count": rebuilt.excluded.order_count}
+                )
+            ).rowcount
+            self.db.commit()
+            logger.info(f"Popularity rollup rebuilt with {written} buckets")
+            return written
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while rebuilding popularity rollup: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def prune_popularity_rollup(self, batch_size: int) -> int:
+        """
+        Deletes up to `batch_size` daily order buckets older than the `POPULARITY_MAX_DAYS`
+        window and commits.
+
+        Returns:
+            int: The number of buckets deleted.
+        """
+        try:
+            today = self.db.scalar(select(func.current_date()))
+            expired = select(BookDailyOrders.book_id, BookDailyOrders.order_day).where(
+                BookDailyOrders.order_day < today - timedelta(days=POPULARITY_MAX_DAYS - 1)
+            ).limit(batch_size).with_for_update(skip_locked=True)
+            deleted = self.db.execute(
+                delete(BookDailyOrders)
+                .where(tuple_(BookDailyOrders.book_id, BookDailyOrders.order_day).in_(expired))
+                .returning(BookDailyOrders.book_id)
+            ).scalars().all()
+            self.db.commit()
+            return len(deleted)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while pruning popularity rollup: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def recompute_available_copies(self, book_id: UUID | None = None) -> int:
+        """
+        Repairs `books.available_copies` from the actual copy statuses.
+
+        Only rows whose counter has drifted are rewritten. Returns the number of books repaired.
+        """
+        try:
+            logger.info(f"Recomputing available copies for book: {book_id or 'all'}")
+            actual = (
+                select(func.count(BookCopy.copy_id))
+                .where(BookCopy.book_id == BookModel.book_id, BookCopy.status == "available")
+                .scalar_subquery()
+            )
+            query = self.db.query(BookModel).filter(BookModel.available_copies != actual)
+            if book_id:
+                query = query.filter(BookModel.book_id == book_id)
+            repaired = query.update({BookModel.available_copies: actual}, synchronize_session=False)
+            if repaired:
+                mark_catalog_changed(self.db)
+            self.db.commit()
+            if repaired:
+                invalidate_all_books(self.book_cache)
+            logger.info(f"Repaired available copies for {repaired} books")
+            return repaired
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while recomputing available copies: {e}")
             raise CRUDException(status_code=500, message="Internal server error")
-    
\ No newline at end of file
@@ -1,10 +1,14 @@
 from uuid import UUID
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.models.book_copy import BookCopy as BookCopyModel
+from app.models.book import Book as BookModel
 from app.schemas.book_copy import BookCopy, BookCopyBase
 from app.config.logger import logger
 from app.exceptions.crud_exception import CRUDException
+from app.utils.cache import mark_book_changed
+from app.utils.catalog_version import mark_catalog_changed
 
 
 class BookCopyCRUD:
@@ -16,6 +20,8 @@ class BookCopyCRUD:
             logger.info(f"Creating book copy for book_id: {book_copy.book_id}")
             db_book_copy = BookCopyModel(**book_copy.model_dump())
             self.db.add(db_book_copy)
+            if book_copy.status == "available":
+                self.adjust_available_copies(book_copy.book_id, 1)
             self.db.commit()
             self.db.refresh(db_book_copy)
             return db_book_copy
@@ -23,7 +29,37 @@ class BookCopyCRUD:
             self.db.rollback()
             logger.error(f"Error while creating book copy: {e}")
             raise CRUDException(status_code=500, message="Internal server error")
-        
+
+    def create_book_copies(self, book_id: UUID, count: int, status: str = "available", commit: bool = True) -> list[BookCopy]:
+        """
+        Creates `count` copies of a book with a single multi-row INSERT ... RETURNING.
+
+        With `commit=False` the caller owns the transaction, e.g. to create the copies
+        together with the book itself.
+        """
+        try:
+            logger.info(f"Creating {count} book copies for book_id: {book_id}")
+            created = self.db.scalars(
+                insert(BookCopyModel)
+                .values([{"book_id": book_id, "status": status}] * count)
+                .returning(BookCopyModel)
+            ).all()
+            # Snapshot the returned rows so they need no reload once the commit expires them
+            copies = [BookCopy.model_validate(copy) for copy in created]
+            if status == "available":
+                self.adjust_available_copies(book_id, count)
+            if commit:
+                self.db.commit()
+            return copies
+        except IntegrityError as e:
+            self.db.rollback()
+            logger.error(f"Integrity error while creating book copies: {e}")
+            raise CRUDException(status_code=404, message="Book not found")
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while creating book copies: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
     def get_available_copies(self, book_id: UUID) -> list[BookCopyModel]:
         try:
             logger.info(f"Fetching available copies for book_id: {book_id}")
@@ -35,17 +71,21 @@ class BookCopyCRUD:
         except Exception as e:
             logger.error(f"Error while fetching available copies: {e}")
             raise CRUDException(status_code=500, message="Internal server error")
-        
+
     def update_book_copy_status(self, copy_id: UUID, status: str) -> BookCopyModel:
         try:
             logger.info(f"Updating status of book copy {copy_id} to {status}")
-            book_copy = self.db.query(BookCopyModel).filter(BookCopyModel.copy_id == copy_id).first()
+            # Lock the copy so concurrent status changes cannot skew the availability counter
+            book_copy = self.db.query(BookCopyModel).filter(BookCopyModel.copy_id == copy_id).with_for_update().first()
             if not book_copy:
                 raise CRUDException(status_code=404, message="Book copy not found")
-            book_copy.status = status
+            self.set_book_copy_status(book_copy, status)
             self.db.commit()
             self.db.refresh(book_copy)
             return book_copy
+        except CRUDException as e:
+            self.db.rollback()
+            raise e
         except IntegrityError as e:
             self.db.rollback()
             logger.error(f"Integrity error while updating book copy status: {e}")
@@ -53,4 +93,27 @@ class BookCopyCRUD:
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error while updating book copy status: {e}")
-            raise CRUDException(status_code=500, message="Internal server error")
\ No newline at end of file
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def set_book_copy_status(self, book_copy: BookCopyModel, status: str) -> None:
+        """
+        Changes the status of a locked copy and keeps `books.available_copies` in step,
+        without committing. The caller owns the transaction.
+        """
+        delta = int(status == "available") - int(book_copy.status == "available")
+        book_copy.status = status
+        self.adjust_available_copies(book_copy.book_id, delta)
+
+    def adjust_available_copies(self, book_id: UUID, delta: int) -> None:
+        """
+        Shifts the availability counter of a book by `delta` within the current transaction.
+        The cached details of the book are invalidated when the transaction commits.
+        """
+        if not delta:
+            return
+        mark_book_changed(self.db, book_id)
+        mark_catalog_changed(self.db)
+        self.db.query(BookModel).filter(BookModel.book_id == book_id).update(
+            {BookModel.available_copies: BookModel.available_copies + delta},
+            synchronize_session=False
+        )
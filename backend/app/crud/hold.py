@@ -0,0 +1,253 @@
+import os
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.models.hold import Hold as HoldModel
+from app.models.book import Book as BookModel
+from app.models.book_copy import BookCopy as BookCopyModel
+from app.crud.book_copy import BookCopyCRUD
+from app.config.logger import logger
+from app.exceptions.crud_exception import CRUDException
+
+# How long a reserved copy waits for its holder before the hold expires
+HOLD_PICKUP_HOURS = int(os.getenv("HOLD_PICKUP_HOURS", 72))
+
+
+class HoldCRUD:
+    def __init__(self, db: Session):
+        self.db = db
+        self.book_copy_crud = BookCopyCRUD(db)
+
+    def place_hold(self, user_id: UUID, book_id: UUID) -> HoldModel:
+        try:
+            logger.info(f"Placing hold on book {book_id} for user {user_id}")
+            available = self.db.query(BookModel.available_copies).filter(BookModel.book_id == book_id).scalar()
+            if available is None:
+                raise CRUDException(status_code=404, message="Book not found")
+            if available > 0:
+                raise CRUDException(status_code=409, message="Copies of this book are available, check one out instead")
+            hold = HoldModel(user_id=user_id, book_id=book_id)
+            self.db.add(hold)
+            self.db.commit()
+            self.db.refresh(hold)
+            return hold
+        except CRUDException as e:
+            raise e
+        except IntegrityError as e:
+            self.db.rollback()
+            logger.error(f"Integrity error while placing hold: {e}")
+            raise CRUDException(status_code=409, message="You already have an active hold on this book")
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while placing hold: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def get_queue_position(self, hold: HoldModel) -> int | None:
+        """
+        Returns the 1-based queue position of a waiting hold, counted on the queue index.
+        """
+        if hold.status != "waiting":
+            return None
+        ahead = self.db.query(func.count(HoldModel.hold_id)).filter(
+            HoldModel.book_id == hold.book_id,
+            HoldModel.status == "waiting",
+            tuple_(HoldModel.created_at, HoldModel.hold_id) < (hold.created_at, hold.hold_id)
+        ).scalar()
+        return ahead + 1
+
+    def get_user_holds(self, user_id: UUID) -> list[dict]:
+        try:
+            logger.info(f"Fetching active holds of user {user_id}")
+            holds = self.db.query(HoldModel).filter(
+                HoldModel.user_id == user_id,
+                HoldModel.status.in_(("waiting", "ready"))
+            ).order_by(HoldModel.created_at).all()
+            return [self._hold_row(hold) for hold in holds]
+        except Exception as e:
+            logger.error(f"Error while fetching holds of user {user_id}: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def get_hold(self, hold_id: UUID, user_id: UUID) -> dict:
+        try:
+            hold = self.db.query(HoldModel).filter(HoldModel.hold_id == hold_id, HoldModel.user_id == user_id).first()
+            if not hold:
+                raise CRUDException(status_code=404, message="Hold not found")
+            return self._hold_row(hold)
+        except CRUDException as e:
+            raise e
+        except Exception as e:
+            logger.error(f"Error while fetching hold {hold_id}: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def _hold_row(self, hold: HoldModel) -> dict:
+        return {
+            "hold_id": hold.hold_id,
+            "book_id": hold.book_id,
+            "user_id": hold.user_id,
+            "copy_id": hold.copy_id,
+            "status": hold.status,
+            "created_at": hold.created_at,
+            "ready_at": hold.ready_at,
+            "expires_at": hold.expires_at,
+            "position": self.get_queue_position(hold)
+        }
+
+    def cancel_hold(self, hold_id: UUID, user_id: UUID) -> HoldModel:
+        try:
+            logger.info(f"Cancelling hold {hold_id} of user {user_id}")
+            hold = self.db.query(HoldModel).filter(
+                HoldModel.hold_id == hold_id,
+                HoldModel.user_id == user_id
+            ).with_for_update().first()
+            if not hold:
+                raise CRUDException(status_code=404, message="Hold not found")
+            if hold.status not in ("waiting", "ready"):
+                raise CRUDException(status_code=409, message="Hold is no longer active")
+            if hold.status == "ready" and hold.copy_id:
+                self._release_reserved_copy(hold)
+            hold.status = "cancelled"
+            self.db.commit()
+            self.db.refresh(hold)
+            return hold
+        except CRUDException as e:
+            self.db.rollback()
+            raise e
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while cancelling hold {hold_id}: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def promote_holds(self, book_id: UUID, limit: int) -> list[UUID]:
+        """
+        Reserves up to `limit` available copies of a book for its oldest waiting holds,
+        flushing pending changes first but without committing. Both sides are locked with SKIP LOCKED, so concurrent
+        promotions and checkouts never pair the same hold or copy twice.
+
+        Returns:
+            list[UUID]: The IDs of the copies that were reserved.
+        """
+        if limit <= 0:
+            return []
+        # Sessions do not autoflush: a copy the caller just released must reach the
+        # database before it can be found available below
+        self.db.flush()
+        holds = self.db.query(HoldModel).filter(
+            HoldModel.book_id == book_id,
+            HoldModel.status == "waiting"
+        ).order_by(HoldModel.created_at, HoldModel.hold_id).limit(limit).with_for_update(skip_locked=True).all()
+        if not holds:
+            return []
+        copies = self.db.query(BookCopyModel).filter(
+            BookCopyModel.book_id == book_id,
+            BookCopyModel.status == "available"
+        ).limit(len(holds)).with_for_update(skip_locked=True).all()
+
+        now = datetime.now(timezone.utc)
+        reserved = []
+        for hold, book_copy in zip(holds, copies):
+            self.book_copy_crud.set_book_copy_status(book_copy, "reserved")
+            hold.status = "ready"
+            hold.copy_id = book_copy.copy_id
+            hold.ready_at = now
+            hold.expires_at = now + timedelta(hours=HOLD_PICKUP_HOURS)
+            reserved.append(book_copy.copy_id)
+        if reserved:
+            logger.info(f"Reserved {len(reserved)} copies of book {book_id} for waiting holds")
+        return reserved
+
+    def fill_holds(self, book_id: UUID, limit: int) -> list[UUID]:
+        """
+        Commits `promote_holds`, e.g. after new copies of a book were added.
+        """
+        try:
+            reserved = self.promote_holds(book_id, limit)
+            self.db.commit()
+            return reserved
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while filling holds of book {book_id}: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def release_copy(self, copy_id: UUID, commit: bool = True) -> bool:
+        """
+        Returns a borrowed copy to circulation: it goes to the next waiting hold of its
+        book if there is one, otherwise back to available. A copy that is not borrowed
+        (e.g. already lent again or reserved for a hold) is left alone. With
+        `commit=False` the caller owns the transaction.
+
+        Returns:
+            bool: Whether the copy was released.
+        """
+        try:
+            logger.info(f"Releasing book copy {copy_id}")
+            book_copy = self.db.query(BookCopyModel).filter(BookCopyModel.copy_id == copy_id).with_for_update().first()
+            if not book_copy:
+                raise CRUDException(status_code=404, message="Book copy not found")
+            if book_copy.status != "borrowed":
+                logger.info(f"Book copy {copy_id} is {book_copy.status}, not releasing it")
+                return False
+            self.book_copy_crud.set_book_copy_status(book_copy, "available")
+            self.promote_holds(book_copy.book_id, 1)
+            if commit:
+                self.db.commit()
+            return True
+        except CRUDException as e:
+            self.db.rollback()
+            raise e
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while releasing book copy {copy_id}: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def _release_reserved_copy(self, hold: HoldModel) -> None:
+        book_copy = self.db.query(BookCopyModel).filter(BookCopyModel.copy_id == hold.copy_id).with_for_update().first()
+        if book_copy and book_copy.status == "reserved":
+            self.book_copy_crud.set_book_copy_status(book_copy, "available")
+            self.promote_holds(book_copy.book_id, 1)
+
+    def claim_ready_hold(self, user_id: UUID, book_id: UUID) -> BookCopyModel | None:
+        """
+        Marks the reader's ready hold on a book as fulfilled and returns its locked,
+        reserved copy, without committing. Returns None if there is no ready hold.
+        """
+        hold = self.db.query(HoldModel).filter(
+            HoldModel.user_id == user_id,
+            HoldModel.book_id == book_id,
+            HoldModel.status == "ready"
+        ).with_for_update().first()
+        if not hold or not hold.copy_id:
+            return None
+        book_copy = self.db.query(BookCopyModel).filter(
+            BookCopyModel.copy_id == hold.copy_id,
+            BookCopyModel.status == "reserved"
+        ).with_for_update().first()
+        if not book_copy:
+            return None
+        hold.status = "fulfilled"
+        return book_copy
+
+    def expire_holds(self, batch_size: int) -> int:
+        """
+        Expires up to `batch_size` ready holds past their pickup deadline and passes
+        their copies on to the next holders. Commits once.
+
+        Returns:
+            int: The number of holds expired.
+        """
+        try:
+            holds = self.db.query(HoldModel).filter(
+                HoldModel.status == "ready",
+                HoldModel.expires_at < func.now()
+            ).order_by(HoldModel.expires_at).limit(batch_size).with_for_update(skip_locked=True).all()
+            for hold in holds:
+                hold.status = "expired"
+                if hold.copy_id:
+                    self._release_reserved_copy(hold)
+            self.db.commit()
+            return len(holds)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while expiring holds: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
@@ -0,0 +1,129 @@
+import os
+from datetime import timedelta
+from typing import Any
+from sqlalchemy import delete, func, or_, and_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.idempotency_key import IdempotencyKey
+from app.config.logger import logger
+from app.exceptions.crud_exception import CRUDException
+
+# How long the outcome of a request is replayed to retries with the same key
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+# A request still running after this long is presumed dead and its key may be reclaimed
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 60))
+
+
+class IdempotencyCRUD:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def reserve(self, key_hash: bytes, request_hash: bytes):
+        """
+        Claims a key for a request about to run, or returns the stored outcome (a row of
+        `status_code` and `response_body`) of an earlier request with the same key.
+        Expired keys and keys of requests presumed dead are reclaimed. The claim is
+        committed before the request runs.
+
+        Raises:
+            CRUDException: 409 if a request with the key is still running, 422 if the key
+            was used for a different request.
+        """
+        try:
+            now = func.localtimestamp()
+            claim = insert(IdempotencyKey).values(
+                key_hash=key_hash,
+                request_hash=request_hash,
+                expires_at=now + timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS)
+            )
+            claim = claim.on_conflict_do_update(
+                index_elements=[IdempotencyKey.key_hash],
+                set_={
+                    "request_hash": claim.excluded.request_hash,
+                    "status_code": None,
+                    "response_body": None,
+                    "created_at": now,
+                    "expires_at": claim.excluded.expires_at,
+                },
+                where=or_(
+                    IdempotencyKey.expires_at <= now,
+                    and_(
+                        IdempotencyKey.status_code.is_(None),
+                        IdempotencyKey.created_at < now - timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)
+                    )
+                )
+            ).returning(IdempotencyKey.key_hash)
+            claimed = self.db.execute(claim).first()
+            self.db.commit()
+            if claimed:
+                return None
+
+            stored = self.db.execute(
+                select(IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body)
+                .where(IdempotencyKey.key_hash == key_hash)
+            ).first()
+            if stored is not None and bytes(stored.request_hash) != request_hash:
+                raise CRUDException(status_code=422, message="Idempotency-Key was already used for a different request")
+            if stored is None or stored.status_code is None:
+                raise CRUDException(status_code=409, message="A request with this Idempotency-Key is in progress")
+            logger.info("Replaying stored response for an idempotency key")
+            return stored
+        except CRUDException as e:
+            raise e
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while reserving idempotency key: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def complete(self, key_hash: bytes, status_code: int, body: Any) -> None:
+        """
+        Stores the outcome of the request holding a key and commits.
+        """
+        try:
+            self.db.query(IdempotencyKey).filter(IdempotencyKey.key_hash == key_hash).update(
+                {IdempotencyKey.status_code: status_code, IdempotencyKey.response_body: body},
+                synchronize_session=False
+            )
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while storing idempotent response: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def release(self, key_hash: bytes) -> None:
+        """
+        Drops the claim of a request that failed unexpectedly, so a retry runs it again.
+        """
+        try:
+            self.db.rollback()
+            self.db.query(IdempotencyKey).filter(
+                IdempotencyKey.key_hash == key_hash,
+                IdempotencyKey.status_code.is_(None)
+            ).delete(synchronize_session=False)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while releasing idempotency key: {e}")
+
+    def purge_expired(self, batch_size: int) -> int:
+        """
+        Deletes up to `batch_size` expired keys and commits.
+
+        Returns:
+            int: The number of keys deleted.
+        """
+        try:
+            expired = select(IdempotencyKey.key_hash).where(
+                IdempotencyKey.expires_at <= func.localtimestamp()
+            ).limit(batch_size).with_for_update(skip_locked=True)
+            deleted = self.db.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.key_hash.in_(expired.scalar_subquery()))
+                .returning(IdempotencyKey.key_hash)
+            ).scalars().all()
+            self.db.commit()
+            return len(deleted)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while purging idempotency keys: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
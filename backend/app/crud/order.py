@@ -1,13 +1,21 @@
+from collections import Counter
 from uuid import UUID
+from datetime import datetime
+from sqlalchemy import func, select, literal, update, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.models.order import Order as OrderModel
 from app.models.book_copy import BookCopy
 from app.models.book import Book as BookModel
 from app.models.user import User as UserModel
+from app.models.book_daily_orders import BookDailyOrders
+from app.crud.book_copy import BookCopyCRUD
+from app.crud.hold import HoldCRUD
 from app.schemas.order import Order, OrderBase
 from app.config.logger import logger
 from app.exceptions.crud_exception import CRUDException
+from app.utils.pagination import encode_cursor, decode_cursor
 
 
 class OrderCRUD:
@@ -19,6 +27,7 @@ class OrderCRUD:
             logger.info(f"Creating order")
             db_order = OrderModel(**order.model_dump())
             self.db.add(db_order)
+            self.record_daily_order(order.copy_id)
             self.db.commit()
             self.db.refresh(db_order)
             return db_order
@@ -27,154 +36,318 @@ class OrderCRUD:
             logger.error(f"Error while creating order: {e}")
             raise CRUDException(status_code=500, message="Internal server error")
         
-    def get_all_active_orders(self, limit: int, offset: int):
+    def checkout(self, user_id: UUID, book_id: UUID, order_type: str, due_date: datetime | None = None) -> OrderModel:
+        """
+        Claims a copy of a book and creates the order for it in one transaction. A copy
+        reserved for the reader's ready hold is used first, otherwise an available one.
+
+        An available copy is picked with `FOR UPDATE SKIP LOCKED`, so concurrent checkouts of the
+        same book each lock a different copy instead of queueing behind (or double-booking)
+        the same one.
+        """
         try:
-            logger.info(f"Fetching active orders with limit {limit} and offset {offset}")
-            
-            page = (offset // limit) + 1 if limit > 0 else 1
+            logger.info(f"Checking out book {book_id} for user {user_id}")
+            # A copy reserved for the reader's ready hold takes precedence
+            book_copy = HoldCRUD(self.db).claim_ready_hold(user_id, book_id)
+            if not book_copy:
+                book_copy = self.db.query(BookCopy).filter(
+                    BookCopy.book_id == book_id,
+                    BookCopy.status == "available"
+                ).limit(1).with_for_update(skip_locked=True).first()
+            if not book_copy:
+                raise CRUDException(status_code=404, message="No available copies for this book")
 
-            orders = self.db.query(
-                OrderModel.order_id,
-                UserModel.username.label("username"),  
-                OrderModel.copy_id,
-                OrderModel.order_type,
-                OrderModel.order_date,
-                OrderModel.due_date,
-                OrderModel.return_date,
-                OrderModel.status,
-                BookModel.title.label("book_title"),
-            ).outerjoin(
-                BookCopy, OrderModel.copy_id == BookCopy.copy_id
-            ).outerjoin(
-                BookModel, BookCopy.book_id == BookModel.book_id
-            ).outerjoin(
-                UserModel, OrderModel.user_id == UserModel.user_id  
-            ).filter(
-                OrderModel.status != "completed"
-            ).order_by(
-                OrderModel.order_date.desc()
-            ).limit(limit).offset(offset).all()
-
-            orders_list = [
-                {
-                    "order_id": order.order_id,
-                    "username": order.username,  
-                    "copy_id": order.copy_id,
-                    "order_type": order.order_type,
-                    "order_date": order.order_date.isoformat() if order.order_date else None,
-                    "due_date": order.due_date.isoformat() if order.due_date else None,
-                    "return_date": order.return_date.isoformat() if order.return_date else None,
-                    "status": order.status,
-                    "book_title": order.book_title
-                }
-                for order in orders
-            ]
-
-            has_next = False
-            if orders:
-                next_order = self.db.query(OrderModel.order_id) \
-                    .outerjoin(BookCopy, OrderModel.copy_id == BookCopy.copy_id) \
-                    .outerjoin(BookModel, BookCopy.book_id == BookModel.book_id) \
-                    .outerjoin(UserModel, OrderModel.user_id == UserModel.user_id) \
-                    .filter(
-                        OrderModel.status != "completed"
-                    ).order_by(
-                        OrderModel.order_date.desc()
-                    ).limit(1).offset(offset + limit).first()
-
-                has_next = next_order is not None
-
-            return {
-                "orders": orders_list,
-                "page": page,
-                "has_next": has_next
-            }
-            
+            BookCopyCRUD(self.db).set_book_copy_status(book_copy, "borrowed")
+            db_order = OrderModel(user_id=user_id, copy_id=book_copy.copy_id, order_type=order_type, due_date=due_date)
+            self.db.add(db_order)
+            self.record_daily_order(book_copy.copy_id)
+            self.db.commit()
+            self.db.refresh(db_order)
+            return db_order
+        except CRUDException as e:
+            self.db.rollback()
+            raise e
+        except IntegrityError as e:
+            self.db.rollback()
+            logger.error(f"Integrity error while checking out book {book_id}: {e}")
+            raise CRUDException(status_code=400, message="Invalid order")
         except Exception as e:
-            logger.error(f"Error while fetching active orders: {e}")
+            self.db.rollback()
+            logger.error(f"Error while checking out book {book_id}: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def mark_overdue_orders(self, batch_size: int) -> int:
+        """
+        Marks up to `batch_size` pending orders past their due date as overdue and commits.
+
+        Rows locked by concurrent transactions are skipped, so a batch never waits on
+        (or holds up) checkouts and returns.
+
+        Returns:
+            int: The number of orders marked as overdue.
+        """
+        try:
+            due = select(OrderModel.order_id).where(
+                *self._active_order_filters(),
+                OrderModel.status == "pending",
+                OrderModel.due_date < func.now()
+            ).limit(batch_size).with_for_update(skip_locked=True)
+            marked = self.db.execute(
+                update(OrderModel)
+                .where(OrderModel.order_id.in_(due.scalar_subquery()))
+                .values(status="overdue")
+                .returning(OrderModel.order_id)
+            ).scalars().all()
+            self.db.commit()
+            return len(marked)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while marking overdue orders: {e}")
             raise CRUDException(status_code=500, message="Internal server error")
+
+    def record_daily_order(self, copy_id: UUID) -> None:
+        """
+        Counts an order for the copy's book in today's popularity bucket, within the
+        current transaction.
+        """
+        bucket = insert(BookDailyOrders).from_select(
+            ["book_id", "order_day", "order_count"],
+            select(BookCopy.book_id, func.current_date(), literal(1)).where(BookCopy.copy_id == copy_id)
+        )
+        self.db.execute(bucket.on_conflict_do_update(
+            index_elements=[BookDailyOrders.book_id, BookDailyOrders.order_day],
+            set_={"order_count": BookDailyOrders.order_count + 1}
+        ))
         
-    def get_orders_by_user(self, username: str, limit: int, offset: int):
+    def _active_order_filters(self) -> list:
+        """
+        Conditions selecting the orders that are not completed yet.
+
+        `orders` is partitioned by month of `order_date`, and older partitions only hold
+        completed orders. The date of the oldest active order is looked up first (on the
+        partial active-order index) and added as a literal bound, so the planner prunes
+        every partition before it instead of probing each one.
+        """
+        conditions = [OrderModel.status != "completed"]
+        oldest = self.db.scalar(select(func.min(OrderModel.order_date)).where(OrderModel.status != "completed"))
+        if oldest is not None:
+            conditions.append(OrderModel.order_date >= oldest)
+        return conditions
+
+    @staticmethod
+    def _order_row(order) -> dict:
+        return {
+            "order_id": order.order_id,
+            "username": order.username,
+            "copy_id": order.copy_id,
+            "order_type": order.order_type,
+            "order_date": order.order_date.isoformat() if order.order_date else None,
+            "due_date": order.due_date.isoformat() if order.due_date else None,
+            "return_date": order.return_date.isoformat() if order.return_date else None,
+            "status": order.status,
+            "book_title": order.book_title
+        }
+
+    def _order_list_query(self):
+        return self.db.query(
+            OrderModel.order_id,
+            UserModel.username.label("username"),
+            OrderModel.copy_id,
+            OrderModel.order_type,
+            OrderModel.order_date,
+            OrderModel.due_date,
+            OrderModel.return_date,
+            OrderModel.status,
+            BookModel.title.label("book_title"),
+        ).outerjoin(
+            UserModel, OrderModel.user_id == UserModel.user_id
+        ).outerjoin(
+            BookCopy, OrderModel.copy_id == BookCopy.copy_id
+        ).outerjoin(
+            BookModel, BookCopy.book_id == BookModel.book_id
+        )
+
+    @staticmethod
+    def _decode_order_cursor(cursor: str) -> tuple[datetime, UUID, str]:
         try:
-            logger.info(f"Fetching orders for username {username} with limit {limit} and offset {offset}")
+            position = decode_cursor(cursor)
+            direction = position["direction"]
+            if direction not in ("next", "prev"):
+                raise ValueError("Invalid cursor direction")
+            return datetime.fromisoformat(position["order_date"]), UUID(position["order_id"]), direction
+        except (ValueError, KeyError, TypeError):
+            logger.error(f"Invalid orders cursor: {cursor}")
+            raise CRUDException(status_code=400, message="Invalid cursor")
+
+    @staticmethod
+    def _encode_order_cursor(order, direction: str) -> str:
+        return encode_cursor({
+            "order_date": order.order_date.isoformat(),
+            "order_id": str(order.order_id),
+            "direction": direction
+        })
+
+    def _paginate_orders(self, query, limit: int, offset: int = 0, cursor: str | None = None) -> dict:
+        """
+        Pages an order list newest first on (order_date, order_id).
 
-            # Calculate page number
+        Without a cursor the page is located by `offset`. A cursor seeks from the edge row
+        of a previous page in the direction it encodes, so paging never scans skipped rows.
+        One extra row is fetched to find out whether there is a further page.
+        """
+        position = (OrderModel.order_date, OrderModel.order_id)
+        direction = "next"
+        if cursor:
+            order_date, order_id, direction = self._decode_order_cursor(cursor)
+            if direction == "next":
+                query = query.filter(tuple_(*position) < (order_date, order_id))
+            else:
+                query = query.filter(tuple_(*position) > (order_date, order_id))
+            page = None
+        else:
             page = (offset // limit) + 1 if limit > 0 else 1
 
-            # Fetch orders (now joining UserModel and filtering by username)
-            orders = self.db.query(
-                OrderModel.order_id,
-                UserModel.username.label("username"),
-                OrderModel.copy_id,
-                OrderModel.order_type,
-                OrderModel.order_date,
-                OrderModel.due_date,
-                OrderModel.return_date,
-                OrderModel.status,
-                BookModel.title.label("book_title"),
-            ).outerjoin(
-                UserModel, OrderModel.user_id == UserModel.user_id
-            ).outerjoin(
-                BookCopy, OrderModel.copy_id == BookCopy.copy_id
-            ).outerjoin(
-                BookModel, BookCopy.book_id == BookModel.book_id
-            ).filter(
-                UserModel.username == username,
-                OrderModel.status != "completed"
-            ).order_by(
-                OrderModel.order_date.desc()
-            ).limit(limit).offset(offset).all()
-
-            orders_list = [
-                {
-                    "order_id": order.order_id,
-                    "username": order.username,
-                    "copy_id": order.copy_id,
-                    "order_type": order.order_type,
-                    "order_date": order.order_date.isoformat() if order.order_date else None,
-                    "due_date": order.due_date.isoformat() if order.due_date else None,
-                    "return_date": order.return_date.isoformat() if order.return_date else None,
-                    "status": order.status,
-                    "book_title": order.book_title
-                }
-                for order in orders
-            ]
-
-            # Check for next page
-            has_next = False
-            if orders:
-                next_order = self.db.query(OrderModel.order_id) \
-                    .outerjoin(UserModel, OrderModel.user_id == UserModel.user_id) \
-                    .outerjoin(BookCopy, OrderModel.copy_id == BookCopy.copy_id) \
-                    .outerjoin(BookModel, BookCopy.book_id == BookModel.book_id) \
-                    .filter(
-                        UserModel.username == username,
-                        OrderModel.status != "completed"
-                    ).order_by(
-                        OrderModel.order_date.desc()
-                    ).limit(1).offset(offset + limit).first()
-
-                has_next = next_order is not None
-
-            return {
-                "orders": orders_list,
-                "page": page,
-                "has_next": has_next
-            }
+        if direction == "next":
+            query = query.order_by(OrderModel.order_date.desc(), OrderModel.order_id.desc()).limit(limit + 1)
+        else:
+            # Walk backwards in ascending order, then restore newest-first order
+            query = query.order_by(OrderModel.order_date.asc(), OrderModel.order_id.asc()).limit(limit + 1)
+        if not cursor:
+            query = query.offset(offset)
+        orders = query.all()
+
+        has_more = len(orders) > limit
+        orders = orders[:limit]
+        if direction == "next":
+            has_next, has_prev = has_more, bool(cursor) or offset > 0
+        else:
+            orders.reverse()
+            has_next, has_prev = True, has_more
 
+        return {
+            "orders": [self._order_row(order) for order in orders],
+            "page": page,
+            "has_next": has_next,
+            "has_prev": has_prev,
+            "next_cursor": self._encode_order_cursor(orders[-1], "next") if has_next and orders else None,
+            "prev_cursor": self._encode_order_cursor(orders[0], "prev") if has_prev and orders else None
+        }
+
+    def get_all_active_orders(self, limit: int, offset: int = 0, cursor: str | None = None):
+        try:
+            logger.info(f"Fetching active orders with limit {limit}, offset {offset} and cursor {cursor}")
+            query = self._order_list_query().filter(*self._active_order_filters())
+            return self._paginate_orders(query, limit, offset, cursor)
+        except CRUDException as e:
+            raise e
+        except Exception as e:
+            logger.error(f"Error while fetching active orders: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+        
+    def get_orders_by_user(self, username: str, limit: int, offset: int = 0, cursor: str | None = None):
+        try:
+            logger.info(f"Fetching orders for username {username} with limit {limit}, offset {offset} and cursor {cursor}")
+            query = self._order_list_query().filter(
+                UserModel.username == username,
+                *self._active_order_filters()
+            )
+            return self._paginate_orders(query, limit, offset, cursor)
+        except CRUDException as e:
+            raise e
         except Exception as e:
             logger.error(f"Error while fetching orders for username {username}: {e}")
             raise CRUDException(status_code=500, message="Internal server error")
 
         
+    def bulk_update_status(
+        self,
+        status: str,
+        order_ids: list[UUID] | None = None,
+        copy_ids: list[UUID] | None = None
+    ) -> list[dict]:
+        """
+        Changes the status of many orders in one transaction with set-based updates.
+
+        Orders are given by ID or by copy, in which case the copy's active order is used.
+        Completing an order makes its copy available again, or reserves it for the next
+        waiting hold on its book.
+
+        Returns:
+            list[dict]: One result per distinct requested ID, in request order, with an
+            `outcome` of "updated", "unchanged" or "not_found".
+        """
+        by_copy = copy_ids is not None
+        keys = list(dict.fromkeys(copy_ids if by_copy else order_ids))
+        logger.info(f"Updating status of {len(keys)} orders by {'copy' if by_copy else 'order'} id to {status}")
+        try:
+            query = self.db.query(OrderModel.order_id, OrderModel.copy_id, OrderModel.status)
+            if by_copy:
+                query = query.filter(OrderModel.copy_id.in_(keys), OrderModel.status != "completed")
+            else:
+                query = query.filter(OrderModel.order_id.in_(keys))
+            # Lock in a stable order so concurrent bulk updates cannot deadlock
+            orders = query.order_by(OrderModel.order_id).with_for_update().all()
+            found = {order.copy_id if by_copy else order.order_id: order for order in orders}
+            changing = [order for order in orders if order.status != status]
+
+            if changing:
+                self.db.execute(
+                    update(OrderModel)
+                    .where(OrderModel.order_id.in_([order.order_id for order in changing]))
+                    .values(status=status)
+                )
+            if changing and status == "completed":
+                released = self.db.execute(
+                    update(BookCopy)
+                    .where(BookCopy.copy_id.in_([order.copy_id for order in changing]), BookCopy.status == "borrowed")
+                    .values(status="available")
+                    .returning(BookCopy.book_id)
+                ).scalars().all()
+                book_copy_crud = BookCopyCRUD(self.db)
+                hold_crud = HoldCRUD(self.db)
+                for book_id, count in sorted(Counter(released).items()):
+                    book_copy_crud.adjust_available_copies(book_id, count)
+                    # Returned copies go straight to readers waiting for them
+                    hold_crud.promote_holds(book_id, count)
+            self.db.commit()
+
+            changed_ids = {order.order_id for order in changing}
+            results = []
+            for key in keys:
+                order = found.get(key)
+                result = {"copy_id" if by_copy else "order_id": key}
+                if order is None:
+                    result["outcome"] = "not_found"
+                else:
+                    result["order_id"] = order.order_id
+                    result["outcome"] = "updated" if order.order_id in changed_ids else "unchanged"
+                results.append(result)
+            return results
+        except IntegrityError as e:
+            self.db.rollback()
+            logger.error(f"Integrity error while updating order statuses: {e}")
+            raise CRUDException(status_code=400, message="Invalid status update")
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while updating order statuses: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
     def update_order_status(self, order_id: UUID, status: str) -> OrderModel:
+        """
+        Changes the status of an order. Completing an order releases its copy to the next
+        waiting hold, or back to available, in the same transaction; completing an order
+        that is already completed changes nothing.
+        """
         try:
             logger.info(f"Updating order status for order_id {order_id} to {status}")
-            order = self.db.query(OrderModel).filter(OrderModel.order_id == order_id).first()
+            order = self.db.query(OrderModel).filter(OrderModel.order_id == order_id).with_for_update().first()
             if not order:
                 raise CRUDException(status_code=404, message="Order not found")
-            
+
+            completing = status == "completed" and order.status != "completed"
             order.status = status
+            if completing:
+                HoldCRUD(self.db).release_copy(order.copy_id, commit=False)
             self.db.commit()
             self.db.refresh(order)
             return order
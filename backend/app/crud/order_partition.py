@@ -0,0 +1,139 @@
+import os
+import re
+from datetime import date, datetime
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+from app.config.logger import logger
+from app.exceptions.crud_exception import CRUDException
+
+# Monthly partitions are created this many months ahead of the current one
+ORDER_PARTITION_MONTHS_AHEAD = int(os.getenv("ORDER_PARTITION_MONTHS_AHEAD", 3))
+# Partitions older than this many months are archived once all their orders are completed (0 keeps everything)
+ORDER_RETENTION_MONTHS = int(os.getenv("ORDER_RETENTION_MONTHS", 24))
+# Archived partitions are moved into this schema as plain tables
+ORDER_ARCHIVE_SCHEMA = "orders_archive"
+# Partition DDL briefly locks the orders table; give up rather than queue behind long transactions
+PARTITION_LOCK_TIMEOUT = os.getenv("ORDER_PARTITION_LOCK_TIMEOUT", "5s")
+
+PARTITION_NAME_PATTERN = re.compile(r"^orders_p(\d{4})_(\d{2})$")
+
+LIST_PARTITIONS_SQL = text("""
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = 'orders'::regclass
+""")
+
+
+def month_start(moment: date) -> date:
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"orders_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name: str) -> date | None:
+    """
+    Returns the month of a monthly orders partition, or None for other tables.
+    """
+    match = PARTITION_NAME_PATTERN.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+class OrderPartitionCRUD:
+    """
+    Maintains the monthly range partitions of the `orders` table (by `order_date`).
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _current_month(self) -> date:
+        # The database clock, which also stamps orders.order_date
+        now: datetime = self.db.scalar(select(func.localtimestamp()))
+        return month_start(now)
+
+    def get_partition_months(self) -> list[date]:
+        names = self.db.execute(LIST_PARTITIONS_SQL).scalars().all()
+        return sorted(month for month in map(partition_month, names) if month)
+
+    def create_partitions(self, months_ahead: int = ORDER_PARTITION_MONTHS_AHEAD) -> list[str]:
+        """
+        Creates the missing partitions from the current month to `months_ahead` months
+        ahead, in one transaction.
+
+        Returns:
+            list[str]: The names of the partitions created.
+        """
+        try:
+            current = self._current_month()
+            existing = set(self.get_partition_months())
+            missing = [
+                month for month in (add_months(current, offset) for offset in range(months_ahead + 1))
+                if month not in existing
+            ]
+            if not missing:
+                return []
+            self.db.execute(text(f"SET LOCAL lock_timeout = '{PARTITION_LOCK_TIMEOUT}'"))
+            for month in missing:
+                self.db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF orders "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                ))
+            self.db.commit()
+            created = [partition_name(month) for month in missing]
+            logger.info(f"Created orders partitions: {', '.join(created)}")
+            return created
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while creating orders partitions: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def archive_partitions(self, retention_months: int = ORDER_RETENTION_MONTHS) -> list[str]:
+        """
+        Detaches the partitions that ended more than `retention_months` months ago and
+        moves them to the archive schema, one transaction per partition.
+
+        A partition is only archived once every order in it is completed; the check and
+        the detach run under the same lock, so no order can be reopened in between.
+
+        Returns:
+            list[str]: The names of the partitions archived.
+        """
+        if retention_months <= 0:
+            return []
+        try:
+            cutoff = add_months(self._current_month(), -retention_months)
+            expired = [month for month in self.get_partition_months() if add_months(month, 1) <= cutoff]
+            self.db.rollback()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while listing orders partitions: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+        archived = []
+        for month in expired:
+            name = partition_name(month)
+            try:
+                self.db.execute(text(f"SET LOCAL lock_timeout = '{PARTITION_LOCK_TIMEOUT}'"))
+                self.db.execute(text("LOCK TABLE orders IN ACCESS EXCLUSIVE MODE"))
+                active = self.db.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE status <> 'completed')"))
+                if active:
+                    self.db.rollback()
+                    logger.info(f"Keeping orders partition {name}: it still has active orders")
+                    continue
+                self.db.execute(text(f"ALTER TABLE orders DETACH PARTITION {name}"))
+                self.db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ORDER_ARCHIVE_SCHEMA}"))
+                self.db.commit()
+                archived.append(name)
+                logger.info(f"Archived orders partition {name} to {ORDER_ARCHIVE_SCHEMA}.{name}")
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"Error while archiving orders partition {name}: {e}")
+                raise CRUDException(status_code=500, message="Internal server error")
+        return archived
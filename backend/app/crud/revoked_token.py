@@ -0,0 +1,66 @@
+from datetime import datetime
+from uuid import UUID
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.revoked_token import RevokedToken
+from app.config.logger import logger
+from app.exceptions.crud_exception import CRUDException
+
+
+class RevokedTokenCRUD:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def revoke(self, jti: UUID, expires_at: datetime) -> None:
+        try:
+            logger.info(f"Revoking token {jti}")
+            self.db.execute(
+                insert(RevokedToken).values(jti=jti, expires_at=expires_at).on_conflict_do_nothing()
+            )
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while revoking token {jti}: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def get_revocations(self, since: datetime | None = None) -> tuple[list, datetime]:
+        """
+        Returns the revocations of unexpired tokens recorded after `since` (all of them
+        without it), as (jti, expires_at) rows, and the database time of the read.
+        """
+        try:
+            now = self.db.scalar(select(func.now()))
+            query = select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+            if since is not None:
+                query = query.where(RevokedToken.revoked_at > since)
+            rows = self.db.execute(query).all()
+            self.db.commit()
+            return rows, now
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while fetching revoked tokens: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
+
+    def purge_expired(self, batch_size: int) -> int:
+        """
+        Deletes up to `batch_size` revocations of tokens that have expired and commits.
+
+        Returns:
+            int: The number of revocations deleted.
+        """
+        try:
+            expired = select(RevokedToken.jti).where(
+                RevokedToken.expires_at <= func.now()
+            ).limit(batch_size).with_for_update(skip_locked=True)
+            deleted = self.db.execute(
+                delete(RevokedToken)
+                .where(RevokedToken.jti.in_(expired.scalar_subquery()))
+                .returning(RevokedToken.jti)
+            ).scalars().all()
+            self.db.commit()
+            return len(deleted)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error while purging revoked tokens: {e}")
+            raise CRUDException(status_code=500, message="Internal server error")
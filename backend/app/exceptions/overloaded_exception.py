@@ -0,0 +1,6 @@
+class OverloadedException(Exception):
+    """Raised when a bounded worker pool has no room for more work."""
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
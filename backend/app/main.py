@@ -1,14 +1,81 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from app.routes.user_route import router as user_router
 from app.routes.book_route import router as book_router
 from app.routes.order_route import router as order_router
+from app.routes.hold_route import router as hold_router
+from app.routes.metrics_route import router as metrics_router
+from app.db.session import SessionLocal
+from app.controllers.books.book_controller import BookController
+from app.tasks.periodic import PeriodicTask
+from app.tasks.overdue import overdue_sweeper, OVERDUE_SWEEP_INTERVAL_SECONDS
+from app.tasks.holds import hold_expiry_sweeper, HOLD_EXPIRY_INTERVAL_SECONDS
+from app.tasks.idempotency import idempotency_purger, IDEMPOTENCY_PURGE_INTERVAL_SECONDS
+from app.tasks.partitions import maintain_order_partitions, ORDER_PARTITION_INTERVAL_SECONDS
+from app.tasks.popularity import popularity_pruner, POPULARITY_PRUNE_INTERVAL_SECONDS
+from app.utils.password_hasher import password_hasher
+from app.utils.revocation import revocation_list
+from app.tasks.revocation import revocation_purger, REVOCATION_SYNC_INTERVAL_SECONDS, REVOCATION_PURGE_INTERVAL_SECONDS
+from app.config.logger import logger
+
+
+def build_suggestion_index():
+    db = SessionLocal()
+    try:
+        BookController(db).rebuild_suggestion_index()
+    except Exception as e:
+        # Serve without suggestions rather than refusing to start
+        logger.error(f"Could not build the typeahead index at startup: {e}")
+    finally:
+        db.close()
+
+
+def prepare_order_partitions():
+    try:
+        maintain_order_partitions()
+    except Exception as e:
+        # Existing partitions keep accepting orders; the periodic task retries
+        logger.error(f"Could not maintain the orders partitions at startup: {e}")
+
+
+def load_revoked_tokens():
+    try:
+        loaded = revocation_list.sync()
+        logger.info(f"Loaded {loaded} revoked token(s)")
+    except Exception as e:
+        # The periodic sync retries the full load
+        logger.error(f"Could not load revoked tokens at startup: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(build_suggestion_index)
+    await run_in_threadpool(prepare_order_partitions)
+    await run_in_threadpool(load_revoked_tokens)
+    tasks = [
+        PeriodicTask("overdue-sweep", OVERDUE_SWEEP_INTERVAL_SECONDS, overdue_sweeper.run_once),
+        PeriodicTask("hold-expiry", HOLD_EXPIRY_INTERVAL_SECONDS, hold_expiry_sweeper.run_once),
+        PeriodicTask("idempotency-purge", IDEMPOTENCY_PURGE_INTERVAL_SECONDS, idempotency_purger.run_once),
+        PeriodicTask("revocation-sync", REVOCATION_SYNC_INTERVAL_SECONDS, revocation_list.sync),
+        PeriodicTask("revocation-purge", REVOCATION_PURGE_INTERVAL_SECONDS, revocation_purger.run_once),
+        PeriodicTask("order-partitions", ORDER_PARTITION_INTERVAL_SECONDS, maintain_order_partitions),
+        PeriodicTask("popularity-prune", POPULARITY_PRUNE_INTERVAL_SECONDS, popularity_pruner.run_once),
+    ]
+    for task in tasks:
+        task.start()
+    yield
+    for task in tasks:
+        task.stop(timeout=5)
+    password_hasher.shutdown()
 
 
 app = FastAPI(title="Library Management System API",
               description="API for managing library resources, users, and orders.",
-              version="1.0.0")
+              version="1.0.0",
+              lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,12 +88,15 @@ app.add_middleware(
 app.include_router(user_router, prefix="/api", tags=["users"])
 app.include_router(book_router, prefix="/api", tags=["books"])
 app.include_router(order_router, prefix="/api", tags=["orders"])
+app.include_router(hold_router, prefix="/api", tags=["holds"])
+app.include_router(metrics_router, prefix="/api", tags=["metrics"])
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=exc.headers
     )
     
 @app.exception_handler(Exception)
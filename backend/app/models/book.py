@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, Text, Index, CheckConstraint, Computed
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.sql import text
 from app.db.base_class import Base
 
@@ -9,10 +9,29 @@ class Book(Base):
     Book model.
     """
     __tablename__ = "books"
+    __table_args__ = (
+        Index("idx_books_title_book_id", "title", "book_id"),
+        Index("idx_books_search_vector", "search_vector", postgresql_using="gin"),
+        Index("idx_books_author_title_book_id", "author", "title", "book_id"),
+        Index("idx_books_publication_year", "publication_year"),
+        Index("idx_books_available_title_book_id", "title", "book_id", postgresql_where=text("available_copies > 0")),
+    )
 
     book_id = Column(UUID(), primary_key=True, server_default=text("uuid_generate_v4()"), nullable=False)
     title = Column(String(255), nullable=False)
     author = Column(String(255), nullable=False)
     isbn = Column(String(13), unique=True, nullable=False)
     publication_year = Column(Integer, nullable=True)
-    description = Column(Text(), nullable=True)
\ No newline at end of file
+    description = Column(Text(), nullable=True)
+    # Maintained by BookCopyCRUD whenever a copy enters or leaves the 'available' status
+    available_copies = Column(Integer, CheckConstraint("available_copies >= 0"), server_default=text("0"), nullable=False)
+    # Weighted full-text document over title (A), author (B) and description (C)
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(author, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C')",
+            persisted=True
+        )
+    )
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, TIMESTAMP, ForeignKey, CheckConstraint, String
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, TIMESTAMP, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, ENUM
 from sqlalchemy.sql import text
 from app.db.base_class import Base
 
@@ -9,8 +9,18 @@ class BookCopy(Base):
     BookCopy model.
     """
     __tablename__ = "book_copies"
+    __table_args__ = (
+        # Checkout looks up one available copy of a book
+        Index("idx_book_copies_available", "book_id", postgresql_where=text("status = 'available'")),
+        # Per-book copy counts by status are answered from the index alone
+        Index("idx_book_copies_book_id_status", "book_id", "status"),
+    )
 
     copy_id = Column(UUID(), primary_key=True, server_default=text("uuid_generate_v4()"), nullable=False)
-    book_id = Column(UUID(), ForeignKey("books.book_id"), nullable=False)
-    status = Column(String(20), CheckConstraint("status IN ('available', 'borrowed', 'reserved')"), nullable=False) 
+    book_id = Column(UUID(), ForeignKey("books.book_id", ondelete="CASCADE"), nullable=False)
+    status = Column(
+        ENUM("available", "borrowed", "reserved", name="book_status", create_type=False),
+        server_default="available",
+        nullable=False
+    )
     added_at = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP")) 
\ No newline at end of file
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Date, Integer, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import text
+from app.db.base_class import Base
+
+
+class BookDailyOrders(Base):
+    """
+    Per-book, per-day order count rollup backing the popularity ranking.
+    """
+    __tablename__ = "book_daily_orders"
+    __table_args__ = (
+        Index("idx_book_daily_orders_day", "order_day", postgresql_include=["book_id", "order_count"]),
+    )
+
+    book_id = Column(UUID(), ForeignKey("books.book_id", ondelete="CASCADE"), primary_key=True, nullable=False)
+    order_day = Column(Date, primary_key=True, nullable=False)
+    order_count = Column(Integer, server_default=text("0"), nullable=False)
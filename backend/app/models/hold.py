@@ -0,0 +1,39 @@
+from sqlalchemy import Column, ForeignKey, TIMESTAMP, Index
+from sqlalchemy.dialects.postgresql import UUID, ENUM
+from sqlalchemy.sql import text
+from app.db.base_class import Base
+
+
+class Hold(Base):
+    """
+    Hold model. A reader's place in the queue for a book without available copies.
+
+    A `waiting` hold becomes `ready` when a copy is reserved for it, then `fulfilled`
+    on checkout, or `expired` if the copy is not picked up in time.
+    """
+    __tablename__ = "holds"
+    __table_args__ = (
+        # Queue order of the waiting holds of a book; also answers queue positions
+        Index("idx_holds_queue", "book_id", "created_at", "hold_id", postgresql_where=text("status = 'waiting'")),
+        # One active hold per reader and book
+        Index(
+            "idx_holds_active_user_book", "user_id", "book_id",
+            unique=True, postgresql_where=text("status IN ('waiting', 'ready')")
+        ),
+        # The expiry sweep scans ready holds by pickup deadline
+        Index("idx_holds_ready_expires_at", "expires_at", postgresql_where=text("status = 'ready'")),
+    )
+
+    hold_id = Column(UUID(), primary_key=True, server_default=text("uuid_generate_v4()"), nullable=False)
+    book_id = Column(UUID(), ForeignKey("books.book_id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    # The copy reserved for the hold once it is ready
+    copy_id = Column(UUID(), ForeignKey("book_copies.copy_id", ondelete="SET NULL"), nullable=True)
+    status = Column(
+        ENUM("waiting", "ready", "fulfilled", "expired", "cancelled", name="hold_status", create_type=False),
+        server_default="waiting",
+        nullable=False
+    )
+    created_at = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
+    ready_at = Column(TIMESTAMP, nullable=True)
+    expires_at = Column(TIMESTAMP, nullable=True)
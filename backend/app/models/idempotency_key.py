@@ -0,0 +1,26 @@
+from sqlalchemy import Column, TIMESTAMP, SmallInteger, Index
+from sqlalchemy.dialects.postgresql import BYTEA, JSONB
+from sqlalchemy.sql import text
+from app.db.base_class import Base
+
+
+class IdempotencyKey(Base):
+    """
+    IdempotencyKey model. The stored outcome of a mutating request sent with an
+    `Idempotency-Key` header, replayed to retries of the same request until it expires.
+
+    Keys are stored as SHA-256 digests of the user, endpoint and header value, so rows
+    stay small whatever clients send. `status_code` is NULL while the request runs.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # The purge sweep deletes expired keys
+        Index("idx_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    key_hash = Column(BYTEA, primary_key=True, nullable=False)
+    request_hash = Column(BYTEA, nullable=False)
+    status_code = Column(SmallInteger, nullable=True)
+    response_body = Column(JSONB, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
+    expires_at = Column(TIMESTAMP, nullable=False)
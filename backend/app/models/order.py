@@ -1,21 +1,35 @@
-from sqlalchemy import Column, ForeignKey, TIMESTAMP, CheckConstraint, String
-from sqlalchemy.sql import text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, ForeignKey, TIMESTAMP, Index
 from sqlalchemy.sql import text
+from sqlalchemy.dialects.postgresql import UUID, ENUM
 from app.db.base_class import Base
 
 
 class Order(Base):
     """
-    Order model.
+    Order model. The table is range partitioned by month of `order_date`, which is
+    therefore part of the primary key.
     """
     __tablename__ = "orders"
+    __table_args__ = (
+        # The overdue sweeper scans pending orders by due date
+        Index("idx_orders_pending_due_date", "due_date", postgresql_where=text("status = 'pending'")),
+        # Keyset paging of the active order queue and of a reader's orders, newest first
+        Index("idx_orders_active_order_date_order_id", "order_date", "order_id", postgresql_where=text("status <> 'completed'")),
+        Index("idx_orders_user_order_date_order_id", "user_id", "order_date", "order_id"),
+        # Orders of a copy (returns by copy, cascading deletes)
+        Index("idx_orders_copy_id", "copy_id"),
+        {"postgresql_partition_by": "RANGE (order_date)"},
+    )
 
     order_id = Column(UUID(), primary_key=True, server_default=text("uuid_generate_v4()"), nullable=False)
-    user_id = Column(UUID(), ForeignKey("users.user_id"), nullable=False)
-    copy_id = Column(UUID(), ForeignKey("book_copies.copy_id"), nullable=False)
-    order_type = Column(String(20), CheckConstraint("order_type IN ('borrow', 'read_in_library')"), nullable=False)  
-    order_date = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
+    user_id = Column(UUID(), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    copy_id = Column(UUID(), ForeignKey("book_copies.copy_id", ondelete="CASCADE"), nullable=False)
+    order_type = Column(ENUM("borrow", "read_in_library", name="order_type", create_type=False), nullable=True)
+    order_date = Column(TIMESTAMP, primary_key=True, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
     due_date = Column(TIMESTAMP, nullable=True)  
     return_date = Column(TIMESTAMP, nullable=True)  
-    status = Column(String(20), CheckConstraint("status IN ('pending', 'completed', 'overdue')"), server_default="pending", nullable=False)
\ No newline at end of file
+    status = Column(
+        ENUM("pending", "completed", "overdue", name="order_status", create_type=False),
+        server_default="pending",
+        nullable=False
+    )
\ No newline at end of file
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, TIMESTAMP, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+
+class RevokedToken(Base):
+    """
+    RevokedToken model. An access token revoked before its expiry, e.g. on logout,
+    identified by its `jti` claim. Rows are purged once the token would have expired anyway.
+    """
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        # Workers pick up revocations made since their last sync
+        Index("idx_revoked_tokens_revoked_at", "revoked_at"),
+        # The purge sweep deletes revocations of expired tokens
+        Index("idx_revoked_tokens_expires_at", "expires_at"),
+    )
+
+    jti = Column(UUID(), primary_key=True, nullable=False)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    revoked_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
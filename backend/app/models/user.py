@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, TIMESTAMP, CheckConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, TIMESTAMP
+from sqlalchemy.dialects.postgresql import UUID, ENUM
 from sqlalchemy.sql import func, text
 from app.db.base_class import Base
     
@@ -14,5 +14,5 @@ class User(Base):
     username = Column(String(50), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     email = Column(String(100), nullable=True)
-    role = Column(String(20), CheckConstraint("role IN ('reader', 'librarian')"), nullable=False)
+    role = Column(ENUM("reader", "librarian", name="role", create_type=False), nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
\ No newline at end of file
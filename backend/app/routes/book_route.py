@@ -1,13 +1,27 @@
-from fastapi import Depends, APIRouter
+import io
+import tempfile
+from fastapi import Depends, APIRouter, Query, Request, Response, Header
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from uuid import UUID
-from app.schemas.book import Book, BookPost, BookGet
+from app.schemas.book import Book, BookPost, BookGet, BookBatch, BookBatchPost, BookFilters, ImportFormat, ExportFormat
+from app.schemas.book_copy import BookCopy, BookCopiesPost
 from app.controllers.books.book_controller import BookController, get_book_controller
+from app.crud.book import POPULARITY_MAX_DAYS
 from app.config.logger import logger
+from app.utils.catalog_export import EXPORT_MEDIA_TYPES
 from app.utils.security import get_current_user, require_role
+from app.utils.idempotency import IdempotentRequest, get_idempotent_request
+from app.utils.http_cache import (
+    accepts_encoding, etag_matches, not_modified, set_cache_headers,
+    CATALOG_LIST_CACHE_CONTROL, BOOK_DETAIL_CACHE_CONTROL, POPULAR_BOOKS_CACHE_CONTROL, SUGGEST_CACHE_CONTROL
+)
 
 
 router = APIRouter(prefix="/books", tags=["books"])
 
+IMPORT_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
 
 @router.post("/", response_model=Book, dependencies=[Depends(require_role("librarian"))])
 def add_book(book: BookPost, book_controller: BookController = Depends(get_book_controller)):
@@ -18,28 +32,175 @@ def add_book(book: BookPost, book_controller: BookController = Depends(get_book_
     return book_controller.add_book(book)
 
 
+@router.post("/import", response_model=dict, dependencies=[Depends(require_role("librarian"))])
+async def import_books(
+    request: Request,
+    format: ImportFormat = ImportFormat.csv,
+    book_controller: BookController = Depends(get_book_controller)
+):
+    """
+    Bulk import books from a CSV (with a header row) or JSON Lines request body.
+
+    Each row uses the fields of `BookPost`. Returns the number of imported books and a
+    per-row error report.
+    """
+    logger.info(f"POST request to import books in {format.value} format")
+    # Spool the upload to disk past a few MB so memory stays bounded while importing
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_MEMORY) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        lines = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+        return await run_in_threadpool(book_controller.import_books, lines, format)
+
+
+@router.get("/export", dependencies=[Depends(require_role("librarian"))])
+def export_books(format: ExportFormat = ExportFormat.ndjson, accept_encoding: str | None = Header(None)):
+    """
+    Stream the whole catalog with availability counts as NDJSON or CSV.
+
+    The response is gzip-compressed on the fly when the client accepts it.
+    """
+    logger.info(f"GET request to export the catalog in {format.value} format")
+    compress = accepts_encoding(accept_encoding, "gzip")
+    headers = {"Content-Disposition": f'attachment; filename="catalog.{format.value}"', "Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        BookController.export_books(format, compress),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=headers
+    )
+
+
+@router.post("/batch", response_model=BookBatch, dependencies=[Depends(get_current_user)])
+def get_books_batch(batch: BookBatchPost, book_controller: BookController = Depends(get_book_controller)):
+    """
+    Retrieve the details and availability of many books at once by ID or by ISBN.
+
+    Books are returned in request order; IDs or ISBNs without a book are listed in `missing`.
+    """
+    logger.info(f"POST request to retrieve a batch of {len(batch.book_ids or batch.isbns)} books")
+    return book_controller.get_books_batch(batch)
+
+
 @router.get("/", response_model=dict, dependencies=[Depends(get_current_user)])
-def get_books(limit: int = 10, offset: int = 0, book_controller: BookController = Depends(get_book_controller)):
+def get_books(
+    response: Response,
+    limit: int = 10,
+    offset: int = 0,
+    cursor: str | None = None,
+    filters: BookFilters = Depends(),
+    facets: bool = False,
+    if_none_match: str | None = Header(None),
+    book_controller: BookController = Depends(get_book_controller)
+):
+    """
+    Retrieve a list of books with pagination, optionally filtered by author,
+    publication year range and availability.
+
+    Pass the `next_cursor` of a previous response (with the same filters) as `cursor`
+    to seek to the next page instead of using `offset`. With `facets=true` the response
+    also counts the matching books per author and per decade. Supports conditional
+    requests via `If-None-Match`.
+    """
+    logger.info(f"GET request to retrieve books with limit: {limit}, offset: {offset}, cursor: {cursor}, filters: {filters}")
+    # The version is read before the page, so a concurrent change can only make the ETag stale, never the body
+    etag = book_controller.get_catalog_etag("books", limit, offset, cursor, filters.model_dump(), facets)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, CATALOG_LIST_CACHE_CONTROL)
+    set_cache_headers(response, etag, CATALOG_LIST_CACHE_CONTROL)
+    return book_controller.get_books(limit, offset, cursor, filters, facets)
+
+
+@router.get("/search", response_model=dict, dependencies=[Depends(get_current_user)])
+def search_books(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    cursor: str | None = None,
+    if_none_match: str | None = Header(None),
+    book_controller: BookController = Depends(get_book_controller)
+):
+    """
+    Full-text search of the catalog by title, author and description, ranked by relevance.
+
+    `title_highlight` and `description_highlight` are HTML: the book text is escaped and
+    the matched terms are wrapped in `<mark>`.
+    """
+    logger.info(f"GET request to search books for: {q}, limit: {limit}, cursor: {cursor}")
+    etag = book_controller.get_catalog_etag("search", q, limit, cursor)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, CATALOG_LIST_CACHE_CONTROL)
+    set_cache_headers(response, etag, CATALOG_LIST_CACHE_CONTROL)
+    return book_controller.search_books(q, limit, cursor)
+
+
+@router.get("/suggest", response_model=list, dependencies=[Depends(get_current_user)])
+def suggest_books(
+    response: Response,
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=25),
+    book_controller: BookController = Depends(get_book_controller)
+):
     """
-    Retrieve a list of books with pagination.
+    Typeahead suggestions for titles and authors starting with the given prefix.
     """
-    logger.info(f"GET request to retrieve books with limit: {limit}, offset: {offset}")
-    return book_controller.get_books(limit, offset)
+    set_cache_headers(response, None, SUGGEST_CACHE_CONTROL)
+    return book_controller.suggest(prefix, limit)
+
+
+@router.post("/suggest/rebuild", response_model=dict, dependencies=[Depends(require_role("librarian"))])
+def rebuild_suggestion_index(book_controller: BookController = Depends(get_book_controller)):
+    """
+    Rebuild the typeahead index from the books table.
+    """
+    logger.info("POST request to rebuild the typeahead index")
+    return book_controller.rebuild_suggestion_index()
 
 
 @router.get("/most-borrowed", response_model=list, dependencies=[Depends(get_current_user)])
-def get_most_borrowed_books(limit: int = 10, book_controller: BookController = Depends(get_book_controller)):
+def get_most_borrowed_books(
+    response: Response,
+    limit: int = 10,
+    days: int = Query(30, ge=1, le=POPULARITY_MAX_DAYS),
+    book_controller: BookController = Depends(get_book_controller)
+):
     """
-    Retrieve the most borrowed books.
+    Retrieve the most borrowed books over the last `days` days (e.g. 7, 30 or 90).
     """
-    logger.info(f"GET request to retrieve most borrowed books with limit: {limit}")
-    return book_controller.get_most_borrowed_books(limit)
+    logger.info(f"GET request to retrieve most borrowed books with limit: {limit}, days: {days}")
+    set_cache_headers(response, None, POPULAR_BOOKS_CACHE_CONTROL)
+    return book_controller.get_most_borrowed_books(limit, days)
 
 
 @router.get("/{book_id}", response_model=BookGet, dependencies=[Depends(get_current_user)])
-def get_book(book_id: str, book_controller: BookController = Depends(get_book_controller)):
+def get_book(
+    book_id: str,
+    response: Response,
+    if_none_match: str | None = Header(None),
+    book_controller: BookController = Depends(get_book_controller)
+):
     """
-    Retrieve a book by its ID.
+    Retrieve a book by its ID. Supports conditional requests via `If-None-Match`.
     """
     logger.info(f"GET request to retrieve book with id: {book_id}")
-    return book_controller.get_book(UUID(book_id))
\ No newline at end of file
+    etag = book_controller.get_catalog_etag("book", book_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, BOOK_DETAIL_CACHE_CONTROL)
+    set_cache_headers(response, etag, BOOK_DETAIL_CACHE_CONTROL)
+    return book_controller.get_book(UUID(book_id))
+
+
+@router.post("/{book_id}/copies", response_model=list[BookCopy], dependencies=[Depends(require_role("librarian"))])
+def add_book_copies(
+    book_id: UUID,
+    copies: BookCopiesPost,
+    book_controller: BookController = Depends(get_book_controller),
+    idempotent: IdempotentRequest = Depends(get_idempotent_request)
+):
+    """
+    Add available copies to an existing book. Honours `Idempotency-Key`.
+    """
+    logger.info(f"POST request to add {copies.num_copies} copies to book with id: {book_id}")
+    return idempotent.run(lambda: book_controller.add_book_copies(book_id, copies.num_copies), list[BookCopy])
@@ -0,0 +1,54 @@
+from uuid import UUID
+from fastapi import Depends, APIRouter
+from app.schemas.hold import Hold, HoldPost
+from app.controllers.holds.hold_controller import HoldController, get_hold_controller
+from app.config.logger import logger
+from app.utils.security import get_current_user, require_role
+from app.utils.idempotency import IdempotentRequest, get_idempotent_request
+
+
+router = APIRouter(prefix="/holds", tags=["holds"])
+
+
+@router.post("/", response_model=Hold, dependencies=[Depends(require_role("reader"))])
+def place_hold(
+    hold: HoldPost,
+    hold_controller: HoldController = Depends(get_hold_controller),
+    current_user = Depends(get_current_user),
+    idempotent: IdempotentRequest = Depends(get_idempotent_request)
+):
+    """
+    Join the queue for a book that has no available copies. Honours `Idempotency-Key`.
+
+    When a copy is returned it is reserved for the oldest waiting hold, which becomes
+    `ready` until it is checked out or expires.
+    """
+    logger.info(f"Placing hold on book {hold.book_id} for user {current_user.username}")
+    return idempotent.run(lambda: hold_controller.place_hold(current_user.user_id, hold.book_id), Hold)
+
+
+@router.get("/my_holds", response_model=list[Hold], dependencies=[Depends(require_role("reader"))])
+def get_my_holds(hold_controller: HoldController = Depends(get_hold_controller), current_user = Depends(get_current_user)):
+    """
+    Retrieve the active holds of the current reader with their queue positions.
+    """
+    logger.info(f"Fetching holds for user {current_user.username}")
+    return hold_controller.get_user_holds(current_user.user_id)
+
+
+@router.get("/{hold_id}", response_model=Hold, dependencies=[Depends(require_role("reader"))])
+def get_hold(hold_id: UUID, hold_controller: HoldController = Depends(get_hold_controller), current_user = Depends(get_current_user)):
+    """
+    Retrieve a hold of the current reader with its queue position.
+    """
+    logger.info(f"Fetching hold {hold_id} for user {current_user.username}")
+    return hold_controller.get_hold(hold_id, current_user.user_id)
+
+
+@router.delete("/{hold_id}", response_model=Hold, dependencies=[Depends(require_role("reader"))])
+def cancel_hold(hold_id: UUID, hold_controller: HoldController = Depends(get_hold_controller), current_user = Depends(get_current_user)):
+    """
+    Cancel a hold. A copy reserved for it passes to the next reader in the queue.
+    """
+    logger.info(f"Cancelling hold {hold_id} for user {current_user.username}")
+    return hold_controller.cancel_hold(hold_id, current_user.user_id)
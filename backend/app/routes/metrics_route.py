@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+from app.utils.cache import get_book_cache, get_principal_cache, get_token_cache
+from app.tasks.overdue import overdue_sweeper
+from app.tasks.holds import hold_expiry_sweeper
+from app.tasks.idempotency import idempotency_purger
+from app.tasks.popularity import popularity_pruner
+from app.utils.security import require_role
+from app.utils.password_hasher import password_hasher
+from app.utils.revocation import revocation_list
+from app.utils.rate_limit import login_ip_limiter, login_username_limiter
+from app.tasks.revocation import revocation_purger
+
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/", response_model=dict, dependencies=[Depends(require_role("librarian"))])
+def get_metrics():
+    """
+    Retrieve the runtime counters of the in-process caches and workers.
+    """
+    return {
+        "book_cache": get_book_cache().stats(),
+        "principal_cache": get_principal_cache().stats(),
+        "token_cache": get_token_cache().stats(),
+        "overdue_sweeper": overdue_sweeper.stats(),
+        "hold_expiry": hold_expiry_sweeper.stats(),
+        "idempotency_purge": idempotency_purger.stats(),
+        "popularity_prune": popularity_pruner.stats(),
+        "password_hasher": password_hasher.stats(),
+        "revocation_list": revocation_list.stats(),
+        "revocation_purge": revocation_purger.stats(),
+        "login_ip_limiter": login_ip_limiter.stats(),
+        "login_username_limiter": login_username_limiter.stats()
+    }
@@ -1,8 +1,9 @@
 from fastapi import Depends, APIRouter
-from app.schemas.order import Order
+from app.schemas.order import Order, OrderBulkStatusPut
 from app.controllers.orders.order_controller import OrderController, get_order_controller
 from app.config.logger import logger
 from app.utils.security import get_current_user, require_role
+from app.utils.idempotency import IdempotentRequest, get_idempotent_request
 
 
 router = APIRouter(prefix="/orders", tags=["orders"])
@@ -12,21 +13,33 @@ router = APIRouter(prefix="/orders", tags=["orders"])
 def create_order(
     order_data: dict,
     order_controller: OrderController = Depends(get_order_controller),
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_user),
+    idempotent: IdempotentRequest = Depends(get_idempotent_request)
 ):
+    """
+    Check out a copy of a book. Send an `Idempotency-Key` header to make retries safe:
+    a repeated request with the same key returns the first response without borrowing again.
+    """
     logger.info(f"Creating order for user {current_user.username}")
-    return order_controller.create_order(current_user.user_id, order_data)
+    return idempotent.run(lambda: order_controller.create_order(current_user.user_id, order_data))
 
 
 @router.get("/my_orders", response_model=dict, dependencies=[Depends(require_role("reader"))])
 def get_my_orders(
     limit: int = 10,
     offset: int = 0,
+    cursor: str | None = None,
     order_controller: OrderController = Depends(get_order_controller),
     current_user = Depends(get_current_user)
 ):
+    """
+    Retrieve the active orders of the current reader, newest first.
+
+    Pass the `next_cursor` or `prev_cursor` of a previous response as `cursor` to
+    page forwards or backwards instead of using `offset`.
+    """
     logger.info(f"Fetching orders for user {current_user.username}")
-    return order_controller.get_orders_by_user(current_user.username, limit, offset)
+    return order_controller.get_orders_by_user(current_user.username, limit, offset, cursor)
 
 
 @router.get("/{username}", response_model=dict, dependencies=[Depends(require_role("librarian"))])
@@ -34,20 +47,40 @@ def get_orders_by_user(
     username: str,
     limit: int = 10,
     offset: int = 0,
+    cursor: str | None = None,
     order_controller: OrderController = Depends(get_order_controller)
 ):
     logger.info(f"Fetching orders for user {username}")
-    return order_controller.get_orders_by_user(username, limit, offset)
+    return order_controller.get_orders_by_user(username, limit, offset, cursor)
  
 
 @router.get("/", response_model=dict, dependencies=[Depends(require_role("librarian"))])
 def get_all_orders(
     limit: int = 10,
     offset: int = 0,
+    cursor: str | None = None,
     order_controller: OrderController = Depends(get_order_controller)
 ):
+    """
+    Retrieve all active orders, newest first, with the same paging as `/my_orders`.
+    """
     logger.info("Fetching all orders")
-    return order_controller.get_all_orders(limit, offset)
+    return order_controller.get_all_orders(limit, offset, cursor)
+
+
+@router.put("/bulk-status", response_model=dict, dependencies=[Depends(require_role("librarian"))])
+def update_orders_status(
+    bulk: OrderBulkStatusPut,
+    order_controller: OrderController = Depends(get_order_controller),
+    idempotent: IdempotentRequest = Depends(get_idempotent_request)
+):
+    """
+    Change the status of many orders at once, e.g. to check in a cart of returned copies
+    by `copy_ids` with status `completed`. All changes are committed together.
+    Honours `Idempotency-Key`.
+    """
+    logger.info(f"Updating status of {len(bulk.order_ids or bulk.copy_ids)} orders to {bulk.status.value}")
+    return idempotent.run(lambda: order_controller.update_orders_status(bulk))
 
 
 @router.put("/{order_id}", dependencies=[Depends(require_role("librarian"))])
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from app.schemas.user import UserBase
 from app.controllers.authentication.auth_controller import AuthController, get_auth_controller
-from app.utils.security import get_current_user
+from app.utils.security import get_current_user, oauth2_scheme
+from app.utils.rate_limit import throttle_login, login_username_limiter
 from app.config.logger import logger
 
 
@@ -18,18 +19,26 @@ def signup(user: UserBase, auth_controller: AuthController = Depends(get_auth_co
 
 
 @router.post("/login")
-def login(data: dict, auth_controller: AuthController = Depends(get_auth_controller)):
+def login(data: dict, request: Request, auth_controller: AuthController = Depends(get_auth_controller)):
     """
     Login a user and return user details.
+
+    Attempts are rate limited per client IP and per username before the user is looked
+    up or the password checked; excess attempts get 429 with `Retry-After`.
     """
-    logger.info(f"Login request for user: {data.get('username')}")
-    return auth_controller.login(data.get("username"), data.get("password_hash"))
+    username = data.get("username")
+    logger.info(f"Login request for user: {username}")
+    throttle_login(request.client.host if request.client else None, username)
+    result = auth_controller.login(username, data.get("password_hash"))
+    # Failed attempts before a successful login do not count against the user afterwards
+    login_username_limiter.reset(str(username).lower())
+    return result
 
 
 @router.post("/logout", dependencies=[Depends(get_current_user)])
-def logout(auth_controller: AuthController = Depends(get_auth_controller)):
+def logout(token: str = Depends(oauth2_scheme), auth_controller: AuthController = Depends(get_auth_controller)):
     """
-    Logout a user.
+    Logout a user. The access token is revoked and rejected from then on.
     """
     logger.info("Logout request")
-    return auth_controller.logout()
\ No newline at end of file
+    return auth_controller.logout(token)
\ No newline at end of file
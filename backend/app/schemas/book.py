@@ -1,6 +1,7 @@
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional
+from enum import Enum
 
 
 class BookBase(BaseModel):
@@ -15,7 +16,7 @@ class BookPost(BookBase):
     """
     Schema for creating a new book.
     """
-    num_copies: int = Field(ge=0, description="Number of available copies of the book")
+    num_copies: int = Field(ge=0, le=1000, description="Number of available copies of the book")
     
     
 class Book(BookBase):
@@ -26,4 +27,52 @@ class Book(BookBase):
         
         
 class BookGet(Book):
-    available_copies: int = Field(ge=0, description="Number of available copies of the book")
\ No newline at end of file
+    available_copies: int = Field(ge=0, description="Number of available copies of the book")
+    
+    
+class BookFilters(BaseModel):
+    """
+    Filters of the book list.
+    """
+    author: Optional[str] = Field(None, min_length=1, max_length=255, description="Exact author name")
+    year_from: Optional[int] = Field(None, description="Earliest publication year (inclusive)")
+    year_to: Optional[int] = Field(None, description="Latest publication year (inclusive)")
+    available: Optional[bool] = Field(None, description="Only books with (true) or without (false) available copies")
+
+    @model_validator(mode="after")
+    def check_year_range(self):
+        if self.year_from is not None and self.year_to is not None and self.year_from > self.year_to:
+            raise ValueError("year_from must not be greater than year_to")
+        return self
+
+
+BOOK_BATCH_MAX_SIZE = 100
+
+
+class BookBatchPost(BaseModel):
+    """
+    Schema for retrieving many books at once, either by ID or by ISBN.
+    """
+    book_ids: Optional[list[UUID]] = Field(None, min_length=1, max_length=BOOK_BATCH_MAX_SIZE)
+    isbns: Optional[list[str]] = Field(None, min_length=1, max_length=BOOK_BATCH_MAX_SIZE)
+
+    @model_validator(mode="after")
+    def check_one_key_kind(self):
+        if (self.book_ids is None) == (self.isbns is None):
+            raise ValueError("Provide either book_ids or isbns")
+        return self
+
+
+class BookBatch(BaseModel):
+    books: list[BookGet]
+    missing: list[str] = Field(description="Requested IDs or ISBNs that match no book")
+
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    jsonl = "jsonl"
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
@@ -1,6 +1,6 @@
 from datetime import datetime
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
 
 
@@ -21,4 +21,11 @@ class BookCopy(BookCopyBase):
     
     class Config:
         from_attributes = True
-        use_enum_values = True
\ No newline at end of file
+        use_enum_values = True
+        
+        
+class BookCopiesPost(BaseModel):
+    """
+    Schema for adding copies to an existing book.
+    """
+    num_copies: int = Field(gt=0, le=1000, description="Number of copies to add")
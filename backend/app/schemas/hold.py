@@ -0,0 +1,36 @@
+from datetime import datetime
+from uuid import UUID
+from pydantic import BaseModel, Field
+from enum import Enum
+from typing import Optional
+
+
+class HoldStatus(str, Enum):
+    waiting = "waiting"
+    ready = "ready"
+    fulfilled = "fulfilled"
+    expired = "expired"
+    cancelled = "cancelled"
+
+
+class HoldPost(BaseModel):
+    """
+    Schema for placing a hold on a book.
+    """
+    book_id: UUID
+
+
+class Hold(BaseModel):
+    hold_id: UUID
+    book_id: UUID
+    user_id: UUID
+    copy_id: Optional[UUID] = None
+    status: HoldStatus
+    created_at: datetime
+    ready_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    position: Optional[int] = Field(None, description="1-based place in the queue while the hold is waiting")
+
+    class Config:
+        from_attributes = True
+        use_enum_values = True
@@ -1,6 +1,6 @@
 from datetime import datetime
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from enum import Enum
 from typing import Optional
 
@@ -32,4 +32,23 @@ class Order(OrderBase):
     
     class Config:
         from_attributes = True
-        use_enum_values = True
\ No newline at end of file
+        use_enum_values = True
+
+
+ORDER_BULK_MAX_SIZE = 200
+
+
+class OrderBulkStatusPut(BaseModel):
+    """
+    Schema for changing the status of many orders at once, identified either by order
+    ID or by the copy they are for (e.g. scanned returns).
+    """
+    order_ids: Optional[list[UUID]] = Field(None, min_length=1, max_length=ORDER_BULK_MAX_SIZE)
+    copy_ids: Optional[list[UUID]] = Field(None, min_length=1, max_length=ORDER_BULK_MAX_SIZE)
+    status: OrderStatus
+
+    @model_validator(mode="after")
+    def check_one_key_kind(self):
+        if (self.order_ids is None) == (self.copy_ids is None):
+            raise ValueError("Provide either order_ids or copy_ids")
+        return self
@@ -24,4 +24,16 @@ class User(UserBase):
     class Config:
         from_attributes = True
         use_enum_values = True
-    
\ No newline at end of file
+
+
+class Principal(BaseModel):
+    """
+    The authenticated user of a request, as cached between requests.
+    """
+    user_id: UUID
+    username: str
+    role: UserRole
+
+    class Config:
+        from_attributes = True
+        use_enum_values = True
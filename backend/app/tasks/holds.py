@@ -0,0 +1,21 @@
+import os
+from sqlalchemy.orm import Session
+from app.crud.hold import HoldCRUD
+from app.tasks.sweeper import BatchSweeper
+
+HOLD_EXPIRY_INTERVAL_SECONDS = float(os.getenv("HOLD_EXPIRY_INTERVAL_SECONDS", 300))
+HOLD_EXPIRY_BATCH_SIZE = int(os.getenv("HOLD_EXPIRY_BATCH_SIZE", 100))
+
+
+def expire_holds_batch(db: Session, batch_size: int) -> int:
+    return HoldCRUD(db).expire_holds(batch_size)
+
+
+def make_hold_expiry_sweeper(batch_size: int = HOLD_EXPIRY_BATCH_SIZE) -> BatchSweeper:
+    """
+    Expires ready holds past their pickup deadline and passes their copies on.
+    """
+    return BatchSweeper("hold-expiry", expire_holds_batch, batch_size)
+
+
+hold_expiry_sweeper = make_hold_expiry_sweeper()
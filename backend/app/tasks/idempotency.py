@@ -0,0 +1,21 @@
+import os
+from sqlalchemy.orm import Session
+from app.crud.idempotency import IdempotencyCRUD
+from app.tasks.sweeper import BatchSweeper
+
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", 3600))
+IDEMPOTENCY_PURGE_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_PURGE_BATCH_SIZE", 1000))
+
+
+def purge_idempotency_keys_batch(db: Session, batch_size: int) -> int:
+    return IdempotencyCRUD(db).purge_expired(batch_size)
+
+
+def make_idempotency_purger(batch_size: int = IDEMPOTENCY_PURGE_BATCH_SIZE) -> BatchSweeper:
+    """
+    Deletes expired idempotency keys.
+    """
+    return BatchSweeper("idempotency-purge", purge_idempotency_keys_batch, batch_size)
+
+
+idempotency_purger = make_idempotency_purger()
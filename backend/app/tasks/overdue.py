@@ -0,0 +1,21 @@
+import os
+from sqlalchemy.orm import Session
+from app.crud.order import OrderCRUD
+from app.tasks.sweeper import BatchSweeper
+
+OVERDUE_SWEEP_INTERVAL_SECONDS = float(os.getenv("OVERDUE_SWEEP_INTERVAL_SECONDS", 300))
+OVERDUE_SWEEP_BATCH_SIZE = int(os.getenv("OVERDUE_SWEEP_BATCH_SIZE", 500))
+
+
+def mark_overdue_batch(db: Session, batch_size: int) -> int:
+    return OrderCRUD(db).mark_overdue_orders(batch_size)
+
+
+def make_overdue_sweeper(batch_size: int = OVERDUE_SWEEP_BATCH_SIZE) -> BatchSweeper:
+    """
+    Marks pending orders past their due date as overdue.
+    """
+    return BatchSweeper("overdue-sweep", mark_overdue_batch, batch_size)
+
+
+overdue_sweeper = make_overdue_sweeper()
@@ -0,0 +1,24 @@
+import os
+from app.db.session import SessionLocal
+from app.crud.order_partition import OrderPartitionCRUD, ORDER_PARTITION_MONTHS_AHEAD, ORDER_RETENTION_MONTHS
+
+ORDER_PARTITION_INTERVAL_SECONDS = float(os.getenv("ORDER_PARTITION_INTERVAL_SECONDS", 24 * 60 * 60))
+
+
+def maintain_order_partitions(
+    months_ahead: int = ORDER_PARTITION_MONTHS_AHEAD,
+    retention_months: int = ORDER_RETENTION_MONTHS,
+    session_factory=SessionLocal
+) -> dict:
+    """
+    Creates the upcoming monthly partitions of `orders` and archives the expired ones.
+    """
+    db = session_factory()
+    try:
+        partitions = OrderPartitionCRUD(db)
+        return {
+            "created": partitions.create_partitions(months_ahead),
+            "archived": partitions.archive_partitions(retention_months),
+        }
+    finally:
+        db.close()
@@ -0,0 +1,40 @@
+import threading
+from typing import Callable
+from app.config.logger import logger
+
+
+class PeriodicTask:
+    """
+    Runs a function every `interval` seconds on a daemon thread until stopped.
+
+    Errors raised by the function are logged and do not stop the task.
+    """
+    def __init__(self, name: str, interval: float, func: Callable[[], object]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self.interval <= 0:
+            logger.info(f"Periodic task {self.name} is disabled")
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info(f"Started periodic task {self.name} every {self.interval}s")
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        # Wait first so the task does not compete with startup work
+        while not self._stop.wait(self.interval):
+            try:
+                self.func()
+            except Exception as e:
+                logger.error(f"Periodic task {self.name} failed: {e}")
@@ -0,0 +1,21 @@
+import os
+from sqlalchemy.orm import Session
+from app.crud.book import BookCRUD
+from app.tasks.sweeper import BatchSweeper
+
+POPULARITY_PRUNE_INTERVAL_SECONDS = float(os.getenv("POPULARITY_PRUNE_INTERVAL_SECONDS", 24 * 60 * 60))
+POPULARITY_PRUNE_BATCH_SIZE = int(os.getenv("POPULARITY_PRUNE_BATCH_SIZE", 1000))
+
+
+def prune_popularity_batch(db: Session, batch_size: int) -> int:
+    return BookCRUD(db).prune_popularity_rollup(batch_size)
+
+
+def make_popularity_pruner(batch_size: int = POPULARITY_PRUNE_BATCH_SIZE) -> BatchSweeper:
+    """
+    Deletes daily order buckets that have left the popularity window.
+    """
+    return BatchSweeper("popularity-prune", prune_popularity_batch, batch_size)
+
+
+popularity_pruner = make_popularity_pruner()
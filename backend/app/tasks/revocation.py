@@ -0,0 +1,22 @@
+import os
+from sqlalchemy.orm import Session
+from app.crud.revoked_token import RevokedTokenCRUD
+from app.tasks.sweeper import BatchSweeper
+
+REVOCATION_SYNC_INTERVAL_SECONDS = float(os.getenv("REVOCATION_SYNC_INTERVAL_SECONDS", 5))
+REVOCATION_PURGE_INTERVAL_SECONDS = float(os.getenv("REVOCATION_PURGE_INTERVAL_SECONDS", 3600))
+REVOCATION_PURGE_BATCH_SIZE = int(os.getenv("REVOCATION_PURGE_BATCH_SIZE", 1000))
+
+
+def purge_revoked_tokens_batch(db: Session, batch_size: int) -> int:
+    return RevokedTokenCRUD(db).purge_expired(batch_size)
+
+
+def make_revocation_purger(batch_size: int = REVOCATION_PURGE_BATCH_SIZE) -> BatchSweeper:
+    """
+    Deletes revocations of tokens that have expired anyway.
+    """
+    return BatchSweeper("revocation-purge", purge_revoked_tokens_batch, batch_size)
+
+
+revocation_purger = make_revocation_purger()
@@ -0,0 +1,78 @@
+import threading
+import time
+from typing import Callable
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.config.logger import logger
+
+
+class BatchSweeper:
+    """
+    Runs a batched maintenance update until a batch comes back short, one bounded batch
+    per transaction, and keeps counters of its runs.
+
+    `sweep_batch(db, batch_size)` processes one batch, commits it and returns the number
+    of rows it updated.
+    """
+    def __init__(
+        self,
+        name: str,
+        sweep_batch: Callable[[Session, int], int],
+        batch_size: int,
+        session_factory=SessionLocal
+    ):
+        self.name = name
+        self.sweep_batch = sweep_batch
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._failures = 0
+        self._rows_updated = 0
+        self._last_updated = 0
+        self._last_duration = 0.0
+        self._last_run_at = None
+
+    def run_once(self) -> int:
+        """
+        Sweeps until a batch comes back short.
+
+        Returns:
+            int: The number of rows updated.
+        """
+        started = time.monotonic()
+        updated = 0
+        db = self.session_factory()
+        try:
+            while True:
+                batch = self.sweep_batch(db, self.batch_size)
+                updated += batch
+                if batch < self.batch_size:
+                    break
+        except Exception:
+            with self._lock:
+                self._failures += 1
+            raise
+        finally:
+            db.close()
+            duration = time.monotonic() - started
+            with self._lock:
+                self._runs += 1
+                self._rows_updated += updated
+                self._last_updated = updated
+                self._last_duration = duration
+                self._last_run_at = time.time()
+        logger.info(f"{self.name} updated {updated} row(s) in {duration:.3f}s")
+        return updated
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batch_size": self.batch_size,
+                "runs": self._runs,
+                "failures": self._failures,
+                "rows_updated": self._rows_updated,
+                "last_updated": self._last_updated,
+                "last_duration_seconds": round(self._last_duration, 6),
+                "last_run_at": self._last_run_at,
+            }
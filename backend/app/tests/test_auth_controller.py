@@ -1,10 +1,14 @@
 import pytest
+from uuid import UUID
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from app.controllers.authentication.auth_controller import AuthController
 from app.schemas.user import UserBase
 from app.exceptions.crud_exception import CRUDException
+from app.exceptions.overloaded_exception import OverloadedException
 from app.models.user import User
+from app.utils.security import create_access_token, verify_access_token
+from app.utils.revocation import revocation_list
 
 # Fixture for mock database session
 @pytest.fixture
@@ -135,10 +139,50 @@ def test_login_unexpected_error(mocker, db_session):
 
 def test_logout_success(mocker, db_session):
     # Arrange
+    revoke = mocker.patch("app.crud.revoked_token.RevokedTokenCRUD.revoke")
+    token = create_access_token(data={"username": "testuser", "role": "reader"})
+    jti = verify_access_token(token)["jti"]
     auth_controller = AuthController(db=db_session)
 
     # Act
-    result = auth_controller.logout()
+    result = auth_controller.logout(token)
 
     # Assert
-    assert result == {"message": "Successfully logged out"}
\ No newline at end of file
+    assert result == {"message": "Successfully logged out"}
+    assert revoke.call_args.args[0] == UUID(jti)
+    assert revocation_list.is_revoked(jti)
+
+def test_logout_invalid_token(db_session):
+    # Arrange
+    auth_controller = AuthController(db=db_session)
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        auth_controller.logout("invalid.token.here")
+    assert exc.value.status_code == 401
+
+def test_login_returns_503_when_password_hashing_is_saturated(mocker, db_session, user_instance):
+    # Arrange
+    mocker.patch("app.crud.user.UserCRUD.get_user_by_username", return_value=user_instance)
+    mocker.patch(
+        "app.controllers.authentication.auth_controller.verify_password",
+        side_effect=OverloadedException("Too many password checks in progress, please retry shortly")
+    )
+    auth_controller = AuthController(db=db_session)
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        auth_controller.login("testuser", "testpass123")
+    assert exc.value.status_code == 503
+    assert exc.value.headers == {"Retry-After": "1"}
+
+def test_login_invalid_credentials_is_401(mocker, db_session, user_instance):
+    # Arrange
+    mocker.patch("app.crud.user.UserCRUD.get_user_by_username", return_value=user_instance)
+    mocker.patch("app.controllers.authentication.auth_controller.verify_password", return_value=False)
+    auth_controller = AuthController(db=db_session)
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        auth_controller.login("testuser", "wrongpass")
+    assert exc.value.status_code == 401
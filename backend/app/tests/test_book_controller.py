@@ -1,15 +1,18 @@
+import io
 import pytest
 from unittest.mock import Mock
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from app.controllers.books.book_controller import BookController
-from app.schemas.book import BookPost
-from app.schemas.book_copy import BookCopyBase, BookCopyStatus
+from app.schemas.book import BookPost, BookBatchPost, ImportFormat, ExportFormat
 from app.crud.book import BookCRUD
 from app.crud.book_copy import BookCopyCRUD
+from app.crud.hold import HoldCRUD
+from app.schemas.book_copy import BookCopy
 from app.exceptions.crud_exception import CRUDException
 from app.models.book import Book as BookModel
 from uuid import uuid4
+from datetime import datetime
 
 # Fixture for mock database session
 @pytest.fixture
@@ -63,6 +66,7 @@ def mock_book_crud(book_instance):
 def mock_book_copy_crud():
     mock_crud = Mock(spec=BookCopyCRUD)
     mock_crud.create_book_copy = Mock()
+    mock_crud.create_book_copies = Mock()
     return mock_crud
 
 def test_add_book_success_with_copies(db_session, book_post_data, book_instance, mock_book_crud, mock_book_copy_crud):
@@ -82,11 +86,9 @@ def test_add_book_success_with_copies(db_session, book_post_data, book_instance,
         "isbn": "1234567890123",
         "publication_year": 2020,
         "description": "A test book"
-    })
-    assert mock_book_copy_crud.create_book_copy.call_count == 2
-    mock_book_copy_crud.create_book_copy.assert_called_with(
-        BookCopyBase(book_id=book_instance.book_id, status=BookCopyStatus.available)
-    )
+    }, commit=False)
+    mock_book_copy_crud.create_book_copies.assert_called_once_with(book_instance.book_id, 2)
+    mock_book_copy_crud.create_book_copy.assert_not_called()
 
 def test_add_book_success_no_copies(db_session, book_instance, mock_book_crud, mock_book_copy_crud):
     # Arrange
@@ -107,8 +109,8 @@ def test_add_book_success_no_copies(db_session, book_instance, mock_book_crud, m
 
     # Assert
     assert result == book_instance
-    mock_book_crud.create_book.assert_called_once()
-    mock_book_copy_crud.create_book_copy.assert_not_called()
+    mock_book_crud.create_book.assert_called_once_with(book_post_data.model_dump(exclude={"num_copies"}), commit=True)
+    mock_book_copy_crud.create_book_copies.assert_not_called()
 
 def test_add_book_duplicate_book(db_session, book_post_data, mock_book_crud, mock_book_copy_crud):
     # Arrange
@@ -124,7 +126,7 @@ def test_add_book_duplicate_book(db_session, book_post_data, mock_book_crud, moc
         book_controller.add_book(book_post_data)
     assert exc.value.status_code == 400
     assert exc.value.detail == "Book already exists"
-    mock_book_copy_crud.create_book_copy.assert_not_called()
+    mock_book_copy_crud.create_book_copies.assert_not_called()
 
 def test_get_books_success(db_session, mock_book_crud, mock_book_copy_crud):
     # Arrange
@@ -139,7 +141,7 @@ def test_get_books_success(db_session, mock_book_crud, mock_book_copy_crud):
     assert len(result) == 1
     assert result[0][1] == "Test Book"
     assert result[0][-1] == 2
-    mock_book_crud.get_books.assert_called_once_with(10, 0)
+    mock_book_crud.get_books.assert_called_once_with(10, 0, None, None, False)
 
 def test_get_books_empty(db_session, mock_book_crud, mock_book_copy_crud):
     # Arrange
@@ -153,7 +155,7 @@ def test_get_books_empty(db_session, mock_book_crud, mock_book_copy_crud):
 
     # Assert
     assert result == []
-    mock_book_crud.get_books.assert_called_once_with(10, 0)
+    mock_book_crud.get_books.assert_called_once_with(10, 0, None, None, False)
 
 def test_get_books_error(db_session, mock_book_crud, mock_book_copy_crud):
     # Arrange
@@ -168,4 +170,148 @@ def test_get_books_error(db_session, mock_book_crud, mock_book_copy_crud):
     with pytest.raises(HTTPException) as exc:
         book_controller.get_books(limit=10, offset=0)
     assert exc.value.status_code == 500
-    assert exc.value.detail == "Internal server error"
\ No newline at end of file
+    assert exc.value.detail == "Internal server error"
+
+def test_import_books_reports_errors(db_session, mock_book_crud, mock_book_copy_crud):
+    # Arrange
+    imported_id = uuid4()
+    mock_book_crud.bulk_import_books = Mock(return_value=(
+        [{"line": 2, "book_id": imported_id, "isbn": "9780441172719", "title": "Dune", "author": "Frank Herbert"}],
+        [{"line": 4, "isbn": "9780141439587", "error": "Book already exists"}]
+    ))
+    book_controller = BookController(db=db_session)
+    book_controller.book_crud = mock_book_crud
+    book_controller.book_copy_crud = mock_book_copy_crud
+    lines = io.StringIO(
+        "title,author,isbn,num_copies\n"
+        "Dune,Frank Herbert,9780441172719,2\n"
+        "Bad,Row,123,1\n"
+        "Emma,Jane Austen,9780141439587,1\n"
+    )
+
+    # Act
+    result = book_controller.import_books(lines, ImportFormat.csv)
+
+    # Assert
+    assert result["imported"] == 1
+    assert result["failed"] == 2
+    assert [error["line"] for error in result["errors"]] == [3, 4]
+    rows = mock_book_crud.bulk_import_books.call_args[0][0]
+    assert [line_no for line_no, _ in rows] == [2, 4]
+
+def test_import_books_failed_chunk(db_session, mock_book_crud, mock_book_copy_crud):
+    # Arrange
+    mock_book_crud.bulk_import_books = Mock(side_effect=CRUDException(
+        message="Internal server error", status_code=500
+    ))
+    book_controller = BookController(db=db_session)
+    book_controller.book_crud = mock_book_crud
+    book_controller.book_copy_crud = mock_book_copy_crud
+    lines = io.StringIO('{"title": "Dune", "author": "Frank Herbert", "isbn": "9780441172719", "num_copies": 2}\n')
+
+    # Act
+    result = book_controller.import_books(lines, ImportFormat.jsonl)
+
+    # Assert
+    assert result["imported"] == 0
+    assert result["errors"] == [{"line": 1, "isbn": "9780441172719", "error": "Internal server error"}]
+
+def test_add_book_copies_failure_rolls_back_book(db_session, book_post_data, mock_book_crud, mock_book_copy_crud):
+    # Arrange
+    mock_book_copy_crud.create_book_copies = Mock(side_effect=CRUDException(
+        message="Internal server error", status_code=500
+    ))
+    book_controller = BookController(db=db_session)
+    book_controller.book_crud = mock_book_crud
+    book_controller.book_copy_crud = mock_book_copy_crud
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        book_controller.add_book(book_post_data)
+    assert exc.value.status_code == 500
+    mock_book_crud.create_book.assert_called_once_with(book_post_data.model_dump(exclude={"num_copies"}), commit=False)
+
+def test_add_book_copies_book_not_found(db_session, mock_book_crud, mock_book_copy_crud):
+    # Arrange
+    mock_book_copy_crud.create_book_copies = Mock(side_effect=CRUDException(
+        message="Book not found", status_code=404
+    ))
+    book_controller = BookController(db=db_session)
+    book_controller.book_crud = mock_book_crud
+    book_controller.book_copy_crud = mock_book_copy_crud
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        book_controller.add_book_copies(uuid4(), 5)
+    assert exc.value.status_code == 404
+    assert exc.value.detail == "Book not found"
+
+def test_get_catalog_etag(db_session, mock_book_crud):
+    # Arrange
+    book_controller = BookController(db=db_session)
+    book_controller.book_crud = mock_book_crud
+    mock_book_crud.get_catalog_version.return_value = 3
+
+    # Act
+    etag = book_controller.get_catalog_etag("book", "abc")
+
+    # Assert
+    assert etag.startswith('"3-')
+    mock_book_crud.get_catalog_version.assert_called_once()
+
+def test_export_books_uses_own_session(mocker, book_instance):
+    # Arrange
+    session = Mock(spec=Session)
+    mocker.patch("app.controllers.books.book_controller.SessionLocal", return_value=session)
+    export_rows = mocker.patch.object(BookCRUD, "get_export_rows", return_value=[
+        (book_instance.book_id, book_instance.isbn, book_instance.title, book_instance.author, 2020, None, 1)
+    ])
+
+    # Act
+    body = b"".join(BookController.export_books(ExportFormat.ndjson))
+
+    # Assert
+    assert b'"title": "Test Book"' in body
+    export_rows.assert_called_once()
+    session.close.assert_called_once()
+
+def test_get_books_batch_reports_missing(db_session, mock_book_crud):
+    # Arrange
+    book_controller = BookController(db=db_session)
+    book_controller.book_crud = mock_book_crud
+    missing_id = uuid4()
+    mock_book_crud.get_books_batch.return_value = ([], [missing_id])
+
+    # Act
+    result = book_controller.get_books_batch(BookBatchPost(book_ids=[missing_id]))
+
+    # Assert
+    assert result == {"books": [], "missing": [str(missing_id)]}
+    mock_book_crud.get_books_batch.assert_called_once_with([missing_id], None)
+
+def test_book_batch_post_requires_one_key_kind():
+    with pytest.raises(ValueError):
+        BookBatchPost(book_ids=[uuid4()], isbns=["1234567890123"])
+    with pytest.raises(ValueError):
+        BookBatchPost()
+    with pytest.raises(ValueError):
+        BookBatchPost(book_ids=[uuid4() for _ in range(101)])
+
+def test_add_book_copies_reserves_copies_for_holds(db_session, mock_book_crud, mock_book_copy_crud):
+    # Arrange
+    book_id = uuid4()
+    copies = [BookCopy(copy_id=uuid4(), book_id=book_id, status="available", added_at=datetime(2025, 5, 29)) for _ in range(2)]
+    mock_book_copy_crud.create_book_copies = Mock(return_value=copies)
+    book_controller = BookController(db=db_session)
+    book_controller.book_crud = mock_book_crud
+    book_controller.book_copy_crud = mock_book_copy_crud
+    book_controller.hold_crud = Mock(spec=HoldCRUD)
+    book_controller.hold_crud.fill_holds.return_value = [copies[0].copy_id]
+
+    # Act
+    result = book_controller.add_book_copies(book_id, 2)
+
+    # Assert
+    assert [copy.status for copy in result] == ["reserved", "available"]
+    mock_book_copy_crud.create_book_copies.assert_called_once_with(book_id, 2, commit=False)
+    book_controller.hold_crud.fill_holds.assert_called_once_with(book_id, 2)
@@ -0,0 +1,142 @@
+import pytest
+from uuid import uuid4
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.crud.book_copy import BookCopyCRUD
+from app.models.book_copy import BookCopy as BookCopyModel
+from app.schemas.book_copy import BookCopyBase, BookCopyStatus
+from app.exceptions.crud_exception import CRUDException
+from unittest.mock import Mock
+
+# Fixture for mock database session
+@pytest.fixture
+def db_session():
+    session = Mock(spec=Session)
+    session.info = {}
+    return session
+
+# Fixture for sample BookCopy model instance
+@pytest.fixture
+def book_copy_instance():
+    return BookCopyModel(
+        copy_id=uuid4(),
+        book_id=uuid4(),
+        status="available"
+    )
+
+def test_create_book_copy_increments_counter(db_session):
+    # Arrange
+    book_copy_crud = BookCopyCRUD(db_session)
+    book_copy_crud.adjust_available_copies = Mock()
+    book_copy = BookCopyBase(book_id=uuid4(), status=BookCopyStatus.available)
+
+    # Act
+    book_copy_crud.create_book_copy(book_copy)
+
+    # Assert
+    book_copy_crud.adjust_available_copies.assert_called_once_with(book_copy.book_id, 1)
+    db_session.commit.assert_called_once()
+
+def test_create_reserved_copy_keeps_counter(db_session):
+    # Arrange
+    book_copy_crud = BookCopyCRUD(db_session)
+    book_copy_crud.adjust_available_copies = Mock()
+    book_copy = BookCopyBase(book_id=uuid4(), status=BookCopyStatus.reserved)
+
+    # Act
+    book_copy_crud.create_book_copy(book_copy)
+
+    # Assert
+    book_copy_crud.adjust_available_copies.assert_not_called()
+
+@pytest.mark.parametrize("old_status, new_status, delta", [
+    ("available", "borrowed", -1),
+    ("borrowed", "available", 1),
+    ("borrowed", "reserved", 0),
+    ("available", "available", 0),
+])
+def test_update_book_copy_status_adjusts_counter(db_session, book_copy_instance, old_status, new_status, delta):
+    # Arrange
+    book_copy_instance.status = old_status
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = book_copy_instance
+    book_copy_crud = BookCopyCRUD(db_session)
+
+    # Act
+    result = book_copy_crud.update_book_copy_status(book_copy_instance.copy_id, new_status)
+
+    # Assert
+    assert result.status == new_status
+    update_mock = db_session.query.return_value.filter.return_value.update
+    if delta:
+        update_mock.assert_called_once()
+    else:
+        update_mock.assert_not_called()
+    db_session.commit.assert_called_once()
+
+def test_update_book_copy_status_not_found(db_session):
+    # Arrange
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = None
+    book_copy_crud = BookCopyCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        book_copy_crud.update_book_copy_status(uuid4(), "borrowed")
+    assert exc.value.status_code == 404
+    assert exc.value.message == "Book copy not found"
+
+def test_update_book_copy_status_unexpected_error(db_session, book_copy_instance):
+    # Arrange
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = book_copy_instance
+    db_session.commit = Mock(side_effect=Exception("Unexpected error"))
+    book_copy_crud = BookCopyCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        book_copy_crud.update_book_copy_status(book_copy_instance.copy_id, "borrowed")
+    assert exc.value.status_code == 500
+    db_session.rollback.assert_called_once()
+
+def test_create_book_copies_single_insert(db_session):
+    # Arrange
+    book_id = uuid4()
+    returned = [
+        BookCopyModel(copy_id=uuid4(), book_id=book_id, status="available", added_at=datetime(2025, 5, 29))
+        for _ in range(3)
+    ]
+    db_session.scalars.return_value.all.return_value = returned
+    book_copy_crud = BookCopyCRUD(db_session)
+    book_copy_crud.adjust_available_copies = Mock()
+
+    # Act
+    result = book_copy_crud.create_book_copies(book_id, 3)
+
+    # Assert
+    assert [copy.copy_id for copy in result] == [copy.copy_id for copy in returned]
+    db_session.scalars.assert_called_once()
+    db_session.add.assert_not_called()
+    book_copy_crud.adjust_available_copies.assert_called_once_with(book_id, 3)
+    db_session.commit.assert_called_once()
+
+def test_create_book_copies_without_commit(db_session):
+    # Arrange
+    db_session.scalars.return_value.all.return_value = []
+    book_copy_crud = BookCopyCRUD(db_session)
+
+    # Act
+    book_copy_crud.create_book_copies(uuid4(), 2, commit=False)
+
+    # Assert
+    db_session.commit.assert_not_called()
+
+def test_create_book_copies_unknown_book(db_session):
+    # Arrange
+    db_session.scalars.side_effect = IntegrityError("foreign key violation", {}, None)
+    book_copy_crud = BookCopyCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        book_copy_crud.create_book_copies(uuid4(), 2)
+    assert exc.value.status_code == 404
+    assert exc.value.message == "Book not found"
+    db_session.rollback.assert_called_once()
@@ -1,16 +1,24 @@
 import pytest
+from sqlalchemy import select, literal_column
 from uuid import uuid4
+from datetime import date
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.crud.book import BookCRUD
 from app.models.book import Book as BookModel
+from app.schemas.book import BookFilters
 from app.exceptions.crud_exception import CRUDException
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.cache import LRUCache, invalidate_book
 from unittest.mock import Mock
 
 # Fixture for mock database session
 @pytest.fixture
 def db_session():
-    return Mock(spec=Session)
+    session = Mock(spec=Session)
+    session.info = {}
+    return session
 
 # Fixture for sample book data
 @pytest.fixture
@@ -53,6 +61,18 @@ def test_create_book_success(db_session, book_data, book_instance):
     db_session.commit.assert_called_once()
     db_session.refresh.assert_called_once()
 
+def test_create_book_without_commit(db_session, book_data):
+    # Arrange
+    book_crud = BookCRUD(db_session)
+    
+    # Act
+    result = book_crud.create_book(book_data, commit=False)
+    
+    # Assert
+    assert result.isbn == book_data["isbn"]
+    db_session.flush.assert_called_once()
+    db_session.commit.assert_not_called()
+
 def test_create_book_duplicate_isbn(db_session, book_data):
     # Arrange
     db_session.add = Mock()
@@ -97,9 +117,7 @@ def test_get_books_success(db_session, book_instance):
 
     query_mock = Mock()
     (
-        query_mock.outerjoin.return_value
-        .group_by.return_value
-        .order_by.return_value
+        query_mock.order_by.return_value
         .limit.return_value
         .offset.return_value
         .all.return_value
@@ -122,13 +140,63 @@ def test_get_books_success(db_session, book_instance):
     assert result["has_next"] in [True, False]
     db_session.query.assert_called()
 
+def test_get_books_with_filters(db_session):
+    # Arrange
+    query_mock = Mock()
+    filtered = query_mock.filter.return_value.filter.return_value.filter.return_value.filter.return_value
+    filtered.order_by.return_value.limit.return_value.offset.return_value.all.return_value = []
+    db_session.query.return_value = query_mock
+    book_crud = BookCRUD(db_session)
+    filters = BookFilters(author="Test Author", year_from=1900, year_to=1999, available=True)
+
+    # Act
+    result = book_crud.get_books(limit=10, offset=0, filters=filters)
+
+    # Assert
+    assert result["books"] == []
+    assert "facets" not in result
+    assert query_mock.filter.call_count == 1
+
+def test_get_books_with_facets(db_session, mocker):
+    # Arrange
+    query_mock = Mock()
+    query_mock.order_by.return_value.limit.return_value.offset.return_value.all.return_value = []
+    db_session.query.return_value = query_mock
+    book_crud = BookCRUD(db_session)
+    facets = mocker.patch.object(book_crud, "get_book_facets", return_value={"author": [], "decade": []})
+
+    # Act
+    result = book_crud.get_books(limit=10, offset=0, facets=True)
+
+    # Assert
+    assert result["facets"] == {"author": [], "decade": []}
+    facets.assert_called_once_with(None)
+
+def test_get_book_facets_splits_grouping_sets(db_session):
+    # Arrange
+    buckets = select(literal_column("0").label("by_decade"), literal_column("1").label("bucket_rank")).subquery()
+    db_session.query.return_value.group_by.return_value.subquery.return_value = buckets
+    db_session.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+        Mock(author="Jane Austen", decade=None, by_decade=0, book_count=3),
+        Mock(author=None, decade=1810, by_decade=1, book_count=2),
+        Mock(author=None, decade=None, by_decade=1, book_count=1),
+    ]
+    book_crud = BookCRUD(db_session)
+
+    # Act
+    facets = book_crud.get_book_facets()
+
+    # Assert
+    assert facets == {
+        "author": [{"value": "Jane Austen", "count": 3}],
+        "decade": [{"value": 1810, "count": 2}],
+    }
+
 def test_get_books_empty_result(db_session):
     # Arrange
     query_mock = Mock()
     (
-        query_mock.outerjoin.return_value
-        .group_by.return_value
-        .order_by.return_value
+        query_mock.order_by.return_value
         .limit.return_value
         .offset.return_value
         .all.return_value
@@ -156,4 +224,332 @@ def test_get_books_unexpected_error(db_session):
     with pytest.raises(CRUDException) as exc:
         book_crud.get_books(limit=10, offset=0)
     assert exc.value.status_code == 500
-    assert exc.value.message == "Internal server error"
\ No newline at end of file
+    assert exc.value.message == "Internal server error"
+
+def test_get_books_has_next_from_extra_row(db_session, book_instance):
+    # Arrange
+    mock_book_data = [
+        Mock(
+            book_id=uuid4(),
+            title=f"Book {i}",
+            author=book_instance.author,
+            isbn=book_instance.isbn,
+            publication_year=book_instance.publication_year,
+            description=book_instance.description,
+            available_copies=1
+        )
+        for i in range(3)
+    ]
+
+    query_mock = Mock()
+    (
+        query_mock.order_by.return_value
+        .limit.return_value
+        .offset.return_value
+        .all.return_value
+    ) = mock_book_data
+
+    db_session.query.return_value = query_mock
+    book_crud = BookCRUD(db_session)
+
+    # Act
+    result = book_crud.get_books(limit=2, offset=0)
+
+    # Assert
+    assert len(result["books"]) == 2
+    assert result["has_next"] is True
+    assert result["next_cursor"] is not None
+    query_mock.order_by.return_value.limit.assert_called_once_with(3)
+    assert db_session.query.call_count == 1
+
+def test_get_books_with_cursor(db_session, book_instance):
+    # Arrange
+    mock_book_data = [
+        Mock(
+            book_id=book_instance.book_id,
+            title=book_instance.title,
+            author=book_instance.author,
+            isbn=book_instance.isbn,
+            publication_year=book_instance.publication_year,
+            description=book_instance.description,
+            available_copies=2
+        )
+    ]
+
+    query_mock = Mock()
+    (
+        query_mock.filter.return_value
+        .order_by.return_value
+        .limit.return_value
+        .all.return_value
+    ) = mock_book_data
+
+    db_session.query.return_value = query_mock
+    book_crud = BookCRUD(db_session)
+    cursor = encode_cursor({"title": "A Book", "book_id": str(uuid4())})
+
+    # Act
+    result = book_crud.get_books(limit=10, cursor=cursor)
+
+    # Assert
+    assert len(result["books"]) == 1
+    assert result["page"] is None
+    assert result["has_next"] is False
+    assert result["next_cursor"] is None
+    query_mock.filter.assert_called_once()
+
+def test_get_books_invalid_cursor(db_session):
+    # Arrange
+    book_crud = BookCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        book_crud.get_books(limit=10, cursor="not-a-cursor")
+    assert exc.value.status_code == 400
+    assert exc.value.message == "Invalid cursor"
+
+def test_get_book_reads_counter(db_session, book_instance):
+    # Arrange
+    book_instance.available_copies = 3
+    db_session.query.return_value.filter.return_value.first.return_value = book_instance
+    book_crud = BookCRUD(db_session, LRUCache())
+
+    # Act
+    result = book_crud.get_book(book_instance.book_id)
+
+    # Assert
+    assert result["available_copies"] == 3
+    assert db_session.query.call_count == 1
+
+def test_get_book_not_found(db_session):
+    # Arrange
+    db_session.query.return_value.filter.return_value.first.return_value = None
+    book_crud = BookCRUD(db_session, LRUCache())
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        book_crud.get_book(uuid4())
+    assert exc.value.status_code == 404
+    assert exc.value.message == "Book not found"
+
+def test_get_book_read_through_cache(db_session, book_instance):
+    # Arrange
+    book_instance.available_copies = 3
+    db_session.query.return_value.filter.return_value.first.return_value = book_instance
+    cache = LRUCache()
+    book_crud = BookCRUD(db_session, cache)
+
+    # Act
+    first = book_crud.get_book(book_instance.book_id)
+    first["available_copies"] = 0
+    second = book_crud.get_book(book_instance.book_id)
+
+    # Assert
+    assert second["available_copies"] == 3
+    assert db_session.query.call_count == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_get_book_skips_fill_invalidated_during_read(db_session, book_instance):
+    # Arrange
+    cache = LRUCache()
+    book_crud = BookCRUD(db_session, cache)
+
+    def read_then_concurrent_commit():
+        # A writer commits and invalidates the book after this read saw the old row
+        invalidate_book(cache, book_instance.book_id)
+        return book_instance
+    db_session.query.return_value.filter.return_value.first.side_effect = read_then_concurrent_commit
+
+    # Act
+    book = book_crud.get_book(book_instance.book_id)
+
+    # Assert
+    assert book["book_id"] == book_instance.book_id
+    assert len(cache) == 0
+
+def test_get_books_batch_by_isbn_skips_fill_invalidated_during_read(db_session, book_instance):
+    # Arrange
+    cache = LRUCache()
+    book_crud = BookCRUD(db_session, cache)
+
+    def read_then_concurrent_commit(*args):
+        invalidate_book(cache, book_instance.book_id)
+        return [book_instance]
+    db_session.query.return_value.filter.side_effect = read_then_concurrent_commit
+
+    # Act
+    books, _ = book_crud.get_books_batch(isbns=[book_instance.isbn])
+
+    # Assert
+    assert [book["isbn"] for book in books] == [book_instance.isbn]
+    assert len(cache) == 0
+
+def test_get_books_batch_by_id_preserves_order(db_session, book_instance):
+    # Arrange
+    book_instance.available_copies = 1
+    other = BookModel(book_id=uuid4(), title="Other", author="A", isbn="9999999999999", available_copies=0)
+    missing_id = uuid4()
+    db_session.query.return_value.filter.return_value = [book_instance, other]
+    book_crud = BookCRUD(db_session, LRUCache())
+
+    # Act
+    books, missing = book_crud.get_books_batch(book_ids=[other.book_id, missing_id, book_instance.book_id, other.book_id])
+
+    # Assert
+    assert [book["book_id"] for book in books] == [other.book_id, book_instance.book_id]
+    assert missing == [missing_id]
+    assert db_session.query.call_count == 1
+
+def test_get_books_batch_serves_cached_books(db_session, book_instance):
+    # Arrange
+    book_instance.available_copies = 2
+    cache = LRUCache()
+    book_crud = BookCRUD(db_session, cache)
+    cache.set(f"book:{book_instance.book_id}", book_crud._book_details(book_instance))
+
+    # Act
+    books, missing = book_crud.get_books_batch(book_ids=[book_instance.book_id])
+
+    # Assert
+    assert books[0]["available_copies"] == 2
+    assert missing == []
+    db_session.query.assert_not_called()
+
+def test_get_books_batch_by_isbn(db_session, book_instance):
+    # Arrange
+    book_instance.available_copies = 0
+    db_session.query.return_value.filter.return_value = [book_instance]
+    book_crud = BookCRUD(db_session, LRUCache())
+
+    # Act
+    books, missing = book_crud.get_books_batch(isbns=["0000000000000", book_instance.isbn])
+
+    # Assert
+    assert [book["isbn"] for book in books] == [book_instance.isbn]
+    assert missing == ["0000000000000"]
+
+def test_recompute_available_copies(db_session):
+    # Arrange
+    db_session.query.return_value.filter.return_value.update.return_value = 4
+    book_crud = BookCRUD(db_session)
+
+    # Act
+    result = book_crud.recompute_available_copies()
+
+    # Assert
+    assert result == 4
+    db_session.commit.assert_called_once()
+
+def test_recompute_available_copies_error(db_session):
+    # Arrange
+    db_session.query.return_value.filter.return_value.update.side_effect = Exception("Database error")
+    book_crud = BookCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        book_crud.recompute_available_copies()
+    assert exc.value.status_code == 500
+    db_session.rollback.assert_called_once()
+
+def test_search_books_success(db_session, book_instance):
+    # Arrange
+    mock_results = [
+        Mock(
+            book_id=book_instance.book_id,
+            title=book_instance.title,
+            author=book_instance.author,
+            isbn=book_instance.isbn,
+            publication_year=book_instance.publication_year,
+            available_copies=1,
+            rank=0.5,
+            title_highlight="\x02Test\x03 Book",
+            description_highlight="A \x02test\x03 book <script>alert(1)</script>"
+        ),
+        Mock(book_id=uuid4(), rank=0.25)
+    ]
+    db_session.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = mock_results
+    book_crud = BookCRUD(db_session)
+
+    # Act
+    result = book_crud.search_books("test", limit=1)
+
+    # Assert
+    assert len(result["books"]) == 1
+    assert result["books"][0]["title_highlight"] == "<mark>Test</mark> Book"
+    assert result["books"][0]["description_highlight"] == "A <mark>test</mark> book &lt;script&gt;alert(1)&lt;/script&gt;"
+    assert result["has_next"] is True
+    assert decode_cursor(result["next_cursor"]) == {"rank": 0.5, "book_id": str(book_instance.book_id)}
+
+def test_search_books_cursor_compares_rank_in_double_precision(db_session, book_instance):
+    # Arrange
+    ranked = db_session.query.return_value.filter.return_value
+    ranked.filter.return_value.order_by.return_value.limit.return_value.all.return_value = []
+    book_crud = BookCRUD(db_session)
+    cursor = encode_cursor({"rank": 0.10000000149011612, "book_id": str(book_instance.book_id)})
+
+    # Act
+    book_crud.search_books("test", limit=1, cursor=cursor)
+
+    # Assert: ties at the cursor's rank are matched exactly, not as real against numeric
+    keyset = str(ranked.filter.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert keyset.count("CAST(ts_rank_cd(books.search_vector, websearch_to_tsquery(") == 2
+    assert keyset.count("AS FLOAT(53))") == 2
+    order_by = [str(c.compile(dialect=postgresql.dialect())) for c in ranked.filter.return_value.order_by.call_args.args]
+    assert order_by[0].startswith("CAST(ts_rank_cd(") and order_by[0].endswith("AS FLOAT(53)) DESC")
+
+def test_search_books_invalid_cursor(db_session):
+    # Arrange
+    book_crud = BookCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        book_crud.search_books("test", cursor=encode_cursor({"rank": "high"}))
+    assert exc.value.status_code == 400
+
+def test_get_most_popular_books(db_session, book_instance):
+    # Arrange
+    mock_results = [
+        Mock(book_id=book_instance.book_id, title=book_instance.title, author=book_instance.author, recent_orders=7)
+    ]
+    db_session.query.return_value.join.return_value.order_by.return_value.all.return_value = mock_results
+    book_crud = BookCRUD(db_session)
+
+    # Act
+    result = book_crud.get_most_popular_books(limit=5, days=7)
+
+    # Assert
+    assert result == [{
+        "book_id": book_instance.book_id,
+        "title": book_instance.title,
+        "author": book_instance.author,
+        "recent_orders": 7
+    }]
+    limit_mock = db_session.query.return_value.filter.return_value.group_by.return_value.order_by.return_value.limit
+    limit_mock.assert_called_once_with(5)
+
+def test_get_most_popular_books_error(db_session):
+    # Arrange
+    db_session.query.side_effect = Exception("Database error")
+    book_crud = BookCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        book_crud.get_most_popular_books()
+    assert exc.value.status_code == 500
+
+def test_prune_popularity_rollup_deletes_buckets_outside_window(db_session):
+    # Arrange
+    db_session.scalar.return_value = date(2026, 1, 1)
+    db_session.execute.return_value.scalars.return_value.all.return_value = [uuid4(), uuid4()]
+    book_crud = BookCRUD(db_session)
+
+    # Act
+    pruned = book_crud.prune_popularity_rollup(batch_size=2)
+
+    # Assert
+    assert pruned == 2
+    statement = db_session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    assert str(statement).startswith("DELETE FROM book_daily_orders")
+    assert date(2025, 1, 2) in statement.params.values()
+    db_session.commit.assert_called_once()
@@ -0,0 +1,110 @@
+import pytest
+from uuid import uuid4
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import make_transient_to_detached
+from app.models.user import User
+from app.utils.cache import (
+    LRUCache, book_cache_key, get_book_cache, mark_book_changed,
+    get_principal_cache, principal_cache_key, mark_user_changed, _track_changed_users
+)
+
+def test_lru_cache_hit_and_miss():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_lru_cache_expires_entries(mocker):
+    clock = mocker.patch("app.utils.cache.time.monotonic", return_value=100.0)
+    cache = LRUCache(max_size=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+    clock.return_value = 111.0
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats()["expirations"] == 1
+
+def test_lru_cache_delete_and_clear():
+    cache = LRUCache(max_size=4, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.delete("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["invalidations"] == 2
+
+def test_changed_book_invalidated_on_commit():
+    # Arrange
+    book_id = uuid4()
+    cache = get_book_cache()
+    cache.set(book_cache_key(book_id), {"book_id": book_id})
+    session = Session()
+
+    # Act
+    mark_book_changed(session, book_id)
+    assert cache.get(book_cache_key(book_id)) is not None
+    session.commit()
+
+    # Assert
+    assert cache.get(book_cache_key(book_id)) is None
+
+def test_changed_book_kept_on_rollback():
+    # Arrange
+    book_id = uuid4()
+    cache = get_book_cache()
+    cache.set(book_cache_key(book_id), {"book_id": book_id})
+    session = Session()
+    session.begin()
+
+    # Act
+    mark_book_changed(session, book_id)
+    session.rollback()
+    session.commit()
+
+    # Assert
+    assert cache.get(book_cache_key(book_id)) == {"book_id": book_id}
+
+def test_changed_user_principal_invalidated_on_commit():
+    # Arrange
+    cache = get_principal_cache()
+    cache.set(principal_cache_key("alice"), {"username": "alice"})
+    session = Session()
+
+    # Act
+    mark_user_changed(session, "alice")
+    session.commit()
+
+    # Assert
+    assert cache.get(principal_cache_key("alice")) is None
+
+def test_deleted_and_modified_users_are_tracked():
+    # Arrange
+    session = Session()
+    deleted = User(user_id=uuid4(), username="alice", role="reader", password_hash="x")
+    promoted = User(user_id=uuid4(), username="bob", role="reader", password_hash="x")
+    for user in (deleted, promoted):
+        make_transient_to_detached(user)
+        session.add(user)
+    session.delete(deleted)
+    promoted.role = "librarian"
+
+    # Act
+    _track_changed_users(session, None, None)
+
+    # Assert
+    assert session.info["changed_users"] == {"alice", "bob"}
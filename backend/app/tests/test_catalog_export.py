@@ -0,0 +1,39 @@
+import csv
+import gzip
+import io
+import json
+from uuid import uuid4
+from app.schemas.book import ExportFormat
+from app.utils.catalog_export import encode_export, gzip_chunks, EXPORT_COLUMNS
+
+def _rows(count):
+    return [(uuid4(), f"{i:013d}", f"Title {i}", "Author", 2000, None, i % 3) for i in range(count)]
+
+def test_encode_export_ndjson():
+    rows = _rows(3)
+    body = b"".join(encode_export(rows, ExportFormat.ndjson)).decode()
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert len(lines) == 3
+    assert lines[0]["book_id"] == str(rows[0][0])
+    assert lines[2]["available_copies"] == 2
+    assert lines[0]["description"] is None
+
+def test_encode_export_csv_with_header():
+    rows = _rows(2)
+    body = b"".join(encode_export(rows, ExportFormat.csv)).decode()
+    records = list(csv.reader(io.StringIO(body)))
+    assert tuple(records[0]) == EXPORT_COLUMNS
+    assert records[1][2] == "Title 0"
+    assert len(records) == 3
+
+def test_encode_export_splits_large_exports_into_chunks():
+    chunks = list(encode_export(_rows(2000), ExportFormat.ndjson))
+    assert len(chunks) > 1
+
+def test_encode_export_empty_catalog():
+    assert b"".join(encode_export([], ExportFormat.ndjson)) == b""
+    assert b"".join(encode_export([], ExportFormat.csv)).decode().strip() == ",".join(EXPORT_COLUMNS)
+
+def test_gzip_chunks_round_trip():
+    chunks = list(encode_export(_rows(500), ExportFormat.csv))
+    assert gzip.decompress(b"".join(gzip_chunks(chunks))) == b"".join(chunks)
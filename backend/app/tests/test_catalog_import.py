@@ -0,0 +1,77 @@
+import io
+from app.schemas.book import ImportFormat
+from app.utils.catalog_import import read_import_chunks
+
+CSV_HEADER = "title,author,isbn,publication_year,description,num_copies\n"
+
+def test_read_csv_chunks():
+    # Arrange
+    lines = io.StringIO(
+        CSV_HEADER
+        + "Dune,Frank Herbert,9780441172719,1965,,3\n"
+        + "Emma,Jane Austen,9780141439587,,A novel,1\n"
+    )
+
+    # Act
+    chunks = list(read_import_chunks(lines, ImportFormat.csv))
+
+    # Assert
+    assert len(chunks) == 1
+    rows, errors = chunks[0]
+    assert errors == []
+    assert [line_no for line_no, _ in rows] == [2, 3]
+    assert rows[0][1].description is None
+    assert rows[1][1].publication_year is None
+    assert rows[0][1].num_copies == 3
+
+def test_read_csv_reports_invalid_rows():
+    # Arrange
+    lines = io.StringIO(
+        CSV_HEADER
+        + "Dune,Frank Herbert,123,1965,,3\n"
+        + "Emma,Jane Austen,9780141439587,,,1,extra\n"
+        + "Ulysses,James Joyce,9780199535675,1922,,-1\n"
+    )
+
+    # Act
+    rows, errors = next(read_import_chunks(lines, ImportFormat.csv))
+
+    # Assert
+    assert rows == []
+    assert [error["line"] for error in errors] == [2, 3, 4]
+    assert errors[0]["isbn"] == "123"
+    assert errors[0]["error"].startswith("isbn:")
+    assert errors[1]["error"] == "Too many columns"
+    assert errors[2]["error"].startswith("num_copies:")
+
+def test_read_jsonl_chunks():
+    # Arrange
+    lines = io.StringIO(
+        '{"title": "Dune", "author": "Frank Herbert", "isbn": "9780441172719", "num_copies": 2}\n'
+        "\n"
+        "not json\n"
+        "[1, 2]\n"
+        '{"title": "Emma", "author": "Jane Austen", "isbn": "9780141439587", "num_copies": 0}\n'
+    )
+
+    # Act
+    chunks = list(read_import_chunks(lines, ImportFormat.jsonl, chunk_size=1))
+
+    # Assert
+    assert [len(rows) for rows, _ in chunks] == [1, 1]
+    errors = [error for _, chunk_errors in chunks for error in chunk_errors]
+    assert [error["line"] for error in errors] == [3, 4]
+    assert errors[0]["error"].startswith("Invalid JSON")
+    assert errors[1]["error"] == "Expected a JSON object"
+    assert chunks[1][0][0][0] == 5
+
+def test_read_csv_rejects_too_many_copies():
+    # Arrange
+    lines = io.StringIO(CSV_HEADER + "Dune,Frank Herbert,9780441172719,1965,,5000000\n")
+
+    # Act
+    rows, errors = next(read_import_chunks(lines, ImportFormat.csv))
+
+    # Assert
+    assert rows == []
+    assert errors[0]["error"].startswith("num_copies:")
@@ -0,0 +1,220 @@
+import pytest
+from uuid import uuid4
+from datetime import datetime
+from unittest.mock import Mock
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.crud.hold import HoldCRUD
+from app.models.hold import Hold as HoldModel
+from app.models.book_copy import BookCopy
+from app.exceptions.crud_exception import CRUDException
+
+# Fixture for mock database session
+@pytest.fixture
+def db_session():
+    session = Mock(spec=Session)
+    session.info = {}
+    return session
+
+# Fixture for a waiting hold
+@pytest.fixture
+def hold_instance():
+    return HoldModel(
+        hold_id=uuid4(),
+        book_id=uuid4(),
+        user_id=uuid4(),
+        status="waiting",
+        created_at=datetime(2025, 5, 29)
+    )
+
+def test_place_hold_success(db_session):
+    # Arrange
+    db_session.query.return_value.filter.return_value.scalar.return_value = 0
+    hold_crud = HoldCRUD(db_session)
+    user_id, book_id = uuid4(), uuid4()
+
+    # Act
+    hold = hold_crud.place_hold(user_id, book_id)
+
+    # Assert
+    assert hold.user_id == user_id
+    assert hold.book_id == book_id
+    db_session.add.assert_called_once()
+    db_session.commit.assert_called_once()
+
+def test_place_hold_when_copies_available(db_session):
+    # Arrange
+    db_session.query.return_value.filter.return_value.scalar.return_value = 2
+    hold_crud = HoldCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        hold_crud.place_hold(uuid4(), uuid4())
+    assert exc.value.status_code == 409
+    db_session.add.assert_not_called()
+
+def test_place_hold_book_not_found(db_session):
+    # Arrange
+    db_session.query.return_value.filter.return_value.scalar.return_value = None
+    hold_crud = HoldCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        hold_crud.place_hold(uuid4(), uuid4())
+    assert exc.value.status_code == 404
+    assert exc.value.message == "Book not found"
+
+def test_place_hold_twice(db_session):
+    # Arrange
+    db_session.query.return_value.filter.return_value.scalar.return_value = 0
+    db_session.commit.side_effect = IntegrityError("duplicate", {}, None)
+    hold_crud = HoldCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        hold_crud.place_hold(uuid4(), uuid4())
+    assert exc.value.status_code == 409
+    db_session.rollback.assert_called_once()
+
+def test_queue_position_counts_earlier_holds(db_session, hold_instance):
+    # Arrange
+    db_session.query.return_value.filter.return_value.scalar.return_value = 4
+    hold_crud = HoldCRUD(db_session)
+
+    # Act & Assert
+    assert hold_crud.get_queue_position(hold_instance) == 5
+    hold_instance.status = "ready"
+    assert hold_crud.get_queue_position(hold_instance) is None
+
+def test_promote_holds_reserves_copies_for_oldest_holds(db_session, hold_instance):
+    # Arrange
+    book_copy = BookCopy(copy_id=uuid4(), book_id=hold_instance.book_id, status="available")
+    query = db_session.query.return_value.filter.return_value
+    query.order_by.return_value.limit.return_value.with_for_update.return_value.all.return_value = [hold_instance]
+    query.limit.return_value.with_for_update.return_value.all.return_value = [book_copy]
+    hold_crud = HoldCRUD(db_session)
+
+    # Act
+    reserved = hold_crud.promote_holds(hold_instance.book_id, 3)
+
+    # Assert
+    assert reserved == [book_copy.copy_id]
+    assert book_copy.status == "reserved"
+    assert hold_instance.status == "ready"
+    assert hold_instance.copy_id == book_copy.copy_id
+    assert hold_instance.expires_at > hold_instance.ready_at
+    # The copy left the available pool
+    assert db_session.info["changed_books"] == {hold_instance.book_id}
+    db_session.commit.assert_not_called()
+
+def test_promote_holds_without_waiting_holds(db_session):
+    # Arrange
+    query = db_session.query.return_value.filter.return_value
+    query.order_by.return_value.limit.return_value.with_for_update.return_value.all.return_value = []
+    hold_crud = HoldCRUD(db_session)
+
+    # Act & Assert
+    assert hold_crud.promote_holds(uuid4(), 1) == []
+    assert db_session.query.call_count == 1
+
+def test_release_copy_promotes_next_hold(db_session, mocker):
+    # Arrange
+    book_copy = BookCopy(copy_id=uuid4(), book_id=uuid4(), status="borrowed")
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = book_copy
+    promote = mocker.patch.object(HoldCRUD, "promote_holds", return_value=[])
+    hold_crud = HoldCRUD(db_session)
+
+    # Act
+    hold_crud.release_copy(book_copy.copy_id)
+
+    # Assert
+    assert book_copy.status == "available"
+    promote.assert_called_once_with(book_copy.book_id, 1)
+    db_session.commit.assert_called_once()
+
+def test_release_copy_leaves_copy_that_is_not_borrowed(db_session, mocker):
+    # Arrange
+    book_copy = BookCopy(copy_id=uuid4(), book_id=uuid4(), status="available")
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = book_copy
+    promote = mocker.patch.object(HoldCRUD, "promote_holds")
+    hold_crud = HoldCRUD(db_session)
+
+    # Act
+    released = hold_crud.release_copy(book_copy.copy_id)
+
+    # Assert
+    assert released is False
+    assert book_copy.status == "available"
+    promote.assert_not_called()
+    db_session.commit.assert_not_called()
+
+def test_release_copy_hands_copy_to_waiting_hold(db_session, hold_instance):
+    # Arrange
+    book_copy = BookCopy(copy_id=uuid4(), book_id=hold_instance.book_id, status="borrowed")
+    query = db_session.query.return_value.filter.return_value
+    query.with_for_update.return_value.first.return_value = book_copy
+    query.order_by.return_value.limit.return_value.with_for_update.return_value.all.return_value = [hold_instance]
+    # The copy query only sees the released copy once it has been flushed
+    flushed = []
+    db_session.flush.side_effect = lambda: flushed.append(book_copy.status)
+    query.limit.return_value.with_for_update.return_value.all.side_effect = \
+        lambda: [book_copy] if "available" in flushed else []
+    hold_crud = HoldCRUD(db_session)
+
+    # Act
+    hold_crud.release_copy(book_copy.copy_id)
+
+    # Assert
+    assert book_copy.status == "reserved"
+    assert hold_instance.status == "ready"
+    assert hold_instance.copy_id == book_copy.copy_id
+    db_session.commit.assert_called_once()
+
+def test_cancel_ready_hold_passes_copy_on(db_session, hold_instance, mocker):
+    # Arrange
+    hold_instance.status = "ready"
+    hold_instance.copy_id = uuid4()
+    book_copy = BookCopy(copy_id=hold_instance.copy_id, book_id=hold_instance.book_id, status="reserved")
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.side_effect = [
+        hold_instance, book_copy
+    ]
+    promote = mocker.patch.object(HoldCRUD, "promote_holds", return_value=[])
+    hold_crud = HoldCRUD(db_session)
+
+    # Act
+    result = hold_crud.cancel_hold(hold_instance.hold_id, hold_instance.user_id)
+
+    # Assert
+    assert result.status == "cancelled"
+    assert book_copy.status == "available"
+    promote.assert_called_once_with(hold_instance.book_id, 1)
+    db_session.commit.assert_called_once()
+
+def test_cancel_inactive_hold(db_session, hold_instance):
+    # Arrange
+    hold_instance.status = "fulfilled"
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = hold_instance
+    hold_crud = HoldCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        hold_crud.cancel_hold(hold_instance.hold_id, hold_instance.user_id)
+    assert exc.value.status_code == 409
+
+def test_expire_holds_releases_reserved_copies(db_session, hold_instance, mocker):
+    # Arrange
+    hold_instance.status = "ready"
+    hold_instance.copy_id = uuid4()
+    db_session.query.return_value.filter.return_value.order_by.return_value.limit.return_value \
+        .with_for_update.return_value.all.return_value = [hold_instance]
+    release = mocker.patch.object(HoldCRUD, "_release_reserved_copy")
+    hold_crud = HoldCRUD(db_session)
+
+    # Act
+    expired = hold_crud.expire_holds(batch_size=50)
+
+    # Assert
+    assert expired == 1
+    assert hold_instance.status == "expired"
+    release.assert_called_once_with(hold_instance)
+    db_session.commit.assert_called_once()
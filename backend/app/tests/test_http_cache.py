@@ -0,0 +1,102 @@
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+from app.utils.http_cache import make_etag, etag_matches, accepts_encoding
+from app.utils import catalog_version
+from app.utils.catalog_version import mark_catalog_changed, get_catalog_version, BUMP_VERSION_SQL, READ_VERSION_SQL
+
+def test_make_etag_depends_on_version_and_parts():
+    etag = make_etag(7, "books", 10, 0, None)
+    assert etag.startswith('"7-') and etag.endswith('"')
+    assert make_etag(7, "books", 10, 0, None) == etag
+    assert make_etag(8, "books", 10, 0, None) != etag
+    assert make_etag(7, "books", 20, 0, None) != etag
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('"1-abc"', True),
+    ('W/"1-abc"', True),
+    ('"0-def", "1-abc"', True),
+    ('"2-abc"', False),
+    ("*", True),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"1-abc"') is expected
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("gzip", True),
+    ("GZIP, deflate", True),
+    ("gzip;q=0", False),
+    ("identity, gzip;q=0", False),
+    ("gzip; q=0.5", True),
+    ("*", True),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("br, identity", False),
+])
+def test_accepts_encoding(header, expected):
+    assert accepts_encoding(header, "gzip") is expected
+
+def test_catalog_version_bumped_after_commit(mocker):
+    # Arrange
+    bind = MagicMock()
+    session = Session()
+    mocker.patch.object(session, "get_bind", return_value=bind)
+    session.begin()
+    mark_catalog_changed(session)
+
+    # Act
+    session.commit()
+
+    # Assert
+    connection = bind.connect.return_value.__enter__.return_value
+    connection.execute.assert_called_once_with(BUMP_VERSION_SQL)
+    connection.commit.assert_called_once()
+    assert "catalog_changed" not in session.info
+
+def test_catalog_version_not_bumped_on_rollback(mocker):
+    # Arrange
+    bind = MagicMock()
+    session = Session()
+    mocker.patch.object(session, "get_bind", return_value=bind)
+    session.begin()
+    mark_catalog_changed(session)
+
+    # Act
+    session.rollback()
+    session.commit()
+
+    # Assert
+    bind.connect.assert_not_called()
+
+def test_failed_catalog_version_bump_retried_before_next_read(mocker):
+    # Arrange
+    bind = MagicMock()
+    bind.connect.side_effect = ConnectionError("database unavailable")
+    session = Session()
+    mocker.patch.object(session, "get_bind", return_value=bind)
+    session.begin()
+    mark_catalog_changed(session)
+    session.commit()
+    db = MagicMock(spec=Session)
+    db.execute.return_value.scalar_one.return_value = 5
+
+    # Act
+    version = get_catalog_version(db)
+    get_catalog_version(db)
+
+    # Assert
+    assert version == 5
+    assert [call.args[0] for call in db.execute.call_args_list] == [BUMP_VERSION_SQL, READ_VERSION_SQL, READ_VERSION_SQL]
+    assert not catalog_version._bump_pending.is_set()
+
+def test_catalog_version_read_fails_while_bump_cannot_be_retried(mocker):
+    # Arrange
+    mocker.patch.object(catalog_version, "_bump_pending", MagicMock(is_set=MagicMock(return_value=True)))
+    db = MagicMock(spec=Session)
+    db.execute.side_effect = ConnectionError("database unavailable")
+
+    # Act & Assert
+    with pytest.raises(ConnectionError):
+        get_catalog_version(db)
@@ -0,0 +1,135 @@
+import json
+import pytest
+from uuid import uuid4
+from unittest.mock import Mock
+from fastapi import HTTPException
+from app.crud.idempotency import IdempotencyCRUD
+from app.exceptions.crud_exception import CRUDException
+from app.schemas.hold import Hold
+from app.utils.idempotency import IdempotentRequest, REPLAYED_HEADER
+
+@pytest.fixture
+def crud():
+    crud = Mock(spec=IdempotencyCRUD)
+    crud.reserve.return_value = None
+    return crud
+
+@pytest.fixture
+def idempotent(crud):
+    return IdempotentRequest(crud, b"key", b"request")
+
+def test_run_without_key_calls_handler():
+    # Arrange
+    handler = Mock(return_value={"ok": True})
+
+    # Act
+    result = IdempotentRequest().run(handler)
+
+    # Assert
+    assert result == {"ok": True}
+    handler.assert_called_once()
+
+def test_run_stores_first_response(idempotent, crud):
+    # Arrange
+    handler = Mock(return_value={"updated": 2})
+
+    # Act
+    response = idempotent.run(handler)
+
+    # Assert
+    assert response.status_code == 200
+    assert json.loads(response.body) == {"updated": 2}
+    crud.complete.assert_called_once_with(b"key", 200, {"updated": 2})
+
+def test_run_serializes_with_response_model(idempotent, crud):
+    # Arrange
+    hold = {
+        "hold_id": uuid4(), "book_id": uuid4(), "user_id": uuid4(), "status": "waiting",
+        "created_at": "2026-10-18T10:00:00", "position": 3
+    }
+
+    # Act
+    response = idempotent.run(lambda: hold, Hold)
+
+    # Assert
+    body = json.loads(response.body)
+    assert body["hold_id"] == str(hold["hold_id"])
+    assert body["copy_id"] is None
+    assert crud.complete.call_args.args[2] == body
+
+def test_run_replays_stored_response_without_calling_handler(idempotent, crud):
+    # Arrange
+    crud.reserve.return_value = Mock(status_code=200, response_body={"order_id": "abc"})
+    handler = Mock()
+
+    # Act
+    response = idempotent.run(handler)
+
+    # Assert
+    handler.assert_not_called()
+    assert json.loads(response.body) == {"order_id": "abc"}
+    assert response.headers[REPLAYED_HEADER] == "true"
+    crud.complete.assert_not_called()
+
+def test_run_stores_client_errors(idempotent, crud):
+    # Arrange
+    handler = Mock(side_effect=HTTPException(status_code=404, detail="No available copies for this book"))
+
+    # Act & Assert
+    with pytest.raises(HTTPException):
+        idempotent.run(handler)
+    crud.complete.assert_called_once_with(b"key", 404, {"detail": "No available copies for this book"})
+    crud.release.assert_not_called()
+
+def test_run_releases_key_after_server_error(idempotent, crud):
+    # Arrange
+    handler = Mock(side_effect=HTTPException(status_code=500, detail="Internal server error"))
+
+    # Act & Assert
+    with pytest.raises(HTTPException):
+        idempotent.run(handler)
+    crud.release.assert_called_once_with(b"key")
+    crud.complete.assert_not_called()
+
+def test_run_rejects_conflicting_reuse(idempotent, crud):
+    # Arrange
+    crud.reserve.side_effect = CRUDException(status_code=422, message="Idempotency-Key was already used for a different request")
+    handler = Mock()
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        idempotent.run(handler)
+    assert exc.value.status_code == 422
+    handler.assert_not_called()
+
+def test_reserve_claims_new_key():
+    # Arrange
+    db = Mock()
+    db.execute.return_value.first.return_value = (b"key",)
+
+    # Act
+    stored = IdempotencyCRUD(db).reserve(b"key", b"request")
+
+    # Assert
+    assert stored is None
+    db.execute.assert_called_once()
+    db.commit.assert_called_once()
+
+def test_reserve_reports_request_in_progress():
+    # Arrange
+    db = Mock()
+    db.execute.return_value.first.side_effect = [None, Mock(request_hash=b"request", status_code=None)]
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        IdempotencyCRUD(db).reserve(b"key", b"request")
+    assert exc.value.status_code == 409
+
+def test_reserve_returns_stored_response():
+    # Arrange
+    db = Mock()
+    stored = Mock(request_hash=b"request", status_code=201, response_body={"ok": True})
+    db.execute.return_value.first.side_effect = [None, stored]
+
+    # Act & Assert
+    assert IdempotencyCRUD(db).reserve(b"key", b"request") is stored
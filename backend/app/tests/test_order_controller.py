@@ -3,7 +3,7 @@ from unittest.mock import Mock
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from app.controllers.orders.order_controller import OrderController
-from app.schemas.order import OrderBase
+from app.schemas.order import OrderBase, OrderBulkStatusPut
 from app.crud.order import OrderCRUD
 from app.crud.book_copy import BookCopyCRUD
 from app.exceptions.crud_exception import CRUDException
@@ -55,6 +55,7 @@ def order_instance(book_copy_instance):  # Depend on book_copy_instance for copy
 def mock_order_crud(order_instance):
     mock_crud = Mock(spec=OrderCRUD)
     mock_crud.create_order = Mock(return_value=order_instance)
+    mock_crud.checkout = Mock(return_value=order_instance)
     mock_crud.get_all_active_orders = Mock(return_value=[
         (
             order_instance.order_id,
@@ -106,22 +107,34 @@ def test_create_order_success_borrow(db_session, order_data, order_instance, moc
 
     # Assert
     assert result == order_instance
-    mock_book_copy_crud.get_available_copies.assert_called_once_with(order_data["book_id"])
-    mock_book_copy_crud.update_book_copy_status.assert_called_once_with(
-        order_instance.copy_id, "borrowed"
+    mock_order_crud.checkout.assert_called_once_with(
+        user_id, order_data["book_id"], "borrow", datetime(2025, 6, 5, 12, 0, tzinfo=timezone.utc)
     )
-    mock_order_crud.create_order.assert_called_once()
-    called_order = mock_order_crud.create_order.call_args[0][0]
-    assert isinstance(called_order, OrderBase)
-    assert called_order.user_id == user_id
-    assert called_order.copy_id == order_instance.copy_id
-    assert called_order.order_type == "borrow"
-    assert called_order.due_date == datetime(2025, 6, 5, 12, 0, tzinfo=timezone.utc)
+    # The copy is claimed inside the checkout transaction, not through separate commits
+    mock_book_copy_crud.get_available_copies.assert_not_called()
+    mock_book_copy_crud.update_book_copy_status.assert_not_called()
+    mock_order_crud.create_order.assert_not_called()
+
+def test_create_order_read_in_library_has_no_due_date(db_session, order_data, mock_order_crud, mock_book_copy_crud):
+    # Arrange
+    user_id = uuid4()
+    order_data["order_type"] = "read_in_library"
+    order_controller = OrderController(db=db_session)
+    order_controller.order_crud = mock_order_crud
+    order_controller.book_copy_crud = mock_book_copy_crud
+
+    # Act
+    order_controller.create_order(user_id, order_data)
+
+    # Assert
+    mock_order_crud.checkout.assert_called_once_with(user_id, order_data["book_id"], "read_in_library", None)
 
 def test_create_order_no_available_copies(db_session, order_data, mock_order_crud, mock_book_copy_crud):
     # Arrange
     user_id = uuid4()
-    mock_book_copy_crud.get_available_copies = Mock(return_value=[])
+    mock_order_crud.checkout = Mock(side_effect=CRUDException(
+        message="No available copies for this book", status_code=404
+    ))
     order_controller = OrderController(db=db_session)
     order_controller.order_crud = mock_order_crud
     order_controller.book_copy_crud = mock_book_copy_crud
@@ -131,14 +144,12 @@ def test_create_order_no_available_copies(db_session, order_data, mock_order_cru
         order_controller.create_order(user_id, order_data)
     assert exc.value.status_code == 404
     assert exc.value.detail == "No available copies for this book"
-    mock_book_copy_crud.get_available_copies.assert_called_once()
-    mock_book_copy_crud.update_book_copy_status.assert_not_called()
-    mock_order_crud.create_order.assert_not_called()
+    mock_order_crud.checkout.assert_called_once()
 
 def test_create_order_crud_exception(db_session, order_data, mock_order_crud, mock_book_copy_crud):
     # Arrange
     user_id = uuid4()
-    mock_order_crud.create_order = Mock(side_effect=CRUDException(
+    mock_order_crud.checkout = Mock(side_effect=CRUDException(
         message="Order creation failed", status_code=400
     ))
     order_controller = OrderController(db=db_session)
@@ -150,13 +161,12 @@ def test_create_order_crud_exception(db_session, order_data, mock_order_crud, mo
         order_controller.create_order(user_id, order_data)
     assert exc.value.status_code == 400
     assert exc.value.detail == "Order creation failed"
-    mock_book_copy_crud.update_book_copy_status.assert_called_once()
-    mock_order_crud.create_order.assert_called_once()
+    mock_order_crud.checkout.assert_called_once()
 
 def test_create_order_unexpected_error(db_session, order_data, mock_order_crud, mock_book_copy_crud):
     # Arrange
     user_id = uuid4()
-    mock_order_crud.create_order = Mock(side_effect=Exception("Unexpected error"))
+    mock_order_crud.checkout = Mock(side_effect=Exception("Unexpected error"))
     order_controller = OrderController(db=db_session)
     order_controller.order_crud = mock_order_crud
     order_controller.book_copy_crud = mock_book_copy_crud
@@ -166,8 +176,7 @@ def test_create_order_unexpected_error(db_session, order_data, mock_order_crud,
         order_controller.create_order(user_id, order_data)
     assert exc.value.status_code == 500
     assert exc.value.detail == "Internal server error"
-    mock_book_copy_crud.update_book_copy_status.assert_called_once()
-    mock_order_crud.create_order.assert_called_once()
+    mock_order_crud.checkout.assert_called_once()
 
 def test_get_all_orders_success(db_session, mock_order_crud, mock_book_copy_crud):
     # Arrange
@@ -181,7 +190,7 @@ def test_get_all_orders_success(db_session, mock_order_crud, mock_book_copy_crud
     # Assert
     assert len(result) == 1
     assert result[0][-1] == "Test Book"
-    mock_order_crud.get_all_active_orders.assert_called_once_with(10, 0)
+    mock_order_crud.get_all_active_orders.assert_called_once_with(10, 0, None)
 
 def test_get_all_orders_empty(db_session, mock_order_crud, mock_book_copy_crud):
     # Arrange
@@ -195,7 +204,7 @@ def test_get_all_orders_empty(db_session, mock_order_crud, mock_book_copy_crud):
 
     # Assert
     assert result == []
-    mock_order_crud.get_all_active_orders.assert_called_once_with(10, 0)
+    mock_order_crud.get_all_active_orders.assert_called_once_with(10, 0, None)
 
 def test_get_all_orders_error(db_session, mock_order_crud, mock_book_copy_crud):
     # Arrange
@@ -224,7 +233,7 @@ def test_get_orders_by_user_success(db_session, mock_order_crud, mock_book_copy_
 
     # Assert
     assert len(result) == 1
-    mock_order_crud.get_orders_by_user.assert_called_once_with(user_id, 10, 0)
+    mock_order_crud.get_orders_by_user.assert_called_once_with(user_id, 10, 0, None)
 
 def test_get_orders_by_user_empty(db_session, mock_order_crud, mock_book_copy_crud):
     # Arrange
@@ -239,7 +248,7 @@ def test_get_orders_by_user_empty(db_session, mock_order_crud, mock_book_copy_cr
 
     # Assert
     assert result == []
-    mock_order_crud.get_orders_by_user.assert_called_once_with(user_id, 10, 0)
+    mock_order_crud.get_orders_by_user.assert_called_once_with(user_id, 10, 0, None)
 
 def test_get_orders_by_user_error(db_session, mock_order_crud, mock_book_copy_crud):
     # Arrange
@@ -270,6 +279,7 @@ def test_update_order_status_success(db_session, order_instance, mock_order_crud
     # Assert
     assert result == order_instance
     mock_order_crud.update_order_status.assert_called_once_with(order_id, "completed")
+    mock_book_copy_crud.update_book_copy_status.assert_not_called()
 
 def test_update_order_status_error(db_session, mock_order_crud, mock_book_copy_crud):
     # Arrange
@@ -285,4 +295,30 @@ def test_update_order_status_error(db_session, mock_order_crud, mock_book_copy_c
     with pytest.raises(HTTPException) as exc:
         order_controller.update_order_status(order_id, "completed")
     assert exc.value.status_code == 404
-    assert exc.value.detail == "Order not found"
\ No newline at end of file
+    assert exc.value.detail == "Order not found"
+
+def test_update_orders_status_counts_updates(db_session, mock_order_crud, mock_book_copy_crud):
+    # Arrange
+    order_ids = [uuid4(), uuid4()]
+    mock_order_crud.bulk_update_status = Mock(return_value=[
+        {"order_id": order_ids[0], "outcome": "updated"},
+        {"order_id": order_ids[1], "outcome": "not_found"},
+    ])
+    order_controller = OrderController(db=db_session)
+    order_controller.order_crud = mock_order_crud
+    order_controller.book_copy_crud = mock_book_copy_crud
+
+    # Act
+    result = order_controller.update_orders_status(OrderBulkStatusPut(order_ids=order_ids, status="completed"))
+
+    # Assert
+    assert result["updated"] == 1
+    assert len(result["results"]) == 2
+    mock_order_crud.bulk_update_status.assert_called_once_with("completed", order_ids, None)
+    mock_book_copy_crud.update_book_copy_status.assert_not_called()
+
+def test_order_bulk_status_put_requires_one_key_kind():
+    with pytest.raises(ValueError):
+        OrderBulkStatusPut(order_ids=[uuid4()], copy_ids=[uuid4()], status="completed")
+    with pytest.raises(ValueError):
+        OrderBulkStatusPut(status="completed")
@@ -4,15 +4,22 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.crud.order import OrderCRUD
 from app.models.order import Order as OrderModel
+from app.models.book_copy import BookCopy
+from app.crud.hold import HoldCRUD
+from app.crud.book_copy import BookCopyCRUD
+from app.models.hold import Hold as HoldModel
 from app.schemas.order import OrderBase
 from app.exceptions.crud_exception import CRUDException
+from app.utils.pagination import encode_cursor, decode_cursor
 from unittest.mock import Mock
 from datetime import datetime
 
 # Fixture for mock database session
 @pytest.fixture
 def db_session():
-    return Mock(spec=Session)
+    session = Mock(spec=Session)
+    session.info = {}
+    return session
 
 # Fixture for sample order data
 @pytest.fixture
@@ -53,6 +60,8 @@ def test_create_order_success(db_session, order_data, order_instance):
     assert result.order_type == order_data.order_type
     assert result.user_id == order_data.user_id
     db_session.add.assert_called_once()
+    # Today's popularity bucket is bumped in the same transaction
+    db_session.execute.assert_called_once()
     db_session.commit.assert_called_once()
     db_session.refresh.assert_called_once()
 
@@ -220,11 +229,10 @@ def test_get_orders_by_user_error(db_session):
     assert exc.value.status_code == 500
     assert exc.value.message == "Internal server error"
 
-def test_update_order_status_success(db_session, order_instance):
+def test_update_order_status_success(db_session, order_instance, mocker):
     # Arrange
-    db_session.query.return_value.filter.return_value.first.return_value = order_instance
-    db_session.commit = Mock()
-    db_session.refresh = Mock()
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = order_instance
+    release = mocker.patch.object(HoldCRUD, "release_copy", return_value=True)
     order_crud = OrderCRUD(db_session)
     
     # Act
@@ -233,13 +241,56 @@ def test_update_order_status_success(db_session, order_instance):
     # Assert
     assert isinstance(result, OrderModel)
     assert result.status == "completed"
+    # The copy is released in the same transaction as the order update
+    release.assert_called_once_with(order_instance.copy_id, commit=False)
     db_session.commit.assert_called_once()
     db_session.refresh.assert_called_once()
 
+def test_update_order_status_completes_order_once(db_session, order_instance, mocker):
+    # Arrange
+    hold = HoldModel(hold_id=uuid4(), book_id=uuid4(), user_id=uuid4(), status="waiting")
+    book_copy = BookCopy(copy_id=order_instance.copy_id, book_id=hold.book_id, status="borrowed")
+    query = db_session.query.return_value.filter.return_value
+    query.with_for_update.return_value.first.side_effect = [order_instance, book_copy, order_instance]
+    query.order_by.return_value.limit.return_value.with_for_update.return_value.all.return_value = [hold]
+    query.limit.return_value.with_for_update.return_value.all.return_value = [book_copy]
+    set_status = mocker.spy(BookCopyCRUD, "set_book_copy_status")
+    order_crud = OrderCRUD(db_session)
+
+    # Act
+    order_crud.update_order_status(order_instance.order_id, "completed")
+    order_crud.update_order_status(order_instance.order_id, "completed")
+
+    # Assert
+    assert order_instance.status == "completed"
+    assert book_copy.status == "reserved"
+    assert hold.status == "ready" and hold.copy_id == book_copy.copy_id
+    # Released once (borrowed -> available) and reserved once for the hold
+    assert [call.args[2] for call in set_status.call_args_list] == ["available", "reserved"]
+    assert db_session.commit.call_count == 2
+
+def test_update_order_status_leaves_copy_that_is_not_borrowed(db_session, order_instance, mocker):
+    # Arrange
+    book_copy = BookCopy(copy_id=order_instance.copy_id, book_id=uuid4(), status="reserved")
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.side_effect = [
+        order_instance, book_copy
+    ]
+    promote = mocker.patch.object(HoldCRUD, "promote_holds")
+    order_crud = OrderCRUD(db_session)
+
+    # Act
+    order_crud.update_order_status(order_instance.order_id, "completed")
+
+    # Assert
+    assert order_instance.status == "completed"
+    assert book_copy.status == "reserved"
+    promote.assert_not_called()
+    assert "changed_books" not in db_session.info
+
 def test_update_order_status_not_found(db_session):
     # Arrange
     order_id = uuid4()
-    db_session.query.return_value.filter.return_value.first.return_value = None
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = None
     order_crud = OrderCRUD(db_session)
     
     # Act & Assert
@@ -250,7 +301,7 @@ def test_update_order_status_not_found(db_session):
 
 def test_update_order_status_integrity_error(db_session, order_instance):
     # Arrange
-    db_session.query.return_value.filter.return_value.first.return_value = order_instance
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = order_instance
     db_session.commit = Mock(side_effect=IntegrityError("constraint violation", {}, None))
     db_session.rollback = Mock()
     order_crud = OrderCRUD(db_session)
@@ -262,9 +313,10 @@ def test_update_order_status_integrity_error(db_session, order_instance):
     assert exc.value.message == "Invalid status update"
     db_session.rollback.assert_called_once()
 
-def test_update_order_status_unexpected_error(db_session, order_instance):
+def test_update_order_status_unexpected_error(db_session, order_instance, mocker):
     # Arrange
-    db_session.query.return_value.filter.return_value.first.return_value = order_instance
+    db_session.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = order_instance
+    mocker.patch.object(HoldCRUD, "release_copy", return_value=True)
     db_session.commit = Mock(side_effect=Exception("Unexpected error"))
     db_session.rollback = Mock()
     order_crud = OrderCRUD(db_session)
@@ -274,4 +326,219 @@ def test_update_order_status_unexpected_error(db_session, order_instance):
         order_crud.update_order_status(order_instance.order_id, "completed")
     assert exc.value.status_code == 500
     assert exc.value.message == "Internal server error"
-    db_session.rollback.assert_called_once()
\ No newline at end of file
+    db_session.rollback.assert_called_once()
+
+def test_checkout_claims_copy_in_one_transaction(db_session, mocker):
+    # Arrange
+    mocker.patch.object(HoldCRUD, "claim_ready_hold", return_value=None)
+    book_copy = BookCopy(copy_id=uuid4(), book_id=uuid4(), status="available")
+    locked_query = db_session.query.return_value.filter.return_value.limit.return_value.with_for_update.return_value
+    locked_query.first.return_value = book_copy
+    order_crud = OrderCRUD(db_session)
+
+    # Act
+    result = order_crud.checkout(uuid4(), book_copy.book_id, "borrow", datetime(2025, 6, 5))
+
+    # Assert
+    assert result.copy_id == book_copy.copy_id
+    assert book_copy.status == "borrowed"
+    db_session.query.return_value.filter.return_value.limit.return_value.with_for_update.assert_called_once_with(skip_locked=True)
+    db_session.commit.assert_called_once()
+    db_session.rollback.assert_not_called()
+
+def test_checkout_no_available_copies(db_session, mocker):
+    # Arrange
+    mocker.patch.object(HoldCRUD, "claim_ready_hold", return_value=None)
+    locked_query = db_session.query.return_value.filter.return_value.limit.return_value.with_for_update.return_value
+    locked_query.first.return_value = None
+    order_crud = OrderCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        order_crud.checkout(uuid4(), uuid4(), "borrow")
+    assert exc.value.status_code == 404
+    assert exc.value.message == "No available copies for this book"
+    db_session.add.assert_not_called()
+    db_session.commit.assert_not_called()
+    db_session.rollback.assert_called_once()
+
+def test_checkout_uses_copy_reserved_for_ready_hold(db_session, mocker):
+    # Arrange
+    book_copy = BookCopy(copy_id=uuid4(), book_id=uuid4(), status="reserved")
+    mocker.patch.object(HoldCRUD, "claim_ready_hold", return_value=book_copy)
+    order_crud = OrderCRUD(db_session)
+
+    # Act
+    result = order_crud.checkout(uuid4(), book_copy.book_id, "borrow")
+
+    # Assert
+    assert result.copy_id == book_copy.copy_id
+    assert book_copy.status == "borrowed"
+    # Reserved copies are not counted as available, so the counter is untouched
+    assert "changed_books" not in db_session.info
+    db_session.query.return_value.filter.return_value.limit.assert_not_called()
+    db_session.commit.assert_called_once()
+
+def test_mark_overdue_orders_returns_batch_count(db_session):
+    # Arrange
+    db_session.execute.return_value.scalars.return_value.all.return_value = [uuid4(), uuid4()]
+    order_crud = OrderCRUD(db_session)
+
+    # Act
+    marked = order_crud.mark_overdue_orders(batch_size=100)
+
+    # Assert
+    assert marked == 2
+    db_session.execute.assert_called_once()
+    db_session.commit.assert_called_once()
+
+def test_mark_overdue_orders_error(db_session):
+    # Arrange
+    db_session.execute.side_effect = Exception("Database error")
+    order_crud = OrderCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        order_crud.mark_overdue_orders(batch_size=100)
+    assert exc.value.status_code == 500
+    db_session.rollback.assert_called_once()
+
+def _order_row(order_date):
+    return Mock(
+        order_id=uuid4(),
+        username="test_user",
+        copy_id=uuid4(),
+        order_type="borrow",
+        order_date=order_date,
+        due_date=None,
+        return_date=None,
+        status="pending",
+        book_title="Test Book",
+    )
+
+def test_get_all_active_orders_has_next_from_extra_row(db_session):
+    # Arrange
+    rows = [_order_row(datetime(2025, 5, day)) for day in (29, 28, 27)]
+    query_mock = Mock()
+    query_mock.outerjoin.return_value.outerjoin.return_value.outerjoin.return_value \
+        .filter.return_value.order_by.return_value \
+        .limit.return_value.offset.return_value.all.return_value = rows
+    db_session.query.return_value = query_mock
+    order_crud = OrderCRUD(db_session)
+
+    # Act
+    result = order_crud.get_all_active_orders(limit=2, offset=0)
+
+    # Assert
+    assert len(result["orders"]) == 2
+    assert result["has_next"] is True
+    assert result["has_prev"] is False
+    assert result["prev_cursor"] is None
+    assert decode_cursor(result["next_cursor"]) == {
+        "order_date": rows[1].order_date.isoformat(),
+        "order_id": str(rows[1].order_id),
+        "direction": "next"
+    }
+    # A single query pages and detects the next page
+    assert db_session.query.call_count == 1
+
+def test_get_orders_by_user_with_prev_cursor(db_session):
+    # Arrange
+    # Rows come back oldest first when paging backwards
+    rows = [_order_row(datetime(2025, 5, day)) for day in (27, 28)]
+    query_mock = Mock()
+    filtered = query_mock.outerjoin.return_value.outerjoin.return_value.outerjoin.return_value \
+        .filter.return_value
+    filtered.filter.return_value.order_by.return_value.limit.return_value.all.return_value = rows
+    db_session.query.return_value = query_mock
+    order_crud = OrderCRUD(db_session)
+    cursor = encode_cursor({"order_date": "2025-05-26T00:00:00", "order_id": str(uuid4()), "direction": "prev"})
+
+    # Act
+    result = order_crud.get_orders_by_user("test_user", limit=2, cursor=cursor)
+
+    # Assert
+    assert [order["order_date"] for order in result["orders"]] == ["2025-05-28T00:00:00", "2025-05-27T00:00:00"]
+    assert result["page"] is None
+    assert result["has_next"] is True
+    assert result["has_prev"] is False
+    assert decode_cursor(result["next_cursor"])["direction"] == "next"
+    filtered.filter.return_value.order_by.return_value.limit.return_value.offset.assert_not_called()
+
+def test_get_all_active_orders_bounds_order_date_for_partition_pruning(db_session):
+    # Arrange
+    oldest = datetime(2025, 3, 2)
+    db_session.scalar.return_value = oldest
+    query_mock = Mock()
+    filtered = query_mock.outerjoin.return_value.outerjoin.return_value.outerjoin.return_value
+    filtered.filter.return_value.order_by.return_value.limit.return_value.offset.return_value.all.return_value = []
+    db_session.query.return_value = query_mock
+    order_crud = OrderCRUD(db_session)
+
+    # Act
+    order_crud.get_all_active_orders(limit=10)
+
+    # Assert
+    conditions = filtered.filter.call_args.args
+    assert len(conditions) == 2
+    assert conditions[1].left.name == "order_date"
+    assert conditions[1].right.value == oldest
+
+def test_get_all_active_orders_invalid_cursor(db_session):
+    order_crud = OrderCRUD(db_session)
+
+    with pytest.raises(CRUDException) as exc:
+        order_crud.get_all_active_orders(limit=10, cursor="not-a-cursor")
+    assert exc.value.status_code == 400
+    assert exc.value.message == "Invalid cursor"
+
+def test_bulk_update_status_completes_orders_and_releases_copies(db_session, mocker):
+    # Arrange
+    promote = mocker.patch.object(HoldCRUD, "promote_holds", return_value=[])
+    book_id = uuid4()
+    done = Mock(order_id=uuid4(), copy_id=uuid4(), status="completed")
+    active = Mock(order_id=uuid4(), copy_id=uuid4(), status="pending")
+    missing_id = uuid4()
+    db_session.query.return_value.filter.return_value.order_by.return_value.with_for_update.return_value \
+        .all.return_value = [done, active]
+    db_session.execute.return_value.scalars.return_value.all.return_value = [book_id]
+    order_crud = OrderCRUD(db_session)
+
+    # Act
+    results = order_crud.bulk_update_status("completed", order_ids=[active.order_id, missing_id, done.order_id])
+
+    # Assert
+    assert [result["outcome"] for result in results] == ["updated", "not_found", "unchanged"]
+    # One UPDATE for the orders, one for their copies and one for the availability counter
+    assert db_session.execute.call_count == 2
+    db_session.query.return_value.filter.return_value.update.assert_called_once()
+    assert db_session.info["changed_books"] == {book_id}
+    promote.assert_called_once_with(book_id, 1)
+    db_session.commit.assert_called_once()
+
+def test_bulk_update_status_by_copy(db_session):
+    # Arrange
+    active = Mock(order_id=uuid4(), copy_id=uuid4(), status="pending")
+    db_session.query.return_value.filter.return_value.order_by.return_value.with_for_update.return_value \
+        .all.return_value = [active]
+    order_crud = OrderCRUD(db_session)
+
+    # Act
+    results = order_crud.bulk_update_status("overdue", copy_ids=[active.copy_id])
+
+    # Assert
+    assert results == [{"copy_id": active.copy_id, "order_id": active.order_id, "outcome": "updated"}]
+    # Only the order changes; the copy stays borrowed
+    db_session.execute.assert_called_once()
+    db_session.commit.assert_called_once()
+
+def test_bulk_update_status_error(db_session):
+    # Arrange
+    db_session.query.side_effect = Exception("Database error")
+    order_crud = OrderCRUD(db_session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        order_crud.bulk_update_status("completed", order_ids=[uuid4()])
+    assert exc.value.status_code == 500
+    db_session.rollback.assert_called_once()
@@ -0,0 +1,76 @@
+import pytest
+from datetime import date, datetime
+from unittest.mock import Mock
+from sqlalchemy.orm import Session
+from app.crud.order_partition import OrderPartitionCRUD, add_months, partition_name, partition_month
+from app.exceptions.crud_exception import CRUDException
+
+@pytest.fixture
+def db_session():
+    session = Mock(spec=Session)
+    session.info = {}
+    return session
+
+def _executed_sql(db_session):
+    return [str(call.args[0]) for call in db_session.execute.call_args_list]
+
+def test_add_months_crosses_years():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+def test_partition_names_round_trip():
+    assert partition_name(date(2026, 3, 1)) == "orders_p2026_03"
+    assert partition_month("orders_p2026_03") == date(2026, 3, 1)
+    assert partition_month("orders_default") is None
+
+def test_create_partitions_only_creates_missing_months(db_session):
+    # Arrange
+    db_session.scalar.return_value = datetime(2026, 11, 18, 9, 30)
+    db_session.execute.return_value.scalars.return_value.all.return_value = ["orders_p2026_11", "orders_p2026_12"]
+    partitions = OrderPartitionCRUD(db_session)
+
+    # Act
+    created = partitions.create_partitions(months_ahead=2)
+
+    # Assert
+    assert created == ["orders_p2027_01"]
+    assert (
+        "CREATE TABLE IF NOT EXISTS orders_p2027_01 PARTITION OF orders "
+        "FOR VALUES FROM ('2027-01-01') TO ('2027-02-01')"
+    ) in _executed_sql(db_session)
+    db_session.commit.assert_called_once()
+
+def test_archive_partitions_skips_months_with_active_orders(db_session):
+    # Arrange
+    db_session.execute.return_value.scalars.return_value.all.return_value = [
+        "orders_p2024_08", "orders_p2024_09", "orders_p2024_10", "orders_p2026_10"
+    ]
+    # Current time, then whether each expired partition still has active orders
+    db_session.scalar.side_effect = [datetime(2026, 10, 18), False, True]
+    partitions = OrderPartitionCRUD(db_session)
+
+    # Act
+    archived = partitions.archive_partitions(retention_months=24)
+
+    # Assert
+    assert archived == ["orders_p2024_08"]
+    executed = _executed_sql(db_session)
+    assert "ALTER TABLE orders DETACH PARTITION orders_p2024_08" in executed
+    assert "ALTER TABLE orders_p2024_08 SET SCHEMA orders_archive" in executed
+    assert "ALTER TABLE orders DETACH PARTITION orders_p2024_09" not in executed
+    db_session.commit.assert_called_once()
+
+def test_archive_partitions_disabled(db_session):
+    assert OrderPartitionCRUD(db_session).archive_partitions(retention_months=0) == []
+    db_session.execute.assert_not_called()
+
+def test_archive_partitions_error(db_session):
+    # Arrange
+    db_session.scalar.side_effect = [datetime(2026, 10, 18), Exception("lock timeout")]
+    db_session.execute.return_value.scalars.return_value.all.return_value = ["orders_p2024_01"]
+
+    # Act & Assert
+    with pytest.raises(CRUDException) as exc:
+        OrderPartitionCRUD(db_session).archive_partitions(retention_months=12)
+    assert exc.value.status_code == 500
+    db_session.commit.assert_not_called()
@@ -0,0 +1,55 @@
+import threading
+import pytest
+from app.utils.password_hasher import PasswordHasher
+from app.exceptions.overloaded_exception import OverloadedException
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(max_workers=1, max_queue=0)
+    yield hasher
+    hasher.shutdown()
+
+def test_hash_and_verify_on_pool(hasher):
+    # Act
+    hashed = hasher.hash("secret")
+
+    # Assert
+    assert hasher.verify("secret", hashed) is True
+    assert hasher.verify("wrong", hashed) is False
+    stats = hasher.stats()
+    assert stats["completed"] == 3
+    assert stats["in_flight"] == 0
+    assert stats["max_hash_seconds"] > 0
+
+def test_rejects_calls_beyond_the_queue_limit(hasher):
+    # Arrange
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    worker = threading.Thread(target=hasher.run, args=(slow,))
+    worker.start()
+    started.wait(5)
+
+    # Act & Assert
+    try:
+        with pytest.raises(OverloadedException):
+            hasher.run(lambda: "never runs")
+    finally:
+        release.set()
+        worker.join(5)
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.run(lambda: "runs again") == "runs again"
+
+def test_process_pool_option():
+    # Arrange
+    hasher = PasswordHasher(max_workers=1, max_queue=1, use_processes=True)
+
+    # Act & Assert
+    try:
+        assert hasher.verify("secret", hasher.hash("secret")) is True
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,82 @@
+import pytest
+from fastapi import HTTPException
+from app.utils.rate_limit import TokenBucketLimiter, throttle_login, login_ip_limiter, login_username_limiter
+
+@pytest.fixture
+def clock(mocker):
+    return mocker.patch("app.utils.rate_limit.time.monotonic", return_value=1000.0)
+
+@pytest.fixture(autouse=True)
+def reset_login_limiters():
+    for limiter in (login_ip_limiter, login_username_limiter):
+        limiter._buckets.clear()
+    yield
+    for limiter in (login_ip_limiter, login_username_limiter):
+        limiter._buckets.clear()
+
+def test_bucket_allows_burst_then_throttles(clock):
+    # Arrange
+    limiter = TokenBucketLimiter(capacity=3, per_minute=6)
+
+    # Act
+    results = [limiter.acquire("alice") for _ in range(4)]
+
+    # Assert
+    assert results[:3] == [0, 0, 0]
+    # One token is regained every 10 seconds
+    assert results[3] == pytest.approx(10.0)
+    assert limiter.stats()["throttled"] == 1
+
+def test_bucket_refills_over_time(clock):
+    # Arrange
+    limiter = TokenBucketLimiter(capacity=1, per_minute=6)
+    limiter.acquire("alice")
+
+    # Act
+    clock.return_value = 1010.0
+
+    # Assert
+    assert limiter.acquire("alice") == 0
+    assert limiter.acquire("alice") > 0
+
+def test_idle_buckets_are_evicted(clock):
+    # Arrange
+    limiter = TokenBucketLimiter(capacity=2, per_minute=6)
+    limiter.acquire("idle")
+    clock.return_value = 1005.0
+    limiter.acquire("recent")
+
+    # Act
+    # 20 seconds refill a bucket completely
+    clock.return_value = 1021.0
+    limiter.acquire("other")
+
+    # Assert
+    assert len(limiter) == 2
+    assert limiter.stats()["evictions"] == 1
+
+def test_bucket_count_is_bounded(clock):
+    # Arrange
+    limiter = TokenBucketLimiter(capacity=2, per_minute=6, max_keys=2)
+
+    # Act
+    for key in ("a", "b", "c"):
+        limiter.acquire(key)
+
+    # Assert
+    assert len(limiter) == 2
+
+def test_disabled_limiter_allows_everything(clock):
+    limiter = TokenBucketLimiter(capacity=0, per_minute=6)
+    assert all(limiter.acquire("alice") == 0 for _ in range(10))
+
+def test_throttle_login_raises_429_with_retry_after(clock):
+    # Arrange
+    for _ in range(login_username_limiter.capacity):
+        throttle_login("10.0.0.1", "Alice")
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        throttle_login("10.0.0.2", "alice")
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) >= 1
@@ -0,0 +1,45 @@
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+from unittest.mock import Mock
+from app.crud.revoked_token import RevokedTokenCRUD
+from app.utils.revocation import RevocationList, REVOCATION_SYNC_OVERLAP
+
+def test_revocation_list_syncs_incrementally(mocker):
+    # Arrange
+    first_sync = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+    revoked, other = uuid4(), uuid4()
+    expires_at = datetime.fromtimestamp(time.time() + 600, timezone.utc)
+    get_revocations = mocker.patch.object(
+        RevokedTokenCRUD, "get_revocations",
+        side_effect=[([(revoked, expires_at)], first_sync), ([(other, expires_at)], first_sync)]
+    )
+    revocations = RevocationList(session_factory=Mock)
+
+    # Act
+    loaded = revocations.sync()
+    revocations.sync()
+
+    # Assert
+    assert loaded == 1
+    assert get_revocations.call_args_list[0].args == (None,)
+    assert get_revocations.call_args_list[1].args == (first_sync - REVOCATION_SYNC_OVERLAP,)
+    assert revocations.is_revoked(str(revoked))
+    assert revocations.is_revoked(str(other))
+    assert not revocations.is_revoked(str(uuid4()))
+    assert not revocations.is_revoked(None)
+
+def test_revocation_list_forgets_expired_tokens(mocker):
+    # Arrange
+    mocker.patch.object(RevokedTokenCRUD, "get_revocations", return_value=([], datetime.now(timezone.utc)))
+    revocations = RevocationList(session_factory=Mock)
+    revocations.add("expired", time.time() - 1)
+    revocations.add("live", time.time() + 600)
+
+    # Act
+    revocations.sync()
+
+    # Assert
+    assert not revocations.is_revoked("expired")
+    assert revocations.is_revoked("live")
+    assert revocations.stats()["size"] == 1
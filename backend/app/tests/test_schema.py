@@ -0,0 +1,25 @@
+import importlib.util
+import re
+from pathlib import Path
+from app.db.base_class import Base
+from app.models import book, book_copy, book_daily_orders, hold, idempotency_key, order, revoked_token, user  # noqa: F401
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+def _model_indexes():
+    return {index.name for table in Base.metadata.tables.values() for index in table.indexes}
+
+def test_init_sql_creates_model_indexes():
+    init_sql = (BACKEND_DIR / "db" / "init.sql").read_text()
+    created = set(re.findall(r"CREATE (?:UNIQUE )?INDEX (\w+)", init_sql))
+    assert _model_indexes() <= created
+
+def test_migrations_create_model_indexes():
+    versions = BACKEND_DIR / "migrations" / "versions"
+    spec = importlib.util.spec_from_file_location("production_indexes", versions / "0003_production_indexes.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    created = set(module.INDEXES)
+    for path in versions.glob("*.py"):
+        created.update(re.findall(r"CREATE (?:UNIQUE )?INDEX (\w+)", path.read_text()))
+    assert _model_indexes() <= created
@@ -6,6 +6,7 @@ from jose import jwt, JWTError
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from unittest.mock import MagicMock
+from uuid import uuid4
 from app.utils.security import (
     create_access_token,
     verify_access_token,
@@ -15,6 +16,9 @@ from app.utils.security import (
     require_role,
 )
 from app.models.user import User
+from app.utils import security
+from app.utils.cache import get_principal_cache, get_token_cache
+from app.utils.revocation import revocation_list
 
 # Test constants
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -22,10 +26,18 @@ ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 USERNAME = "testuser"
 ROLE = "reader"
 
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    get_principal_cache().clear()
+    get_token_cache().clear()
+    yield
+    get_principal_cache().clear()
+    get_token_cache().clear()
+
 @pytest.fixture
 def mock_db():
     db = MagicMock(spec=Session)
-    user = User(username=USERNAME, role=ROLE, password_hash=hash_password("testpass"))
+    user = User(user_id=uuid4(), username=USERNAME, role=ROLE, password_hash=hash_password("testpass"))
     db.query().filter().first.return_value = user
     return db
 
@@ -99,4 +111,91 @@ def test_require_role_invalid(mock_db):
     with pytest.raises(HTTPException) as exc:
         role_checker(user)
     assert exc.value.status_code == 403
-    assert exc.value.detail == f"Role librarian required"
\ No newline at end of file
+    assert exc.value.detail == f"Role librarian required"
+
+def test_get_current_user_served_from_principal_cache(mock_db):
+    # Arrange
+    token = jwt.encode({"username": USERNAME, "role": ROLE}, SECRET_KEY, algorithm=ALGORITHM)
+    first = get_current_user(token, mock_db)
+    mock_db.query.reset_mock()
+
+    # Act
+    second = get_current_user(token, mock_db)
+
+    # Assert
+    assert second == first
+    mock_db.query.assert_not_called()
+
+def test_get_current_user_rejects_token_of_other_account(mock_db):
+    # Arrange
+    token = jwt.encode({"username": USERNAME, "user_id": str(uuid4()), "role": ROLE}, SECRET_KEY, algorithm=ALGORITHM)
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        get_current_user(token, mock_db)
+    assert exc.value.status_code == 401
+
+def test_get_current_user_rejects_revoked_token(mock_db):
+    # Arrange
+    token = create_access_token({"username": USERNAME, "role": ROLE})
+    payload = verify_access_token(token)
+    revocation_list.add(payload["jti"], payload["exp"])
+    mock_db.query.reset_mock()
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        get_current_user(token, mock_db)
+    assert exc.value.status_code == 401
+    assert exc.value.detail == "Token has been revoked"
+    mock_db.query.assert_not_called()
+
+def test_verify_access_token_served_from_token_cache(monkeypatch):
+    # Arrange
+    token = create_access_token({"username": USERNAME, "role": ROLE})
+    first = verify_access_token(token)
+    decode = MagicMock(side_effect=AssertionError("token decoded again"))
+    monkeypatch.setattr(security.jwt, "decode", decode)
+
+    # Act
+    second = verify_access_token(token)
+    second["role"] = "librarian"
+
+    # Assert
+    assert second["jti"] == first["jti"]
+    assert verify_access_token(token)["role"] == ROLE
+    decode.assert_not_called()
+
+def test_verify_access_token_cache_entry_ends_at_token_expiry():
+    # Arrange
+    token = create_access_token({"username": USERNAME, "role": ROLE}, timedelta(seconds=30))
+
+    # Act
+    verify_access_token(token)
+
+    # Assert
+    key = security.hashlib.sha256(token.encode("utf-8")).digest()
+    expires_at, _ = get_token_cache()._entries[key]
+    assert expires_at <= security.time.monotonic() + 30
+
+def test_verify_access_token_does_not_cache_expired_token(monkeypatch):
+    # Arrange
+    token = jwt.encode({"username": USERNAME, "exp": 1}, SECRET_KEY, algorithm=ALGORITHM)
+    # Decoding with the clock skewed: the token verifies but is already past its expiry
+    monkeypatch.setattr(security.jwt, "decode", lambda *args, **kwargs: {"username": USERNAME, "exp": 1})
+
+    # Act
+    verify_access_token(token)
+
+    # Assert
+    assert len(get_token_cache()) == 0
+
+def test_get_current_user_rejects_revoked_token_with_cached_claims(mock_db):
+    # Arrange
+    token = create_access_token({"username": USERNAME, "role": ROLE})
+    get_current_user(token, mock_db)
+    revocation_list.add(verify_access_token(token)["jti"], datetime.now(timezone.utc).timestamp() + 60)
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        get_current_user(token, mock_db)
+    assert exc.value.detail == "Token has been revoked"
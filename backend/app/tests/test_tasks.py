@@ -0,0 +1,70 @@
+import threading
+import pytest
+from unittest.mock import Mock
+from app.tasks.periodic import PeriodicTask
+from app.tasks.sweeper import BatchSweeper
+from app.tasks.overdue import make_overdue_sweeper
+from app.crud.order import OrderCRUD
+from app.exceptions.crud_exception import CRUDException
+
+def test_overdue_sweeper_runs_batches_until_short(mocker):
+    # Arrange
+    session = Mock()
+    mark = mocker.patch.object(OrderCRUD, "mark_overdue_orders", side_effect=[10, 10, 3])
+    sweeper = make_overdue_sweeper(batch_size=10)
+    sweeper.session_factory = lambda: session
+
+    # Act
+    marked = sweeper.run_once()
+
+    # Assert
+    assert marked == 23
+    assert mark.call_count == 3
+    session.close.assert_called_once()
+    stats = sweeper.stats()
+    assert stats["runs"] == 1
+    assert stats["rows_updated"] == 23
+    assert stats["last_updated"] == 23
+
+def test_batch_sweeper_counts_failures():
+    # Arrange
+    session = Mock()
+    sweep_batch = Mock(side_effect=CRUDException(500, "Internal server error"))
+    sweeper = BatchSweeper("test", sweep_batch, batch_size=10, session_factory=lambda: session)
+
+    # Act & Assert
+    with pytest.raises(CRUDException):
+        sweeper.run_once()
+    assert sweeper.stats()["failures"] == 1
+    session.close.assert_called_once()
+
+def test_periodic_task_survives_errors_and_stops():
+    # Arrange
+    calls = []
+    ran_again = threading.Event()
+
+    def func():
+        calls.append(1)
+        if len(calls) == 1:
+            raise Exception("boom")
+        ran_again.set()
+
+    task = PeriodicTask("test", 0.01, func)
+
+    # Act
+    task.start()
+    assert ran_again.wait(2)
+    task.stop(timeout=2)
+    stopped_at = len(calls)
+
+    # Assert
+    threading.Event().wait(0.05)
+    assert stopped_at >= 2
+    assert len(calls) == stopped_at
+
+def test_periodic_task_disabled_with_zero_interval():
+    func = Mock()
+    task = PeriodicTask("test", 0, func)
+    task.start()
+    task.stop()
+    func.assert_not_called()
@@ -0,0 +1,81 @@
+import pytest
+from uuid import uuid4
+from app.utils.typeahead import PrefixIndex
+
+# Fixture for a small populated index
+@pytest.fixture
+def index():
+    index = PrefixIndex(max_entries=100)
+    index.rebuild([
+        (uuid4(), "The Great Gatsby", "F. Scott Fitzgerald"),
+        (uuid4(), "1984", "George Orwell"),
+        (uuid4(), "Animal Farm", "George Orwell"),
+    ])
+    return index
+
+def test_suggest_title_prefix(index):
+    result = index.suggest("the gr")
+    assert [s["value"] for s in result] == ["The Great Gatsby"]
+    assert result[0]["kind"] == "title"
+    assert "book_id" in result[0]
+
+def test_suggest_is_case_and_space_insensitive(index):
+    result = index.suggest("  GEORGE   or")
+    assert result == [{"value": "George Orwell", "kind": "author"}]
+
+def test_suggest_matches_word_starts(index):
+    values = [s["value"] for s in index.suggest("orw")]
+    assert values == ["George Orwell"]
+    assert [s["value"] for s in index.suggest("gatsby")] == ["The Great Gatsby"]
+
+def test_suggest_respects_limit(index):
+    assert len(index.suggest("g", limit=1)) == 1
+
+def test_suggest_empty_prefix(index):
+    assert index.suggest("   ") == []
+
+def test_add_book(index):
+    index.add_book(uuid4(), "Brave New World", "Aldous Huxley")
+    assert [s["value"] for s in index.suggest("brave")] == ["Brave New World"]
+    assert [s["value"] for s in index.suggest("hux")] == ["Aldous Huxley"]
+
+def test_add_book_is_bounded():
+    index = PrefixIndex(max_entries=3)
+    index.add_book(uuid4(), "Dune", "Frank Herbert")
+    index.add_book(uuid4(), "Emma", "Jane Austen")
+    assert len(index) == 3
+
+def test_rebuild_truncates_to_max_entries():
+    index = PrefixIndex(max_entries=2)
+    entries = index.rebuild([(uuid4(), "Dune", "Frank Herbert"), (uuid4(), "Emma", "Jane Austen")])
+    assert entries == 2
+    assert len(index) == 2
+
+def test_rebuild_over_cap_drops_word_keys_before_values():
+    # Arrange
+    books = [(uuid4(), f"{letter} Title Of Book", f"{letter} Author") for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"]
+    index = PrefixIndex(max_entries=60)
+
+    # Act
+    index.rebuild(books)
+
+    # Assert: every title and author is still found by its start, late letters included
+    assert len(index) <= 60
+    assert [s["value"] for s in index.suggest("z title")] == ["Z Title Of Book"]
+    assert [s["value"] for s in index.suggest("z author")] == ["Z Author"]
+    assert index.suggest("book") == []
+    # Books added later get the reduced number of word keys too
+    index.add_book(uuid4(), "Late Title Of Book", "Late Author")
+    assert index.suggest("book") == []
+
+def test_rebuild_over_cap_thins_values_across_alphabet():
+    # Arrange
+    books = [(uuid4(), f"{letter}{letter} Book", "") for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"]
+    index = PrefixIndex(max_entries=13)
+
+    # Act
+    index.rebuild(books)
+
+    # Assert
+    kept = [letter for letter in "abcdefghijklmnopqrstuvwxyz" if index.suggest(letter * 2)]
+    assert kept == list("acegikmoqsuwy")
@@ -0,0 +1,271 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.models.user import User
+
+BOOK_CACHE_MAX_SIZE = int(os.getenv("BOOK_CACHE_MAX_SIZE", 1024))
+BOOK_CACHE_TTL_SECONDS = float(os.getenv("BOOK_CACHE_TTL_SECONDS", 300))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", 4096))
+# Short, so changes made outside this process (e.g. by another worker) apply quickly
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 30))
+# Verified access tokens; 0 disables the cache
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", 10000))
+
+
+class CacheBackend(ABC):
+    """
+    Interface of the read-through caches. Implement it to back a cache with an external
+    store (e.g. Redis) and install it with `set_book_cache`.
+    """
+    @abstractmethod
+    def get(self, key: Hashable) -> Any | None:
+        """Returns the cached value, or None on a miss."""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Stores a value, optionally overriding the default time to live (seconds)."""
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        """Removes a key if present."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Removes every key."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Returns the hit/miss/eviction counters of the cache."""
+
+
+class LRUCache(CacheBackend):
+    """
+    Thread-safe in-process LRU cache with a per-entry time to live.
+    """
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+
+_book_cache: CacheBackend = LRUCache(max_size=BOOK_CACHE_MAX_SIZE, ttl=BOOK_CACHE_TTL_SECONDS)
+
+
+def get_book_cache() -> CacheBackend:
+    return _book_cache
+
+
+def set_book_cache(backend: CacheBackend) -> None:
+    """
+    Replaces the book detail cache, e.g. with a backend shared between worker processes.
+    """
+    global _book_cache
+    _book_cache = backend
+
+
+_principal_cache: CacheBackend = LRUCache(max_size=PRINCIPAL_CACHE_MAX_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def get_principal_cache() -> CacheBackend:
+    return _principal_cache
+
+
+def set_principal_cache(backend: CacheBackend) -> None:
+    """
+    Replaces the cache of authenticated users, e.g. with a backend shared between worker
+    processes so invalidations reach all of them.
+    """
+    global _principal_cache
+    _principal_cache = backend
+
+
+# Entries live until their token expires; the cache's own TTL only caps tokens without exp
+_token_cache = LRUCache(max_size=TOKEN_CACHE_MAX_SIZE, ttl=300)
+
+
+def get_token_cache() -> LRUCache:
+    """
+    Returns the in-process cache of verified access tokens, keyed by token digest. It is
+    never shared: a verified signature only vouches for this process's secret.
+    """
+    return _token_cache
+
+
+def principal_cache_key(username: str) -> str:
+    return f"principal:{username}"
+
+
+def mark_user_changed(db: Session, username: str) -> None:
+    """
+    Schedules the cached principal of a user for invalidation once the current
+    transaction of `db` commits.
+    """
+    db.info.setdefault("changed_users", set()).add(username)
+
+
+def book_cache_key(book_id) -> str:
+    return f"book:{book_id}"
+
+
+# Invalidations are counted per slot of book keys, in total and for clears of the whole
+# cache, so a read-through fill can tell whether a book changed while it was being read.
+# Slots are shared by several books; a collision only skips a fill.
+BOOK_CACHE_GENERATION_SLOTS = 4096
+_book_generations = [0] * BOOK_CACHE_GENERATION_SLOTS
+_book_invalidations = 0
+_book_epoch = 0
+_book_generation_lock = threading.Lock()
+
+
+def _book_generation_slot(book_id) -> int:
+    return hash(book_cache_key(book_id)) % BOOK_CACHE_GENERATION_SLOTS
+
+
+def book_cache_generation(book_id=None) -> tuple:
+    """
+    Returns the invalidation generation of a book, or of all books if `book_id` is None
+    (e.g. before a lookup by another key). Take it before reading from the database and
+    pass it to `fill_book_cache`.
+    """
+    if book_id is None:
+        return None, _book_epoch, _book_invalidations
+    return book_id, _book_epoch, _book_generations[_book_generation_slot(book_id)]
+
+
+def fill_book_cache(cache: CacheBackend, book_id, details: dict, generation: tuple) -> bool:
+    """
+    Caches the details of a book read from the database, unless the book was invalidated
+    since `generation` was taken: the read may then predate the change.
+
+    Returns:
+        bool: Whether the details were cached.
+    """
+    with _book_generation_lock:
+        if book_cache_generation(generation[0]) != generation:
+            return False
+        cache.set(book_cache_key(book_id), details)
+        return True
+
+
+def invalidate_book(cache: CacheBackend, book_id) -> None:
+    global _book_invalidations
+    with _book_generation_lock:
+        _book_generations[_book_generation_slot(book_id)] += 1
+        _book_invalidations += 1
+        cache.delete(book_cache_key(book_id))
+
+
+def invalidate_all_books(cache: CacheBackend) -> None:
+    global _book_epoch
+    with _book_generation_lock:
+        _book_epoch += 1
+        cache.clear()
+
+
+def mark_book_changed(db: Session, book_id) -> None:
+    """
+    Schedules the cached details of a book for invalidation once the current
+    transaction of `db` commits.
+    """
+    db.info.setdefault("changed_books", set()).add(book_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_books(session: Session) -> None:
+    changed = session.info.pop("changed_books", None)
+    if changed:
+        cache = get_book_cache()
+        for book_id in changed:
+            invalidate_book(cache, book_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_books(session: Session) -> None:
+    session.info.pop("changed_books", None)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_changed_users(session: Session, flush_context, instances) -> None:
+    # Deleting a user or changing their role (or name) through the ORM invalidates their principal
+    for instance in session.deleted:
+        if isinstance(instance, User):
+            mark_user_changed(session, instance.username)
+    for instance in session.dirty:
+        if isinstance(instance, User) and session.is_modified(instance):
+            for username in inspect(instance).attrs.username.history.sum():
+                mark_user_changed(session, username)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    changed = session.info.pop("changed_users", None)
+    if changed:
+        cache = get_principal_cache()
+        for username in changed:
+            cache.delete(principal_cache_key(username))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop("changed_users", None)
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator
+from app.schemas.book import ExportFormat
+
+EXPORT_COLUMNS = ("book_id", "isbn", "title", "author", "publication_year", "description", "available_copies")
+# Rows are buffered into chunks of about this many bytes before being sent
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+
+def _csv_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield "".join(lines)
+            lines, size = [], 0
+    yield "".join(lines)
+
+
+def encode_export(rows: Iterable[tuple], export_format: ExportFormat) -> Iterator[bytes]:
+    """
+    Serializes catalog export rows (in `EXPORT_COLUMNS` order) as CSV or NDJSON chunks.
+    """
+    encoder = _csv_lines if export_format == ExportFormat.csv else _ndjson_lines
+    for chunk in encoder(rows):
+        if chunk:
+            yield chunk.encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Compresses a byte stream into a single gzip member on the fly.
+    """
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,73 @@
+import csv
+import json
+import os
+from typing import Iterable, Iterator
+from pydantic import ValidationError
+from app.schemas.book import BookPost, ImportFormat
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))
+
+
+def _parse_csv(lines: Iterable[str]) -> Iterator[tuple[int, dict | None, str | None]]:
+    reader = csv.DictReader(lines)
+    for row in reader:
+        if None in row:
+            yield reader.line_num, None, "Too many columns"
+            continue
+        yield reader.line_num, row, None
+
+
+def _parse_jsonl(lines: Iterable[str]) -> Iterator[tuple[int, dict | None, str | None]]:
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, row, None
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+def read_import_chunks(
+    lines: Iterable[str],
+    file_format: ImportFormat,
+    chunk_size: int = IMPORT_CHUNK_SIZE
+) -> Iterator[tuple[list[tuple[int, BookPost]], list[dict]]]:
+    """
+    Parses a CSV or JSON Lines catalog stream and validates each row against `BookPost`.
+
+    Args:
+        lines (Iterable[str]): The text lines of the import file.
+        file_format (ImportFormat): The format of the file.
+        chunk_size (int): The maximum number of valid rows per chunk.
+
+    Yields:
+        tuple: The valid `(line_no, BookPost)` rows of a chunk and the errors found while reading it.
+    """
+    parser = _parse_csv if file_format == ImportFormat.csv else _parse_jsonl
+    valid, errors = [], []
+    for line_no, row, error in parser(lines):
+        if error is None:
+            # Empty CSV cells mean "not provided" so optional fields fall back to their defaults
+            row = {key: value for key, value in row.items() if value != ""}
+            try:
+                valid.append((line_no, BookPost(**row)))
+            except ValidationError as e:
+                error = _format_validation_error(e)
+        if error is not None:
+            errors.append({"line": line_no, "isbn": (row or {}).get("isbn"), "error": error})
+        if len(valid) >= chunk_size:
+            yield valid, errors
+            valid, errors = [], []
+    if valid or errors:
+        yield valid, errors
@@ -0,0 +1,56 @@
+import threading
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.config.logger import logger
+
+# The catalog version is the position of a sequence: reading it is a single-row lookup
+# and bumping it never blocks, since sequences are not transactional. `last_value` is
+# the same before and after the first nextval, so `is_called` is added in.
+READ_VERSION_SQL = text("SELECT last_value + is_called::int FROM catalog_version_seq")
+BUMP_VERSION_SQL = text("SELECT nextval('catalog_version_seq')")
+
+# Set when a bump after a commit failed; the next read of this process retries it first
+_bump_pending = threading.Event()
+
+
+def get_catalog_version(db: Session) -> int:
+    """
+    Returns the catalog version, first retrying a bump that failed in this process.
+
+    Raises:
+        Exception: If the pending bump fails again, so no ETag is made from a stale version.
+    """
+    if _bump_pending.is_set():
+        db.execute(BUMP_VERSION_SQL)
+        _bump_pending.clear()
+        logger.info("Retried the pending catalog version bump")
+    return db.execute(READ_VERSION_SQL).scalar_one()
+
+
+def mark_catalog_changed(db: Session) -> None:
+    """
+    Schedules a catalog version bump once the current transaction of `db` commits.
+    """
+    db.info["catalog_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_catalog_version(session: Session) -> None:
+    if not session.info.pop("catalog_changed", False):
+        return
+    # Bumping only once the commit is visible means a version read before the bump is
+    # never paired with the new data. If the bump fails, the write has committed all the
+    # same; this process retries it before its next read, but other workers keep serving
+    # the old version until the next catalog change.
+    try:
+        with session.get_bind().connect() as connection:
+            connection.execute(BUMP_VERSION_SQL)
+            connection.commit()
+    except Exception as e:
+        _bump_pending.set()
+        logger.error(f"Could not bump the catalog version, ETags may be stale until it is bumped: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_change(session: Session) -> None:
+    session.info.pop("catalog_changed", None)
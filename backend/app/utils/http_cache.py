@@ -0,0 +1,60 @@
+import hashlib
+from fastapi import Response
+
+CATALOG_LIST_CACHE_CONTROL = "private, no-cache"
+BOOK_DETAIL_CACHE_CONTROL = "private, max-age=0, must-revalidate"
+POPULAR_BOOKS_CACHE_CONTROL = "private, max-age=300"
+SUGGEST_CACHE_CONTROL = "private, max-age=60"
+
+
+def make_etag(version: int, *parts) -> str:
+    """
+    Builds a strong ETag from a data version and the parameters that shape the response.
+    """
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Checks an If-None-Match header against an ETag, using the weak comparison that
+    RFC 9110 prescribes for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def accepts_encoding(accept_encoding: str | None, coding: str) -> bool:
+    """
+    Checks whether an Accept-Encoding header accepts a content coding, by its own entry
+    or else by `*`, following RFC 9110: an entry with `q=0` refuses the coding.
+    """
+    qualities = {}
+    for entry in (accept_encoding or "").split(","):
+        name, *params = (part.strip() for part in entry.split(";"))
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+    return qualities.get(coding, qualities.get("*", 0.0)) > 0
+
+
+def set_cache_headers(response: Response, etag: str | None, cache_control: str) -> None:
+    if etag:
+        response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
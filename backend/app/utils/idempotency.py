@@ -0,0 +1,93 @@
+import hashlib
+from typing import Any, Callable
+from fastapi import Depends, Header, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.crud.idempotency import IdempotencyCRUD
+from app.schemas.user import Principal
+from app.utils.security import get_current_user
+from app.config.logger import logger
+from app.exceptions.crud_exception import CRUDException
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# Set on responses replayed from the key store
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotentRequest:
+    """
+    Runs a mutating route handler at most once per `Idempotency-Key`. Without the header
+    the handler simply runs.
+
+    Successful responses and client errors (4xx) are stored and replayed to retries of
+    the same request; after a server error the key is released so a retry runs again.
+    """
+    def __init__(self, crud: IdempotencyCRUD | None = None, key_hash: bytes | None = None, request_hash: bytes | None = None):
+        self.crud = crud
+        self.key_hash = key_hash
+        self.request_hash = request_hash
+
+    def run(self, handler: Callable[[], Any], response_model: Any = None) -> Any:
+        if self.key_hash is None:
+            return handler()
+        try:
+            stored = self.crud.reserve(self.key_hash, self.request_hash)
+        except CRUDException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+        if stored is not None:
+            return JSONResponse(status_code=stored.status_code, content=stored.response_body, headers={REPLAYED_HEADER: "true"})
+
+        try:
+            result = handler()
+        except HTTPException as e:
+            if e.status_code >= 500:
+                self.crud.release(self.key_hash)
+            else:
+                self._complete(e.status_code, {"detail": e.detail})
+            raise e
+        except Exception as e:
+            self.crud.release(self.key_hash)
+            raise e
+
+        if response_model is not None:
+            result = TypeAdapter(response_model).validate_python(result, from_attributes=True)
+        body = jsonable_encoder(result)
+        self._complete(200, body)
+        return JSONResponse(status_code=200, content=body)
+
+    def _complete(self, status_code: int, body: Any) -> None:
+        try:
+            self.crud.complete(self.key_hash, status_code, body)
+        except CRUDException:
+            # The request itself succeeded; a retry finds the key in progress until it is reclaimed
+            logger.error("Could not store the response of an idempotent request")
+
+
+async def _request_body(request: Request) -> bytes:
+    return await request.body()
+
+
+def get_idempotent_request(
+    request: Request,
+    body: bytes = Depends(_request_body),
+    idempotency_key: str | None = Header(None, alias=IDEMPOTENCY_HEADER),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> IdempotentRequest:
+    """
+    Dependency for routes that honour the `Idempotency-Key` header.
+
+    Keys are scoped to the user and endpoint; a retry must repeat the same query and body.
+    """
+    if idempotency_key is None:
+        return IdempotentRequest()
+    if not 0 < len(idempotency_key) <= IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+    scope = f"{current_user.user_id}\n{request.method}\n{request.url.path}\n{idempotency_key}"
+    key_hash = hashlib.sha256(scope.encode("utf-8")).digest()
+    request_hash = hashlib.sha256(request.url.query.encode("utf-8") + b"\n" + body).digest()
+    return IdempotentRequest(IdempotencyCRUD(db), key_hash, request_hash)
@@ -0,0 +1,36 @@
+import base64
+import json
+
+
+def encode_cursor(data: dict) -> str:
+    """
+    Encodes the keyset position of a page into an opaque, URL-safe cursor.
+
+    Args:
+        data (dict): JSON-serializable values identifying the last row of a page.
+
+    Returns:
+        str: The encoded cursor.
+    """
+    raw = json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor received from the client.
+
+    Returns:
+        dict: The decoded keyset position, otherwise raises a ValueError.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(data, dict):
+        raise ValueError("Invalid cursor")
+    return data
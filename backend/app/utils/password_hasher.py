@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+import bcrypt
+from app.exceptions.overloaded_exception import OverloadedException
+
+# bcrypt releases the GIL, so threads already hash in parallel; processes isolate the work
+# from the API process entirely at the cost of pickling every call
+PASSWORD_HASHER_WORKERS = int(os.getenv("PASSWORD_HASHER_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASHER_MAX_QUEUE = int(os.getenv("PASSWORD_HASHER_MAX_QUEUE", 16))
+PASSWORD_HASHER_PROCESSES = os.getenv("PASSWORD_HASHER_PROCESSES", "false").lower() in ("1", "true", "yes")
+
+
+def _hashpw(password: bytes) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt())
+
+
+def _checkpw(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+def _timed(func: Callable, *args):
+    # Runs in the worker (possibly another process), so only durations are reported back
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, size-limited pool.
+
+    Callers block until their hash is done, so at most `max_workers + max_queue` request
+    threads ever wait on hashing. Beyond that, calls fail fast with OverloadedException
+    instead of queueing and tying up the threads that serve other requests.
+    """
+    def __init__(self, max_workers: int = 4, max_queue: int = 16, use_processes: bool = False):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._hash_total = 0.0
+        self._hash_max = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            pool = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            kwargs = {} if self.use_processes else {"thread_name_prefix": "password-hasher"}
+            self._executor = pool(max_workers=self.max_workers, **kwargs)
+        return self._executor
+
+    def run(self, func: Callable, *args):
+        """
+        Runs `func(*args)` on the pool and returns its result.
+
+        Raises:
+            OverloadedException: If `max_workers + max_queue` calls are already in flight.
+        """
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise OverloadedException("Too many password checks in progress, please retry shortly")
+            self._in_flight += 1
+            executor = self._get_executor()
+        submitted = time.perf_counter()
+        try:
+            result, hash_time = executor.submit(_timed, func, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        # Whatever the call did not spend hashing it spent queued (plus dispatch overhead)
+        wait = max(time.perf_counter() - submitted - hash_time, 0.0)
+        with self._lock:
+            self._completed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._hash_total += hash_time
+            self._hash_max = max(self._hash_max, hash_time)
+        return result
+
+    def hash(self, password: str) -> str:
+        return self.run(_hashpw, password.encode("utf-8")).decode("utf-8")
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self.run(_checkpw, password.encode("utf-8"), hashed.encode("utf-8"))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "processes": self.use_processes,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_queue_wait_seconds": round(self._wait_total / completed, 6),
+                "max_queue_wait_seconds": round(self._wait_max, 6),
+                "avg_hash_seconds": round(self._hash_total / completed, 6),
+                "max_hash_seconds": round(self._hash_max, 6),
+            }
+
+
+password_hasher = PasswordHasher(PASSWORD_HASHER_WORKERS, PASSWORD_HASHER_MAX_QUEUE, PASSWORD_HASHER_PROCESSES)
@@ -0,0 +1,112 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+from fastapi import HTTPException
+
+# A bucket holds `capacity` attempts and regains `per_minute` attempts per minute
+LOGIN_USERNAME_CAPACITY = int(os.getenv("LOGIN_USERNAME_CAPACITY", 5))
+LOGIN_USERNAME_PER_MINUTE = float(os.getenv("LOGIN_USERNAME_PER_MINUTE", 5))
+LOGIN_IP_CAPACITY = int(os.getenv("LOGIN_IP_CAPACITY", 20))
+LOGIN_IP_PER_MINUTE = float(os.getenv("LOGIN_IP_PER_MINUTE", 20))
+LOGIN_LIMITER_MAX_KEYS = int(os.getenv("LOGIN_LIMITER_MAX_KEYS", 100_000))
+
+
+class TokenBucketLimiter:
+    """
+    Thread-safe in-process token buckets, one per key.
+
+    Buckets are kept in least recently used order. A bucket that has been idle long
+    enough to refill completely behaves exactly like a new one, so such buckets are
+    evicted as they reach the front; `max_keys` bounds memory under key floods.
+    A capacity or rate of 0 disables the limiter.
+    """
+    def __init__(self, capacity: int, per_minute: float, max_keys: int = 100_000):
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self.enabled = capacity > 0 and per_minute > 0
+        # Time for an empty bucket to refill completely
+        self._idle_after = capacity / self.rate if self.enabled else 0.0
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._allowed = 0
+        self._throttled = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: Hashable) -> float:
+        """
+        Takes one token from the bucket of `key`.
+
+        Returns:
+            float: 0 if the attempt is allowed, otherwise the seconds until a token is available.
+        """
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+                self._allowed += 1
+            else:
+                retry_after = (1 - tokens) / self.rate
+                self._throttled += 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self._evictions += 1
+            return retry_after
+
+    def _evict_idle(self, now: float) -> None:
+        while self._buckets:
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < self._idle_after:
+                break
+            del self._buckets[key]
+            self._evictions += 1
+
+    def reset(self, key: Hashable) -> None:
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "keys": len(self._buckets),
+                "max_keys": self.max_keys,
+                "allowed": self._allowed,
+                "throttled": self._throttled,
+                "evictions": self._evictions,
+            }
+
+
+login_username_limiter = TokenBucketLimiter(LOGIN_USERNAME_CAPACITY, LOGIN_USERNAME_PER_MINUTE, LOGIN_LIMITER_MAX_KEYS)
+login_ip_limiter = TokenBucketLimiter(LOGIN_IP_CAPACITY, LOGIN_IP_PER_MINUTE, LOGIN_LIMITER_MAX_KEYS)
+
+
+def throttle_login(client_ip: str | None, username: str | None) -> None:
+    """
+    Spends a login attempt of the client IP and of the username, before any lookup or
+    password check runs.
+
+    Raises:
+        HTTPException: 429 with `Retry-After` if either has run out of attempts.
+    """
+    retry_after = login_ip_limiter.acquire(client_ip or "unknown")
+    if not retry_after and username:
+        retry_after = login_username_limiter.acquire(str(username).lower())
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts, please retry later",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
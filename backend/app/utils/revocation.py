@@ -0,0 +1,73 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from app.db.session import SessionLocal
+from app.crud.revoked_token import RevokedTokenCRUD
+
+# Each incremental sync re-reads this much history, so revocations whose transactions
+# committed out of timestamp order are not missed
+REVOCATION_SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class RevocationList:
+    """
+    In-process set of revoked token IDs (`jti`) with their expiry times.
+
+    Checks are a dictionary lookup without I/O. Each worker process keeps its own copy,
+    loaded from `revoked_tokens` at startup and synchronized incrementally; revocations
+    made in this process apply immediately, those of other workers within one sync interval.
+    """
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._revoked: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._synced_at: datetime | None = None
+        self._syncs = 0
+        self._last_sync_at = None
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_revoked(self, jti: str | None) -> bool:
+        return jti is not None and jti in self._revoked
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def sync(self) -> int:
+        """
+        Loads the revocations recorded since the previous sync (all of them on the first
+        call) and forgets the tokens that have expired.
+
+        Returns:
+            int: The number of revocations read.
+        """
+        since = self._synced_at - REVOCATION_SYNC_OVERLAP if self._synced_at else None
+        db = self.session_factory()
+        try:
+            rows, synced_at = RevokedTokenCRUD(db).get_revocations(since)
+        finally:
+            db.close()
+        now = time.time()
+        with self._lock:
+            for jti, expires_at in rows:
+                self._revoked[str(jti)] = expires_at.timestamp()
+            for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+                del self._revoked[jti]
+            self._synced_at = synced_at
+            self._syncs += 1
+            self._last_sync_at = now
+        return len(rows)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._revoked),
+                "syncs": self._syncs,
+                "last_sync_at": self._last_sync_at,
+            }
+
+
+revocation_list = RevocationList()
+
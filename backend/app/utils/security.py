@@ -1,5 +1,7 @@
+import hashlib
 import os
-import bcrypt
+import time
+from uuid import uuid4
 from dotenv import load_dotenv
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException
@@ -8,6 +10,10 @@ from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.user import User
+from app.schemas.user import Principal
+from app.utils.cache import get_principal_cache, get_token_cache, principal_cache_key
+from app.utils.password_hasher import password_hasher
+from app.utils.revocation import revocation_list
 
 # Security utilities for hashing passwords and JWT token management
 load_dotenv()
@@ -22,7 +28,8 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """
-    Creates a JWT access token with the given data and expiration time.
+    Creates a JWT access token with the given data and expiration time. Each token gets
+    a unique `jti` claim, by which it can be revoked.
 
     Args:
         data (dict): The data to encode in the token.
@@ -37,6 +44,7 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", str(uuid4()))
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
@@ -44,39 +52,66 @@ def verify_access_token(token: str) -> dict:
     """
     Verifies a JWT access token and returns the decoded data.
 
+    Verified tokens are cached by their SHA-256 digest until they expire, so a token
+    presented again skips the signature check and decoding.
+
     Args:
         token (str): The JWT access token to verify.
 
     Returns:
         dict: The decoded data from the token if valid, otherwise raises an exception.
     """
+    cache = get_token_cache()
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = cache.get(key)
+    if payload is not None:
+        return dict(payload)
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         raise JWTError("Could not validate credentials")
+    expires_in = payload["exp"] - time.time() if "exp" in payload else None
+    if expires_in is None or expires_in > 0:
+        cache.set(key, dict(payload), ttl=expires_in)
+    return payload
     
     
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
     """
     Retrieves the current user from the given access token.
 
+    The user is looked up once and then served from the principal cache for a short
+    time, so most requests authorize without a query. Deleting a user or changing their
+    role invalidates the cached entry.
+
     Args:
         token (str): The JWT access token to verify.
         db (Session): The database session to use for the query.
 
     Returns:
-        User: The current user if the token is valid and the user exists, otherwise raises an exception.
+        Principal: The current user if the token is valid and the user exists, otherwise raises an exception.
     """
     try:
         payload = verify_access_token(token)
     
         if not payload or not payload.get("username"):
             raise HTTPException(status_code=401, detail="Invalid token")
-        user = db.query(User).filter(User.username == payload["username"]).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return user
+        # In-memory check, kept in sync with revoked_tokens in the background
+        if revocation_list.is_revoked(payload.get("jti")):
+            raise HTTPException(status_code=401, detail="Token has been revoked")
+        cache = get_principal_cache()
+        key = principal_cache_key(payload["username"])
+        principal = cache.get(key)
+        if principal is None:
+            user = db.query(User).filter(User.username == payload["username"]).first()
+            if not user:
+                raise HTTPException(status_code=404, detail="User not found")
+            principal = Principal.model_validate(user)
+            cache.set(key, principal)
+        # A token of a deleted account must not authorize a new account with the same name
+        if payload.get("user_id") and payload["user_id"] != str(principal.user_id):
+            raise HTTPException(status_code=401, detail="Invalid token")
+        return principal
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
@@ -91,7 +126,7 @@ def require_role(required_role: str):
     Returns:
         Callable[[User], User]: A function that checks if the current user has the required role.
     """
-    def role_checker(user: User = Depends(get_current_user)):
+    def role_checker(user: Principal = Depends(get_current_user)):
         if user.role != required_role:
             raise HTTPException(status_code=403, detail=f"Role {required_role} required")
         return user
@@ -99,19 +134,24 @@ def require_role(required_role: str):
 
 def hash_password(password: str) -> str:
     """
-    Hashes a plain password using the default password hashing algorithm.
+    Hashes a plain password using the default password hashing algorithm, on the
+    bounded password hashing pool.
 
     Args:
         password (str): The plain password to hash.
 
     Returns:
         str: The hashed password.
+
+    Raises:
+        OverloadedException: If the password hashing pool is saturated.
     """
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return password_hasher.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verifies a plain password against a hashed password.
+    Verifies a plain password against a hashed password, on the bounded password
+    hashing pool.
 
     Args:
         plain_password (str): The plain password to verify.
@@ -119,5 +159,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
     Returns:
         bool: True if the password is valid, False otherwise.
+
+    Raises:
+        OverloadedException: If the password hashing pool is saturated.
     """
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
\ No newline at end of file
+    return password_hasher.verify(plain_password, hashed_password)
\ No newline at end of file
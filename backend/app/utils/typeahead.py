@@ -0,0 +1,125 @@
+import os
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Iterable
+from app.config.logger import logger
+
+TYPEAHEAD_MAX_ENTRIES = int(os.getenv("TYPEAHEAD_MAX_ENTRIES", 200000))
+# Besides the full value, each value is also reachable from this many following word starts
+TYPEAHEAD_MAX_WORD_KEYS = 4
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+class PrefixIndex:
+    """
+    In-memory prefix index over book titles and authors.
+
+    Entries are kept in a sorted list of `(key, kind, value, book_id)` tuples so a lookup
+    is one bisect plus a short forward scan. The number of entries is capped at
+    `max_entries`: a rebuild over the cap first drops the keys of later words, evenly for
+    every value, and thins the full values evenly across the alphabet only if those alone
+    do not fit. Once full, new entries are dropped until the next rebuild.
+    """
+    def __init__(self, max_entries: int = TYPEAHEAD_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: list[tuple[str, str, str, str]] = []
+        self._word_keys = TYPEAHEAD_MAX_WORD_KEYS
+        self._lock = threading.Lock()
+        self._full_logged = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _keys(value: str, word_keys: int) -> list[tuple[int, str]]:
+        """Returns the `(word, key)` pairs of a value, the full value being word 0."""
+        words = normalize(value).split(" ")
+        return [(i, " ".join(words[i:])) for i in range(min(len(words), word_keys + 1)) if words[i]]
+
+    def _entries_for(self, book_id, title: str, author: str, word_keys: int) -> list[tuple[int, tuple]]:
+        entries = [(word, (key, "title", title, str(book_id))) for word, key in self._keys(title, word_keys)]
+        entries += [(word, (key, "author", author, "")) for word, key in self._keys(author, word_keys)]
+        return entries
+
+    def rebuild(self, books: Iterable[tuple]) -> int:
+        """
+        Replaces the index with entries for the given `(book_id, title, author)` rows.
+
+        Returns:
+            int: The number of entries in the new index.
+        """
+        # Each entry with the earliest word it is the key of
+        words: dict[tuple, int] = {}
+        for book_id, title, author in books:
+            for word, entry in self._entries_for(book_id, title, author, TYPEAHEAD_MAX_WORD_KEYS):
+                words[entry] = min(word, words.get(entry, word))
+        total = len(words)
+        word_keys = TYPEAHEAD_MAX_WORD_KEYS
+        while word_keys > 0 and len(words) > self.max_entries:
+            word_keys -= 1
+            words = {entry: word for entry, word in words.items() if word <= word_keys}
+        entries = sorted(words)
+        if len(entries) > self.max_entries:
+            step = len(entries) / self.max_entries
+            entries = [entries[int(i * step)] for i in range(self.max_entries)]
+        if len(entries) < total:
+            logger.warning(
+                f"Typeahead index capped to {len(entries)} of {total} entries, "
+                f"{word_keys} word keys per value"
+            )
+        with self._lock:
+            self._entries = entries
+            self._word_keys = word_keys
+            self._full_logged = False
+        logger.info(f"Typeahead index rebuilt with {len(entries)} entries")
+        return len(entries)
+
+    def add_book(self, book_id, title: str, author: str) -> None:
+        """
+        Adds a single book to the index.
+        """
+        with self._lock:
+            for _, entry in self._entries_for(book_id, title, author, self._word_keys):
+                position = bisect_left(self._entries, entry)
+                if position < len(self._entries) and self._entries[position] == entry:
+                    continue
+                if len(self._entries) >= self.max_entries:
+                    if not self._full_logged:
+                        logger.warning(f"Typeahead index is full ({self.max_entries} entries), skipping new entries")
+                        self._full_logged = True
+                    return
+                insort(self._entries, entry)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        """
+        Returns up to `limit` distinct titles and authors starting with `prefix`.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        suggestions = []
+        seen = set()
+        with self._lock:
+            position = bisect_left(self._entries, (prefix,))
+            while position < len(self._entries) and len(suggestions) < limit:
+                key, kind, value, book_id = self._entries[position]
+                position += 1
+                if not key.startswith(prefix):
+                    break
+                if (kind, value, book_id) in seen:
+                    continue
+                seen.add((kind, value, book_id))
+                suggestion = {"value": value, "kind": kind}
+                if book_id:
+                    suggestion["book_id"] = book_id
+                suggestions.append(suggestion)
+        return suggestions
+
+
+suggestion_index = PrefixIndex()
@@ -0,0 +1,66 @@
+"""
+Measures the per-request authentication overhead of `get_current_user`, with the
+verified-token cache cold (every request decodes and verifies the JWT) and warm.
+
+Run from the backend directory, with the application's environment set:
+
+    python -m benchmarks.auth_overhead [--requests N] [--tokens N]
+
+The principal cache is kept warm and the database session is never queried, so the
+numbers isolate token verification.
+"""
+import argparse
+import statistics
+import timeit
+from unittest.mock import MagicMock
+from uuid import uuid4
+from app.models.user import User
+from app.utils.cache import get_principal_cache, get_token_cache
+from app.utils.security import create_access_token, get_current_user
+
+
+def _measure(tokens: list[str], db, requests: int, repeat: int, cold: bool) -> float:
+    """Returns the median time of one request, in microseconds."""
+    cache = get_token_cache()
+
+    def run():
+        for i in range(requests):
+            if cold:
+                cache.clear()
+            get_current_user(tokens[i % len(tokens)], db)
+
+    timings = timeit.repeat(run, number=1, repeat=repeat)
+    return statistics.median(timings) / requests * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000, help="Requests per round")
+    parser.add_argument("--tokens", type=int, default=100, help="Distinct users (tokens) sending them")
+    parser.add_argument("--repeat", type=int, default=5, help="Rounds; the median is reported")
+    args = parser.parse_args()
+
+    users = [User(user_id=uuid4(), username=f"user{i}", role="reader") for i in range(args.tokens)]
+    tokens = [create_access_token({"username": u.username, "user_id": str(u.user_id), "role": u.role}) for u in users]
+    db = MagicMock()
+    db.query().filter().first.side_effect = users
+    for token in tokens:
+        get_current_user(token, db)
+    db.query.side_effect = AssertionError("the principal cache should serve every request")
+
+    # The cold run clears the cache before each request; time the clearing alone to subtract it
+    clear = statistics.median(timeit.repeat(get_token_cache().clear, number=args.requests, repeat=args.repeat))
+    cold = _measure(tokens, db, args.requests, args.repeat, cold=True) - clear / args.requests * 1_000_000
+    get_token_cache().clear()
+    warm = _measure(tokens, db, args.requests, args.repeat, cold=False)
+
+    print(f"requests per round: {args.requests}, distinct tokens: {args.tokens}")
+    print(f"get_current_user, token cache cold: {cold:8.2f} us/request")
+    print(f"get_current_user, token cache warm: {warm:8.2f} us/request")
+    print(f"speedup: {cold / warm:.1f}x")
+    print(f"token cache: {get_token_cache().stats()}")
+    get_principal_cache().clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ CREATE TYPE order_status AS ENUM ('pending', 'completed', 'overdue');
 
 CREATE TYPE order_type AS ENUM ('borrow', 'read_in_library');
 
+CREATE TYPE hold_status AS ENUM ('waiting', 'ready', 'fulfilled', 'expired', 'cancelled');
+
 
 CREATE TABLE users (
     user_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -25,9 +27,24 @@ CREATE TABLE books (
     author VARCHAR(255) NOT NULL,
     isbn VARCHAR(13) UNIQUE NOT NULL,
     publication_year INT,
-    description TEXT
+    description TEXT,
+    available_copies INT NOT NULL DEFAULT 0 CHECK (available_copies >= 0),
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(author, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
 );
 
+-- Keyset pagination of the catalog seeks on (title, book_id)
+CREATE INDEX idx_books_title_book_id ON books (title, book_id);
+-- Full-text catalog search
+CREATE INDEX idx_books_search_vector ON books USING GIN (search_vector);
+-- Filters of the book list: author (in title order), publication year range, availability
+CREATE INDEX idx_books_author_title_book_id ON books (author, title, book_id);
+CREATE INDEX idx_books_publication_year ON books (publication_year);
+CREATE INDEX idx_books_available_title_book_id ON books (title, book_id) WHERE available_copies > 0;
+
 CREATE TABLE book_copies (
     copy_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     book_id UUID NOT NULL REFERENCES books(book_id) ON DELETE CASCADE,
@@ -35,17 +52,114 @@ CREATE TABLE book_copies (
     added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Checkout looks up one available copy of a book
+CREATE INDEX idx_book_copies_available ON book_copies (book_id) WHERE status = 'available';
+-- Per-book copy counts by status are answered from the index alone
+CREATE INDEX idx_book_copies_book_id_status ON book_copies (book_id, status);
+
+-- Partitioned by month of order_date; the partition key has to be part of the primary key
 CREATE TABLE orders (
-    order_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    order_id UUID NOT NULL DEFAULT uuid_generate_v4(),
     user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
     copy_id UUID NOT NULL REFERENCES book_copies(copy_id) ON DELETE CASCADE,
     order_type order_type,
     order_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     due_date TIMESTAMP,
     return_date TIMESTAMP,
-    status order_status NOT NULL DEFAULT 'pending'
+    status order_status NOT NULL DEFAULT 'pending',
+    PRIMARY KEY (order_id, order_date)
+) PARTITION BY RANGE (order_date);
+
+-- Partitions for the current and the next three months; the API creates later ones
+-- ahead of time (ORDER_PARTITION_MONTHS_AHEAD) and archives expired ones
+DO $$
+DECLARE
+    partition_month DATE;
+BEGIN
+    FOR partition_month IN
+        SELECT generate_series(
+            date_trunc('month', LOCALTIMESTAMP),
+            date_trunc('month', LOCALTIMESTAMP) + INTERVAL '3 months',
+            INTERVAL '1 month'
+        )::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF orders FOR VALUES FROM (%L) TO (%L)',
+            'orders_p' || to_char(partition_month, 'YYYY_MM'),
+            partition_month,
+            (partition_month + INTERVAL '1 month')::date
+        );
+    END LOOP;
+END $$;
+
+-- Detached partitions of fully completed orders past the retention window
+CREATE SCHEMA orders_archive;
+
+-- The overdue sweeper scans pending orders by due date
+CREATE INDEX idx_orders_pending_due_date ON orders (due_date) WHERE status = 'pending';
+-- Keyset paging of the active order queue and of a reader's orders, newest first
+CREATE INDEX idx_orders_active_order_date_order_id ON orders (order_date, order_id) WHERE status <> 'completed';
+CREATE INDEX idx_orders_user_order_date_order_id ON orders (user_id, order_date, order_id);
+-- Orders of a copy (returns by copy, cascading deletes)
+CREATE INDEX idx_orders_copy_id ON orders (copy_id);
+
+-- Catalog watermark for ETags, bumped after every committed catalog change
+CREATE SEQUENCE catalog_version_seq;
+
+-- Daily order counts per book, maintained on checkout; backs /books/most-borrowed
+CREATE TABLE book_daily_orders (
+    book_id UUID NOT NULL REFERENCES books(book_id) ON DELETE CASCADE,
+    order_day DATE NOT NULL,
+    order_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (book_id, order_day)
 );
 
+CREATE INDEX idx_book_daily_orders_day ON book_daily_orders (order_day) INCLUDE (book_id, order_count);
+
+-- Hold queue for books without available copies
+CREATE TABLE holds (
+    hold_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    book_id UUID NOT NULL REFERENCES books(book_id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    copy_id UUID REFERENCES book_copies(copy_id) ON DELETE SET NULL,
+    status hold_status NOT NULL DEFAULT 'waiting',
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ready_at TIMESTAMP,
+    expires_at TIMESTAMP
+);
+
+-- Queue order of the waiting holds of a book; also answers queue positions
+CREATE INDEX idx_holds_queue ON holds (book_id, created_at, hold_id) WHERE status = 'waiting';
+-- One active hold per reader and book
+CREATE UNIQUE INDEX idx_holds_active_user_book ON holds (user_id, book_id) WHERE status IN ('waiting', 'ready');
+-- The expiry sweep scans ready holds by pickup deadline
+CREATE INDEX idx_holds_ready_expires_at ON holds (expires_at) WHERE status = 'ready';
+
+-- Outcomes of mutating requests sent with an Idempotency-Key header, replayed to retries
+CREATE TABLE idempotency_keys (
+    key_hash BYTEA PRIMARY KEY,
+    request_hash BYTEA NOT NULL,
+    status_code SMALLINT,
+    response_body JSONB,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+-- The purge sweep deletes expired keys
+CREATE INDEX idx_idempotency_keys_expires_at ON idempotency_keys (expires_at);
+
+-- Access tokens revoked before expiry (logout), by jti; purged once the tokens expire
+CREATE TABLE revoked_tokens (
+    jti UUID PRIMARY KEY,
+    expires_at TIMESTAMPTZ NOT NULL,
+    revoked_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Workers pick up revocations made since their last sync
+CREATE INDEX idx_revoked_tokens_revoked_at ON revoked_tokens (revoked_at);
+-- The purge sweep deletes revocations of expired tokens
+CREATE INDEX idx_revoked_tokens_expires_at ON revoked_tokens (expires_at);
+
 INSERT INTO books (title, author, isbn, publication_year, description) VALUES
 ('The Great Gatsby', 'F. Scott Fitzgerald', '9780743273565', 1925, 'A classic novel set in the Jazz Age about Jay Gatsby and his pursuit of the American Dream.'),
 ('1984', 'George Orwell', '9780451524935', 1949, 'Dystopian novel about a totalitarian regime and surveillance.'),
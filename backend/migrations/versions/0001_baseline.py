@@ -0,0 +1,75 @@
+"""Baseline schema, as created by the original db/init.sql
+
+Existing databases created from that script are brought under migrations with
+`alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"')
+    op.execute("CREATE TYPE role AS ENUM ('reader', 'librarian')")
+    op.execute("CREATE TYPE book_status AS ENUM ('available', 'borrowed', 'reserved')")
+    op.execute("CREATE TYPE order_status AS ENUM ('pending', 'completed', 'overdue')")
+    op.execute("CREATE TYPE order_type AS ENUM ('borrow', 'read_in_library')")
+    op.execute("""
+        CREATE TABLE users (
+            user_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            username VARCHAR(50) UNIQUE NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            email VARCHAR(100),
+            role role NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    op.execute("""
+        CREATE TABLE books (
+            book_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            title VARCHAR(255) NOT NULL,
+            author VARCHAR(255) NOT NULL,
+            isbn VARCHAR(13) UNIQUE NOT NULL,
+            publication_year INT,
+            description TEXT
+        )
+    """)
+    op.execute("""
+        CREATE TABLE book_copies (
+            copy_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            book_id UUID NOT NULL REFERENCES books(book_id) ON DELETE CASCADE,
+            status book_status NOT NULL DEFAULT 'available',
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    op.execute("""
+        CREATE TABLE orders (
+            order_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+            copy_id UUID NOT NULL REFERENCES book_copies(copy_id) ON DELETE CASCADE,
+            order_type order_type,
+            order_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            due_date TIMESTAMP,
+            return_date TIMESTAMP,
+            status order_status NOT NULL DEFAULT 'pending'
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE orders")
+    op.execute("DROP TABLE book_copies")
+    op.execute("DROP TABLE books")
+    op.execute("DROP TABLE users")
+    op.execute("DROP TYPE order_type")
+    op.execute("DROP TYPE order_status")
+    op.execute("DROP TYPE book_status")
+    op.execute("DROP TYPE role")
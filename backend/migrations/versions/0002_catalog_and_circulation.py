@@ -0,0 +1,66 @@
+"""Availability counter, full-text search, catalog version and popularity rollup
+
+Adds the columns, sequence and table introduced since the baseline and backfills them.
+Their indexes are built online by revision 0003.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE books ADD COLUMN available_copies INT NOT NULL DEFAULT 0 "
+        "CHECK (available_copies >= 0)"
+    )
+    op.execute("""
+        UPDATE books
+        SET available_copies = counts.available
+        FROM (
+            SELECT book_id, count(*) AS available
+            FROM book_copies
+            WHERE status = 'available'
+            GROUP BY book_id
+        ) AS counts
+        WHERE books.book_id = counts.book_id
+    """)
+    # Adding a stored generated column rewrites the books table under an exclusive lock
+    op.execute("""
+        ALTER TABLE books ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(author, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        ) STORED
+    """)
+    op.execute("CREATE SEQUENCE catalog_version_seq")
+    op.execute("""
+        CREATE TABLE book_daily_orders (
+            book_id UUID NOT NULL REFERENCES books(book_id) ON DELETE CASCADE,
+            order_day DATE NOT NULL,
+            order_count INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (book_id, order_day)
+        )
+    """)
+    op.execute("""
+        INSERT INTO book_daily_orders (book_id, order_day, order_count)
+        SELECT book_copies.book_id, orders.order_date::date, count(*)
+        FROM orders
+        JOIN book_copies ON book_copies.copy_id = orders.copy_id
+        WHERE orders.order_date >= current_date - 364
+        GROUP BY book_copies.book_id, orders.order_date::date
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE book_daily_orders")
+    op.execute("DROP SEQUENCE catalog_version_seq")
+    op.execute("ALTER TABLE books DROP COLUMN search_vector")
+    op.execute("ALTER TABLE books DROP COLUMN available_copies")
@@ -0,0 +1,54 @@
+"""Indexes for the hot catalog and circulation queries, built online
+
+Every index is created with CREATE INDEX CONCURRENTLY outside of a transaction, so
+reads and writes continue while it builds. If a build fails, PostgreSQL leaves an
+INVALID index behind: drop it and run the upgrade again.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# name -> (table, index definition)
+INDEXES = {
+    # Keyset pagination of the catalog seeks on (title, book_id)
+    "idx_books_title_book_id": ("books", "(title, book_id)"),
+    # Full-text catalog search
+    "idx_books_search_vector": ("books", "USING GIN (search_vector)"),
+    # Filters of the book list
+    "idx_books_author_title_book_id": ("books", "(author, title, book_id)"),
+    "idx_books_publication_year": ("books", "(publication_year)"),
+    "idx_books_available_title_book_id": ("books", "(title, book_id) WHERE available_copies > 0"),
+    # Checkout looks up one available copy of a book
+    "idx_book_copies_available": ("book_copies", "(book_id) WHERE status = 'available'"),
+    # Per-book copy counts by status are answered from the index alone
+    "idx_book_copies_book_id_status": ("book_copies", "(book_id, status)"),
+    # The overdue sweeper scans pending orders by due date
+    "idx_orders_pending_due_date": ("orders", "(due_date) WHERE status = 'pending'"),
+    # Keyset paging of the active order queue and of a reader's orders
+    "idx_orders_active_order_date_order_id": ("orders", "(order_date, order_id) WHERE status <> 'completed'"),
+    "idx_orders_user_order_date_order_id": ("orders", "(user_id, order_date, order_id)"),
+    # Orders of a copy (returns by copy, cascading deletes)
+    "idx_orders_copy_id": ("orders", "(copy_id)"),
+    # Popularity window scans by day
+    "idx_book_daily_orders_day": ("book_daily_orders", "(order_day) INCLUDE (book_id, order_count)"),
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, (table, definition) in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
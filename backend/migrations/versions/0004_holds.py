@@ -0,0 +1,42 @@
+"""Hold queue for books without available copies
+
+The holds table is new and empty, so its indexes are created with it.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE TYPE hold_status AS ENUM ('waiting', 'ready', 'fulfilled', 'expired', 'cancelled')")
+    op.execute("""
+        CREATE TABLE holds (
+            hold_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            book_id UUID NOT NULL REFERENCES books(book_id) ON DELETE CASCADE,
+            user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+            copy_id UUID REFERENCES book_copies(copy_id) ON DELETE SET NULL,
+            status hold_status NOT NULL DEFAULT 'waiting',
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            ready_at TIMESTAMP,
+            expires_at TIMESTAMP
+        )
+    """)
+    op.execute("CREATE INDEX idx_holds_queue ON holds (book_id, created_at, hold_id) WHERE status = 'waiting'")
+    op.execute(
+        "CREATE UNIQUE INDEX idx_holds_active_user_book ON holds (user_id, book_id) "
+        "WHERE status IN ('waiting', 'ready')"
+    )
+    op.execute("CREATE INDEX idx_holds_ready_expires_at ON holds (expires_at) WHERE status = 'ready'")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE holds")
+    op.execute("DROP TYPE hold_status")
@@ -0,0 +1,101 @@
+"""Range partition orders by month of order_date
+
+The table is rebuilt: the existing one is renamed, a partitioned copy is created with
+monthly partitions from the oldest order up to three months ahead, the rows are copied
+over and the old table is dropped. This rewrites every order and holds an exclusive lock
+on orders for the duration, so run it in a maintenance window.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "order_id, user_id, copy_id, order_type, order_date, due_date, return_date, status"
+
+TABLE_DEFINITION = """
+    order_id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    copy_id UUID NOT NULL REFERENCES book_copies(copy_id) ON DELETE CASCADE,
+    order_type order_type,
+    order_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    due_date TIMESTAMP,
+    return_date TIMESTAMP,
+    status order_status NOT NULL DEFAULT 'pending'
+"""
+
+
+def create_indexes() -> None:
+    op.execute("CREATE INDEX idx_orders_pending_due_date ON orders (due_date) WHERE status = 'pending'")
+    op.execute(
+        "CREATE INDEX idx_orders_active_order_date_order_id ON orders (order_date, order_id) "
+        "WHERE status <> 'completed'"
+    )
+    op.execute("CREATE INDEX idx_orders_user_order_date_order_id ON orders (user_id, order_date, order_id)")
+    op.execute("CREATE INDEX idx_orders_copy_id ON orders (copy_id)")
+
+
+def upgrade() -> None:
+    op.execute("LOCK TABLE orders IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE orders RENAME TO orders_unpartitioned")
+    op.execute("ALTER TABLE orders_unpartitioned RENAME CONSTRAINT orders_pkey TO orders_unpartitioned_pkey")
+    op.execute(f"""
+        CREATE TABLE orders (
+            {TABLE_DEFINITION},
+            PRIMARY KEY (order_id, order_date)
+        ) PARTITION BY RANGE (order_date)
+    """)
+    op.execute("""
+        DO $$
+        DECLARE
+            partition_month DATE;
+        BEGIN
+            FOR partition_month IN
+                SELECT generate_series(
+                    date_trunc('month', LEAST((SELECT min(order_date) FROM orders_unpartitioned), LOCALTIMESTAMP)),
+                    date_trunc('month', LOCALTIMESTAMP) + INTERVAL '3 months',
+                    INTERVAL '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF orders FOR VALUES FROM (%L) TO (%L)',
+                    'orders_p' || to_char(partition_month, 'YYYY_MM'),
+                    partition_month,
+                    (partition_month + INTERVAL '1 month')::date
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute(f"INSERT INTO orders ({COLUMNS}) SELECT {COLUMNS} FROM orders_unpartitioned")
+    op.execute("DROP TABLE orders_unpartitioned")
+    create_indexes()
+    op.execute("CREATE SCHEMA IF NOT EXISTS orders_archive")
+
+
+def downgrade() -> None:
+    # Archived partitions stay in the orders_archive schema and are not merged back
+    op.execute("LOCK TABLE orders IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE orders RENAME TO orders_partitioned")
+    for index in (
+        "idx_orders_pending_due_date",
+        "idx_orders_active_order_date_order_id",
+        "idx_orders_user_order_date_order_id",
+        "idx_orders_copy_id",
+    ):
+        op.execute(f"DROP INDEX {index}")
+    op.execute("ALTER TABLE orders_partitioned RENAME CONSTRAINT orders_pkey TO orders_partitioned_pkey")
+    op.execute(f"""
+        CREATE TABLE orders (
+            {TABLE_DEFINITION},
+            PRIMARY KEY (order_id)
+        )
+    """)
+    op.execute(f"INSERT INTO orders ({COLUMNS}) SELECT {COLUMNS} FROM orders_partitioned")
+    op.execute("DROP TABLE orders_partitioned")
+    create_indexes()
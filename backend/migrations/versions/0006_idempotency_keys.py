@@ -0,0 +1,33 @@
+"""Idempotency key store for retried mutating requests
+
+The idempotency_keys table is new and empty, so its index is created with it.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE idempotency_keys (
+            key_hash BYTEA PRIMARY KEY,
+            request_hash BYTEA NOT NULL,
+            status_code SMALLINT,
+            response_body JSONB,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP NOT NULL
+        )
+    """)
+    op.execute("CREATE INDEX idx_idempotency_keys_expires_at ON idempotency_keys (expires_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE idempotency_keys")
@@ -0,0 +1,31 @@
+"""Revoked access tokens for logout
+
+The revoked_tokens table is new and empty, so its indexes are created with it.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE revoked_tokens (
+            jti UUID PRIMARY KEY,
+            expires_at TIMESTAMPTZ NOT NULL,
+            revoked_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+    op.execute("CREATE INDEX idx_revoked_tokens_revoked_at ON revoked_tokens (revoked_at)")
+    op.execute("CREATE INDEX idx_revoked_tokens_expires_at ON revoked_tokens (expires_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE revoked_tokens")